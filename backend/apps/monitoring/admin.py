@@ -1,6 +1,14 @@
 from django.contrib import admin
 
-from .models import Recommendation, SensorDevice, SensorReading
+from .models import (
+    LatestReading,
+    Recommendation,
+    RecommendationCacheEntry,
+    RecommendationJob,
+    SensorDevice,
+    SensorReading,
+    WeatherObservation,
+)
 
 
 @admin.register(SensorDevice)
@@ -15,6 +23,14 @@ class SensorReadingAdmin(admin.ModelAdmin):
     list_display = ("device", "metric", "value", "unit", "timestamp")
     list_filter = ("metric", "unit", "device__sensor_type")
     search_fields = ("device__name", "metric")
+    ordering = ("-timestamp",)
+
+
+@admin.register(LatestReading)
+class LatestReadingAdmin(admin.ModelAdmin):
+    list_display = ("device", "metric", "value", "unit", "timestamp")
+    list_filter = ("metric",)
+    search_fields = ("device__name", "metric")
 
 
 @admin.register(Recommendation)
@@ -22,3 +38,25 @@ class RecommendationAdmin(admin.ModelAdmin):
     list_display = ("category", "device", "confidence", "created_at")
     search_fields = ("category", "message")
     list_filter = ("category",)
+    ordering = ("-created_at",)
+
+
+@admin.register(RecommendationCacheEntry)
+class RecommendationCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ("model", "fingerprint", "hits", "created_at", "last_used_at")
+    list_filter = ("model",)
+    readonly_fields = ("fingerprint", "inputs", "response", "created_at")
+
+
+@admin.register(RecommendationJob)
+class RecommendationJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "device", "model", "status", "created_at", "finished_at")
+    list_filter = ("status", "model")
+    readonly_fields = ("submission_key", "inputs", "output", "error", "started_at", "finished_at")
+
+
+@admin.register(WeatherObservation)
+class WeatherObservationAdmin(admin.ModelAdmin):
+    list_display = ("location_key", "observed_at", "temperature", "humidity", "condition")
+    list_filter = ("condition",)
+    search_fields = ("location_key", "city")
@@ -1,7 +1,14 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class MonitoringConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.monitoring"
     verbose_name = "Home Monitoring"
+
+    def ready(self):
+        from . import checks  # noqa: F401 (registers the system checks)
+        from .services.metrics import install_query_timer
+
+        connection_created.connect(install_query_timer, dispatch_uid="monitoring-query-timer")
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core import checks
+
+# Each process gets its own copy of these caches, so state kept in them is not shared.
+PROCESS_LOCAL_CACHES = ("django.core.cache.backends.locmem.LocMemCache", "django.core.cache.backends.dummy.DummyCache")
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Warn when connector rate limits, stats and breakers would not be shared between processes."""
+
+    backend = settings.CACHES.get("default", {}).get("BACKEND")
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        checks.Warning(
+            f"The default cache ({backend}) is local to each process.",
+            hint=(
+                "Connector rate limits, ingest stats and circuit breakers live in the cache, so the backend, "
+                "ingest and worker processes will not see each other's state. Set CACHE_BACKEND=redis."
+            ),
+            id="monitoring.W001",
+        )
+    ]
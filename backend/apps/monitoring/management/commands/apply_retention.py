@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.monitoring.services.retention import apply_retention
+
+
+class Command(BaseCommand):
+    help = (
+        "Compact raw payloads older than READING_PAYLOAD_RETENTION_DAYS and delete raw readings "
+        "older than READING_RAW_RETENTION_DAYS in small chunks. Run daily (cron, or --interval 86400)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=None,
+            help="Keep running and apply retention every this many seconds (used by the Compose retention service).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            result = apply_retention()
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Compacted {result['payloads_compacted']} payloads,"
+                    f" deleted {result['readings_deleted']} raw readings"
+                )
+            )
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from apps.monitoring.models import SensorReading
+from apps.monitoring.services.benchmark import (
+    StubProviders,
+    build_scenarios,
+    compare_reports,
+    run_benchmarks,
+    seed_readings,
+)
+from apps.monitoring.services.ha_publisher import get_publisher
+from apps.monitoring.services.live import reset_event_layer
+
+ISOLATED_SETTINGS = {
+    # Never clear or publish into the deployment's Redis from a benchmark.
+    "CACHES": {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "benchmark"}},
+    "LIVE_EVENTS_BACKEND": "memory",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database with synthetic readings and measure API and ingest latency, "
+        "queries per request and rows/sec against stubbed providers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--devices", type=int, default=10, help="Benchmark devices to seed.")
+        parser.add_argument("--days", type=float, default=365, help="Days of history per device and metric.")
+        parser.add_argument("--interval", type=int, default=900, help="Seconds between seeded readings.")
+        parser.add_argument("--iterations", type=int, default=50, help="Measured calls per scenario.")
+        parser.add_argument("--warmup", type=int, default=5, help="Unmeasured calls per scenario before measuring.")
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            default=None,
+            help="Only run this scenario; repeatable (default: all).",
+        )
+        parser.add_argument("--bulk-batch", type=int, default=1000, help="Readings per bulk ingest request.")
+        parser.add_argument(
+            "--provider-latency-ms", type=float, default=0, help="Delay added to every stubbed provider response."
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file (default: standard output).")
+        parser.add_argument("--baseline", help="JSON report to compare against; regressions fail the command.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Allowed latency/throughput change against the baseline, as a fraction (default 0.2).",
+        )
+        parser.add_argument(
+            "--keepdb", action="store_true", help="Reuse (and keep) the test database, skipping seeding if populated."
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"]) as handle:
+                baseline = json.load(handle)
+
+        stub = StubProviders(latency=options["provider_latency_ms"] / 1000).start()
+        setup_test_environment()
+        database = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"])
+        try:
+            with override_settings(**ISOLATED_SETTINGS, **stub.settings()):
+                reset_event_layer()
+                report = self._run(stub, options)
+                publisher = get_publisher()
+                if publisher is not None:
+                    publisher.flush()
+        finally:
+            connection.creation.destroy_test_db(database, verbosity=0, keepdb=options["keepdb"])
+            teardown_test_environment()
+            reset_event_layer()
+            stub.stop()
+
+        payload = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as handle:
+                handle.write(payload + "\n")
+        else:
+            self.stdout.write(payload)
+        self._print_table(report)
+
+        if baseline is not None:
+            regressions = compare_reports(report, baseline, threshold=options["threshold"])
+            if regressions:
+                raise CommandError("Performance regressions:\n  " + "\n  ".join(regressions))
+            self.stderr.write(self.style.SUCCESS(f"No regressions against {options['baseline']}"))
+
+    def _run(self, stub: StubProviders, options) -> dict:
+        end = timezone.now().replace(minute=0, second=0, microsecond=0)
+        if not (options["keepdb"] and SensorReading.objects.exists()):
+            started = time.perf_counter()
+            seeded = seed_readings(
+                devices=options["devices"], days=options["days"], interval=options["interval"], end=end
+            )
+            self.stderr.write(f"Seeded {seeded} reading(s) in {time.perf_counter() - started:.1f}s")
+
+        scenarios = build_scenarios(end=end, stub_url=stub.url, bulk_batch=options["bulk_batch"])
+        if options["scenarios"]:
+            unknown = set(options["scenarios"]) - scenarios.keys()
+            if unknown:
+                raise CommandError(
+                    f"Unknown scenario(s): {', '.join(sorted(unknown))}; choose from {', '.join(scenarios)}"
+                )
+            scenarios = {name: scenarios[name] for name in options["scenarios"]}
+        return run_benchmarks(
+            scenarios,
+            iterations=options["iterations"],
+            warmup=options["warmup"],
+            meta={
+                "devices": options["devices"],
+                "days": options["days"],
+                "interval": options["interval"],
+                "provider_latency_ms": options["provider_latency_ms"],
+            },
+        )
+
+    def _print_table(self, report: dict) -> None:
+        self.stderr.write(f"{'scenario':<18} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8} {'rows/s':>10}")
+        for name, result in report["scenarios"].items():
+            self.stderr.write(
+                f"{name:<18} {result['p50_ms']:>9} {result['p95_ms']:>9} {result['p99_ms']:>9} "
+                f"{result['queries_per_request']:>8} {result.get('rows_per_second', ''):>10}"
+            )
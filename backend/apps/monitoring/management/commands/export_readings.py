@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import datetime as dt
+import sys
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.monitoring.models import SensorDevice
+from apps.monitoring.services.export import EXPORT_FORMATS, encoder_for, export_chunks, export_queryset
+
+
+def _parse(value: str) -> dt.datetime:
+    parsed = parse_datetime(value.replace("Z", "+00:00"))
+    if parsed is None:
+        raise CommandError(f"Invalid datetime: {value}")
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+class Command(BaseCommand):
+    help = "Export raw sensor readings to a CSV, NDJSON or Parquet file, streaming from a server-side cursor."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Destination file, or - for standard output.")
+        parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv", help="Output format.")
+        parser.add_argument("--from", dest="start", help="Range start (ISO 8601); defaults to the oldest reading.")
+        parser.add_argument("--to", dest="end", help="Range end (ISO 8601, exclusive); defaults to the newest reading.")
+        parser.add_argument("--device", help="Limit to one device slug.")
+        parser.add_argument("--metric", help="Limit to one metric.")
+        parser.add_argument("--chunk-size", type=int, default=None, help="Rows fetched per cursor round trip.")
+
+    def handle(self, *args, **options):
+        start = _parse(options["start"]) if options["start"] else None
+        end = _parse(options["end"]) if options["end"] else None
+        if start is not None and end is not None and start >= end:
+            raise CommandError("--from must be earlier than --to")
+
+        device = None
+        if options["device"]:
+            device = SensorDevice.objects.filter(slug=options["device"]).first()
+            if device is None:
+                raise CommandError(f"Unknown device: {options['device']}")
+
+        try:
+            encoder = encoder_for(options["format"])
+        except ImproperlyConfigured as exc:
+            raise CommandError(str(exc)) from exc
+
+        readings = export_queryset(device=device, metric=options["metric"], start=start, end=end)
+        chunks = export_chunks(readings, encoder, chunk_size=options["chunk_size"])
+        if options["output"] == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+        with open(options["output"], "wb") as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Exported {encoder.rows} reading(s) to {options['output']}"))
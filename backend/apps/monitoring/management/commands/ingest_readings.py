@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.monitoring.services import IngestionScheduler, build_connectors
+from apps.monitoring.services.ha_publisher import get_publisher
+
+
+class Command(BaseCommand):
+    help = "Poll every configured SensorConnector on a schedule and store SensorReading rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run a single polling pass and exit (useful for cron or debugging).",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=None,
+            help="Default per-device poll interval in seconds (overrides INGEST_POLL_INTERVAL_SECONDS).",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=None,
+            help="Maximum parallel upstream calls across connectors (overrides INGEST_POLL_CONCURRENCY).",
+        )
+
+    def handle(self, *args, **options):
+        connectors = build_connectors()
+        if not connectors:
+            raise CommandError("No sensor connectors are configured; check SENSOR_CONNECTORS and their credentials.")
+
+        scheduler = IngestionScheduler(
+            connectors, default_interval=options["interval"], concurrency=options["concurrency"]
+        )
+        names = ", ".join(connector.slug for connector in connectors)
+        if options["once"]:
+            scheduler.run_pending()
+            publisher = get_publisher()
+            if publisher is not None:
+                publisher.flush()
+            for slug, stats in scheduler.stats.items():
+                self.stdout.write(
+                    f"{slug}: {stats['rows']} row(s) from {stats['polls']} poll(s), "
+                    f"{stats['errors']} error(s) in {stats['last_poll_seconds']}s"
+                )
+            self.stdout.write(self.style.SUCCESS(f"Polled connectors: {names}"))
+            return
+
+        self.stdout.write(f"Starting ingestion scheduler for: {names}")
+        scheduler.run_forever()
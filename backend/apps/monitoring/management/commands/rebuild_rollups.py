@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.monitoring.models import SensorDevice
+from apps.monitoring.services.rollups import rebuild_rollups
+
+
+def _parse(value: str) -> dt.datetime:
+    parsed = parse_datetime(value.replace("Z", "+00:00"))
+    if parsed is None:
+        raise CommandError(f"Invalid datetime: {value}")
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+class Command(BaseCommand):
+    help = "Recompute hourly and daily reading rollups from raw SensorReading rows for a time range."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="start", required=True, help="Range start (ISO 8601).")
+        parser.add_argument("--to", dest="end", help="Range end (ISO 8601); defaults to now.")
+        parser.add_argument("--device", help="Limit to one device slug.")
+        parser.add_argument("--metric", help="Limit to one metric.")
+
+    def handle(self, *args, **options):
+        start = _parse(options["start"])
+        end = _parse(options["end"]) if options["end"] else timezone.now()
+        if start >= end:
+            raise CommandError("--from must be earlier than --to")
+
+        device_id = None
+        if options["device"]:
+            device = SensorDevice.objects.filter(slug=options["device"]).first()
+            if device is None:
+                raise CommandError(f"Unknown device: {options['device']}")
+            device_id = device.id
+
+        written = rebuild_rollups(start, end, device_id=device_id, metric=options["metric"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} rollup buckets"))
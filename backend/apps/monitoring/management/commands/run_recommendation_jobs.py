@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from apps.monitoring.services import RecommendationJobWorker
+from apps.monitoring.services.jobs import requeue_stale_jobs
+
+
+class Command(BaseCommand):
+    help = "Process queued RecommendationJob rows, streaming Ollama output into the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue once and exit (useful for cron or debugging).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=None,
+            help="Seconds to wait when the queue is empty (overrides RECOMMENDATION_JOB_POLL_SECONDS).",
+        )
+
+    def handle(self, *args, **options):
+        worker = RecommendationJobWorker(poll_interval=options["poll_interval"])
+        if options["once"]:
+            requeue_stale_jobs()
+            processed = worker.run_pending()
+            self.stdout.write(self.style.SUCCESS(f"Processed {processed} recommendation job(s)"))
+            return
+
+        self.stdout.write("Starting recommendation job worker")
+        worker.run_forever()
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .services.metrics import RequestTimings, collect_timings, observe_request
+
+
+class RequestMetricsMiddleware:
+    """Record per-request latency, database query count/time and upstream time.
+
+    Totals go to the Prometheus histograms behind ``/metrics`` and, unless
+    ``METRICS_SERVER_TIMING`` is off, into a ``Server-Timing`` header so the
+    slow leg of any single request shows up in the browser's network panel.
+    Streamed bodies are measured up to the response headers only.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with collect_timings() as timings:
+            response = self.get_response(request)
+            return self._finish(request, response, timings)
+
+    async def __acall__(self, request):
+        with collect_timings() as timings:
+            response = await self.get_response(request)
+            return self._finish(request, response, timings)
+
+    def _finish(self, request, response, timings: RequestTimings):
+        match = request.resolver_match
+        view = (match.view_name if match else "") or "unmatched"
+        observe_request(view, request.method, response.status_code, timings)
+        if settings.METRICS_SERVER_TIMING:
+            response["Server-Timing"] = timings.server_timing()
+        return response
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.14 on 2026-10-18 05:06
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RenameIndex(
+            model_name='sensorreading',
+            new_name='monitoring__device__01464c_idx',
+            old_name='monitoring_device__b4b966_idx',
+        ),
+        migrations.AddField(
+            model_name='sensordevice',
+            name='poll_interval_seconds',
+            field=models.PositiveIntegerField(blank=True, help_text='Override INGEST_POLL_INTERVAL_SECONDS for this device.', null=True),
+        ),
+        migrations.AlterField(
+            model_name='sensorreading',
+            name='raw_payload',
+            field=models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.14 on 2026-10-18 05:08
+
+from django.db import migrations, models
+
+
+def remove_duplicate_readings(apps, schema_editor):
+    SensorReading = apps.get_model("monitoring", "SensorReading")
+    duplicates = (
+        SensorReading.objects.values("device_id", "metric", "timestamp")
+        .annotate(keep_id=models.Max("id"), rows=models.Count("id"))
+        .filter(rows__gt=1)
+    )
+    for row in duplicates.iterator():
+        SensorReading.objects.filter(
+            device_id=row["device_id"],
+            metric=row["metric"],
+            timestamp=row["timestamp"],
+        ).exclude(id=row["keep_id"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0002_device_poll_interval'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_readings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='sensorreading',
+            constraint=models.UniqueConstraint(fields=('device', 'metric', 'timestamp'), name='unique_sensor_reading'),
+        ),
+        migrations.RemoveIndex(
+            model_name='sensorreading',
+            name='monitoring__device__01464c_idx',
+        ),
+    ]
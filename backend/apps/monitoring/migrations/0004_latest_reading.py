@@ -0,0 +1,51 @@
+# Generated by Django 5.0.14 on 2026-10-18 05:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_latest_readings(apps, schema_editor):
+    SensorReading = apps.get_model("monitoring", "SensorReading")
+    LatestReading = apps.get_model("monitoring", "LatestReading")
+    latest = {}
+    rows = SensorReading.objects.order_by("device_id", "metric", "timestamp").values_list(
+        "device_id", "metric", "value", "unit", "timestamp"
+    )
+    for device_id, metric, value, unit, timestamp in rows.iterator(chunk_size=5000):
+        latest[(device_id, metric)] = (value, unit, timestamp)
+    LatestReading.objects.bulk_create(
+        [
+            LatestReading(device_id=device_id, metric=metric, value=value, unit=unit, timestamp=timestamp)
+            for (device_id, metric), (value, unit, timestamp) in latest.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0003_reading_unique_constraint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LatestReading',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=100)),
+                ('value', models.FloatField()),
+                ('unit', models.CharField(max_length=32)),
+                ('timestamp', models.DateTimeField()),
+                ('device', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='latest_readings', to='monitoring.sensordevice')),
+            ],
+            options={
+                'ordering': ['metric'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='latestreading',
+            constraint=models.UniqueConstraint(fields=('device', 'metric'), name='unique_latest_reading'),
+        ),
+        migrations.RunPython(populate_latest_readings, migrations.RunPython.noop),
+    ]
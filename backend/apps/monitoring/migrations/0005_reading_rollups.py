@@ -0,0 +1,52 @@
+# Generated by Django 5.0.14 on 2026-10-18 05:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0004_latest_reading'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SensorReadingDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=100)),
+                ('bucket_start', models.DateTimeField()),
+                ('count', models.PositiveIntegerField()),
+                ('sum', models.FloatField()),
+                ('min', models.FloatField()),
+                ('max', models.FloatField()),
+                ('last', models.FloatField()),
+                ('last_timestamp', models.DateTimeField()),
+                ('device', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='monitoring.sensordevice')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SensorReadingHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=100)),
+                ('bucket_start', models.DateTimeField()),
+                ('count', models.PositiveIntegerField()),
+                ('sum', models.FloatField()),
+                ('min', models.FloatField()),
+                ('max', models.FloatField()),
+                ('last', models.FloatField()),
+                ('last_timestamp', models.DateTimeField()),
+                ('device', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='monitoring.sensordevice')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='sensorreadingdaily',
+            constraint=models.UniqueConstraint(fields=('device', 'metric', 'bucket_start'), name='unique_daily_rollup'),
+        ),
+        migrations.AddConstraint(
+            model_name='sensorreadinghourly',
+            constraint=models.UniqueConstraint(fields=('device', 'metric', 'bucket_start'), name='unique_hourly_rollup'),
+        ),
+    ]
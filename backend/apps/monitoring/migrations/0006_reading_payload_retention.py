@@ -0,0 +1,28 @@
+# Generated by Django 5.0.14 on 2026-10-18 05:12
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0005_reading_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReadingPayload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='sensorreading',
+            name='payload_digest',
+            field=models.CharField(blank=True, default='', help_text='Set when raw_payload was moved to ReadingPayload by retention compaction.', max_length=64),
+        ),
+    ]
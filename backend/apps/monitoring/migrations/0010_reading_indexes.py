@@ -0,0 +1,72 @@
+# Generated by Django 5.0.14 on 2026-10-18 05:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# PostgreSQL-only access paths; SQLite has no BRIN or INCLUDE columns and keeps
+# using the unique (device, metric, timestamp) index for both.
+POSTGRES_INDEXES = {
+    # Range scans across all devices (retention, exports) on an append-mostly table, at a
+    # fraction of a B-tree's size.
+    "reading_timestamp_brin": 'CREATE INDEX IF NOT EXISTS reading_timestamp_brin '
+    'ON monitoring_sensorreading USING brin ("timestamp")',
+    # Newest/previous value per (device, metric) and raw series aggregation as index-only scans.
+    "reading_series_covering": 'CREATE INDEX IF NOT EXISTS reading_series_covering '
+    'ON monitoring_sensorreading (device_id, metric, "timestamp" DESC) INCLUDE (value, unit)',
+}
+
+
+def create_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for statement in POSTGRES_INDEXES.values():
+        schema_editor.execute(statement)
+
+
+def drop_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in POSTGRES_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0009_weather_observations'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='recommendation',
+            options={},
+        ),
+        migrations.AlterModelOptions(
+            name='sensorreading',
+            options={},
+        ),
+        migrations.AddIndex(
+            model_name='recommendation',
+            index=models.Index(fields=['-created_at'], name='recommendation_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='recommendation',
+            index=models.Index(fields=['device', '-created_at'], name='recommendation_device_recent'),
+        ),
+        migrations.AddIndex(
+            model_name='sensorreading',
+            index=models.Index(fields=['device', '-timestamp'], name='reading_device_recent'),
+        ),
+        # The single-column foreign key indexes are prefixes of the composite indexes above.
+        migrations.AlterField(
+            model_name='recommendation',
+            name='device',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='recommendations', to='monitoring.sensordevice'),
+        ),
+        migrations.AlterField(
+            model_name='sensorreading',
+            name='device',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='readings', to='monitoring.sensordevice'),
+        ),
+        migrations.RunPython(create_postgres_indexes, drop_postgres_indexes),
+    ]
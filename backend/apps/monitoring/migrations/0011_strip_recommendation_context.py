@@ -0,0 +1,30 @@
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+
+def strip_conversation_state(apps, schema_editor):
+    # Ollama insights used to be stored with the response's "context" token array.
+    Recommendation = apps.get_model("monitoring", "Recommendation")
+    batch = []
+    for recommendation in Recommendation.objects.filter(context__has_key="context").only("id", "context").iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        del recommendation.context["context"]
+        batch.append(recommendation)
+        if len(batch) >= BATCH_SIZE:
+            Recommendation.objects.bulk_update(batch, ["context"])
+            batch = []
+    if batch:
+        Recommendation.objects.bulk_update(batch, ["context"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0010_reading_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(strip_conversation_state, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.14 on 2026-10-18 05:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0011_strip_recommendation_context'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='recommendation',
+            name='recommendation_recent',
+        ),
+        migrations.RemoveIndex(
+            model_name='recommendation',
+            name='recommendation_device_recent',
+        ),
+        migrations.AddIndex(
+            model_name='recommendation',
+            index=models.Index(fields=['-created_at', '-id'], name='recommendation_keyset'),
+        ),
+        migrations.AddIndex(
+            model_name='recommendation',
+            index=models.Index(fields=['device', '-created_at', '-id'], name='recommendation_device_keyset'),
+        ),
+        migrations.AddIndex(
+            model_name='recommendation',
+            index=models.Index(fields=['category', '-created_at', '-id'], name='recommendation_category_keyset'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 06:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0012_recommendation_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recommendationjob',
+            name='attempt',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,42 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+# Trend refreshes range-scan recently written rows. On PostgreSQL a BRIN index suits the
+# append-mostly column and, being summarizing, does not block HOT updates of the upserts.
+POSTGRES_INDEX = (
+    "reading_updated_brin",
+    'CREATE INDEX IF NOT EXISTS reading_updated_brin ON monitoring_sensorreading USING brin ("updated_at")',
+)
+DEFAULT_INDEX = (
+    "reading_updated",
+    'CREATE INDEX IF NOT EXISTS reading_updated ON monitoring_sensorreading ("updated_at")',
+)
+
+
+def _index(schema_editor):
+    return POSTGRES_INDEX if schema_editor.connection.vendor == "postgresql" else DEFAULT_INDEX
+
+
+def create_updated_index(apps, schema_editor):
+    schema_editor.execute(_index(schema_editor)[1])
+
+
+def drop_updated_index(apps, schema_editor):
+    schema_editor.execute(f"DROP INDEX IF EXISTS {_index(schema_editor)[0]}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0013_recommendation_job_attempt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sensorreading',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(create_updated_index, drop_updated_index),
+    ]
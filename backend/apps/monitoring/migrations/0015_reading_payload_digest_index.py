@@ -0,0 +1,17 @@
+# Generated by Django 5.0.14 on 2026-10-18 06:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0014_reading_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sensorreading',
+            index=models.Index(condition=models.Q(('payload_digest', ''), _negated=True), fields=['payload_digest'], name='reading_payload_digest'),
+        ),
+    ]
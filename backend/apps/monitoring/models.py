@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import Q
 
 
 class SensorDevice(models.Model):
@@ -20,6 +22,11 @@ class SensorDevice(models.Model):
     sensor_type = models.CharField(max_length=50, choices=SENSOR_TYPES)
     connection_type = models.CharField(max_length=50, default="api")
     metadata = models.JSONField(blank=True, default=dict)
+    poll_interval_seconds = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Override INGEST_POLL_INTERVAL_SECONDS for this device.",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -33,28 +40,121 @@ class SensorDevice(models.Model):
 class SensorReading(models.Model):
     """Stores individual sensor measurements."""
 
-    device = models.ForeignKey(SensorDevice, related_name="readings", on_delete=models.CASCADE)
+    # Indexed as the leading column of unique_sensor_reading; a separate index would only slow inserts.
+    device = models.ForeignKey(SensorDevice, related_name="readings", on_delete=models.CASCADE, db_index=False)
     metric = models.CharField(max_length=100)
     value = models.FloatField()
     unit = models.CharField(max_length=32)
     timestamp = models.DateTimeField()
-    raw_payload = models.JSONField(blank=True, default=dict)
+    raw_payload = models.JSONField(blank=True, default=dict, encoder=DjangoJSONEncoder)
+    payload_digest = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="Set when raw_payload was moved to ReadingPayload by retention compaction.",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped by every upsert, so trend refreshes also see in-place corrections.
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ["-timestamp"]
+        # No default ordering: it would add a sort to every query on the largest table.
+        constraints = [
+            # Doubles as the (device, metric, timestamp) lookup index and the bulk upsert conflict target.
+            models.UniqueConstraint(fields=["device", "metric", "timestamp"], name="unique_sensor_reading"),
+        ]
         indexes = [
-            models.Index(fields=["device", "metric", "timestamp"]),
+            # Newest readings of a device across metrics (/api/devices/?include=readings).
+            models.Index(fields=["device", "-timestamp"], name="reading_device_recent"),
+            # Payloads still referenced after a purge; only compacted rows carry a digest.
+            models.Index(fields=["payload_digest"], condition=~Q(payload_digest=""), name="reading_payload_digest"),
         ]
+        # PostgreSQL also gets a BRIN index on timestamp and a covering series index (migration 0010).
+        # updated_at is indexed per vendor in migration 0014.
 
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.device.name} {self.metric} @ {self.timestamp:%Y-%m-%d %H:%M}"
 
+    @property
+    def payload(self) -> dict:
+        """Upstream payload, following the content-hash reference once compacted."""
+        if self.raw_payload or not self.payload_digest:
+            return self.raw_payload
+        stored = ReadingPayload.objects.filter(digest=self.payload_digest).first()
+        return stored.payload if stored else {}
+
+
+class ReadingPayload(models.Model):
+    """Upstream payload shared by compacted readings, keyed by its SHA-256 content hash."""
+
+    digest = models.CharField(max_length=64, unique=True)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:  # pragma: no cover
+        return self.digest
+
+
+class ReadingRollup(models.Model):
+    """Aggregate of raw readings for one device, metric and time bucket."""
+
+    device = models.ForeignKey(SensorDevice, on_delete=models.CASCADE)
+    metric = models.CharField(max_length=100)
+    bucket_start = models.DateTimeField()
+    count = models.PositiveIntegerField()
+    sum = models.FloatField()
+    min = models.FloatField()
+    max = models.FloatField()
+    last = models.FloatField()
+    last_timestamp = models.DateTimeField()
+
+    class Meta:
+        abstract = True
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.device_id} {self.metric} @ {self.bucket_start:%Y-%m-%d %H:%M}"
+
+
+class SensorReadingHourly(ReadingRollup):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["device", "metric", "bucket_start"], name="unique_hourly_rollup"),
+        ]
+
+
+class SensorReadingDaily(ReadingRollup):
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["device", "metric", "bucket_start"], name="unique_daily_rollup"),
+        ]
+
+
+class LatestReading(models.Model):
+    """Most recent value per device and metric, maintained as readings are ingested."""
+
+    device = models.ForeignKey(SensorDevice, related_name="latest_readings", on_delete=models.CASCADE)
+    metric = models.CharField(max_length=100)
+    value = models.FloatField()
+    unit = models.CharField(max_length=32)
+    timestamp = models.DateTimeField()
+
+    class Meta:
+        ordering = ["metric"]
+        constraints = [
+            models.UniqueConstraint(fields=["device", "metric"], name="unique_latest_reading"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.device_id} {self.metric}={self.value}"
+
 
 class Recommendation(models.Model):
     """Persists AI-generated recommendations for home actions."""
 
-    device = models.ForeignKey(SensorDevice, related_name="recommendations", on_delete=models.SET_NULL, null=True, blank=True)
+    # Indexed as the leading column of recommendation_device_keyset.
+    device = models.ForeignKey(
+        SensorDevice, related_name="recommendations", on_delete=models.SET_NULL, null=True, blank=True, db_index=False
+    )
     category = models.CharField(max_length=100)
     message = models.TextField()
     confidence = models.FloatField(null=True, blank=True)
@@ -62,7 +162,94 @@ class Recommendation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ["-created_at"]
+        # Keyset pages of the history walk (created_at, id) newest first, optionally per device or category.
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="recommendation_keyset"),
+            models.Index(fields=["device", "-created_at", "-id"], name="recommendation_device_keyset"),
+            models.Index(fields=["category", "-created_at", "-id"], name="recommendation_category_keyset"),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover
         return f"{self.category}: {self.message[:50]}"
+
+
+class RecommendationCacheEntry(models.Model):
+    """Memoized LLM response keyed by a normalized fingerprint of its inputs."""
+
+    fingerprint = models.CharField(max_length=64, unique=True)
+    model = models.CharField(max_length=255)
+    inputs = models.JSONField(blank=True, default=dict)
+    response = models.JSONField(encoder=DjangoJSONEncoder)
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(db_index=True)
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.model} {self.fingerprint[:12]}"
+
+
+class RecommendationJob(models.Model):
+    """Queued LLM generation processed by the ``run_recommendation_jobs`` worker."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUSES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+    ]
+    ACTIVE_STATUSES = (PENDING, RUNNING)
+
+    device = models.ForeignKey(SensorDevice, related_name="recommendation_jobs", on_delete=models.SET_NULL, null=True, blank=True)
+    model = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=20, choices=STATUSES, default=PENDING)
+    submission_key = models.CharField(max_length=64, db_index=True)
+    inputs = models.JSONField(blank=True, default=dict, encoder=DjangoJSONEncoder)
+    location = models.JSONField(blank=True, default=dict)
+    output = models.TextField(blank=True, default="")
+    # Bumped when a stale job is requeued, so streams know ``output`` restarted from scratch.
+    attempt = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    recommendation = models.ForeignKey(Recommendation, related_name="+", on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"], name="recommendation_job_queue")]
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (self.SUCCEEDED, self.FAILED)
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"job {self.pk} ({self.status})"
+
+
+class WeatherObservation(models.Model):
+    """Outdoor conditions recorded from each weather provider lookup."""
+
+    location_key = models.CharField(max_length=128)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    city = models.CharField(max_length=255, blank=True)
+    observed_at = models.DateTimeField()
+    temperature = models.FloatField(null=True, blank=True)
+    humidity = models.FloatField(null=True, blank=True)
+    pressure = models.FloatField(null=True, blank=True)
+    wind_speed = models.FloatField(null=True, blank=True)
+    condition = models.CharField(max_length=64, blank=True)
+    payload = models.JSONField(blank=True, default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["location_key", "observed_at"], name="unique_weather_observation"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.location_key} @ {self.observed_at:%Y-%m-%d %H:%M}"
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import datetime as dt
+from typing import Any, List, NamedTuple, Optional
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class Position(NamedTuple):
+    created_at: dt.datetime
+    id: int
+    # True for a ``previous`` cursor, which pages towards newer rows.
+    reverse: bool
+
+
+def encode_cursor(position: Position) -> str:
+    raw = f"{position.created_at.isoformat()}|{position.id}|{int(position.reverse)}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Position:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, pk, reverse = raw.split("|")
+        return Position(dt.datetime.fromisoformat(created_at), int(pk), reverse == "1")
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise NotFound("Invalid cursor") from exc
+
+
+class RecommendationKeysetPagination(BasePagination):
+    """Newest-first keyset pages over (``created_at``, ``id``).
+
+    A cursor holds the position of the row at a page edge, and the next page is
+    ``WHERE (created_at, id) < position``. Because the lookup is an index seek
+    rather than an offset, page 1,000 costs the same as page 1, and rows
+    inserted while a client scrolls never shift or repeat entries.
+    """
+
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None) -> List[Any]:
+        self.request = request
+        size = self.get_page_size(request)
+        raw = request.query_params.get(self.cursor_query_param)
+        position = decode_cursor(raw) if raw else None
+
+        if position is None:
+            rows = list(queryset.order_by("-created_at", "-id")[: size + 1])
+        elif position.reverse:
+            rows = list(
+                queryset.filter(created_at__gte=position.created_at)
+                .filter(Q(created_at__gt=position.created_at) | Q(id__gt=position.id))
+                .order_by("created_at", "id")[: size + 1]
+            )
+        else:
+            # The redundant range bound lets the database seek the index instead of filtering the OR.
+            rows = list(
+                queryset.filter(created_at__lte=position.created_at)
+                .filter(Q(created_at__lt=position.created_at) | Q(id__lt=position.id))
+                .order_by("-created_at", "-id")[: size + 1]
+            )
+
+        more = len(rows) > size
+        page = rows[:size]
+        if position is not None and position.reverse:
+            page.reverse()
+            self.has_next, self.has_previous = True, more
+        else:
+            self.has_next, self.has_previous = more, position is not None
+        self.page = page
+        return page
+
+    def _link(self, row, reverse: bool) -> str:
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encode_cursor(Position(row.created_at, row.pk, reverse)))
+
+    def get_next_link(self) -> Optional[str]:
+        if not (self.has_next and self.page):
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self._link(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data) -> Response:
+        return Response({"next": self.get_next_link(), "previous": self.get_previous_link(), "results": data})
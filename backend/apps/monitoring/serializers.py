@@ -1,18 +1,27 @@
 from __future__ import annotations
 
+from django.urls import reverse
 from rest_framework import serializers
 
-from .models import Recommendation, SensorDevice, SensorReading
+from .models import LatestReading, Recommendation, RecommendationJob, SensorDevice, SensorReading
 
 
-class SensorReadingSerializer(serializers.ModelSerializer):
+class LatestReadingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LatestReading
+        fields = ["metric", "value", "unit", "timestamp"]
+
+
+class CompactReadingSerializer(serializers.ModelSerializer):
     class Meta:
         model = SensorReading
-        fields = ["id", "device", "metric", "value", "unit", "timestamp", "raw_payload", "created_at"]
+        fields = ["id", "metric", "value", "unit", "timestamp"]
 
 
-class SensorDeviceSerializer(serializers.ModelSerializer):
-    readings = SensorReadingSerializer(many=True, read_only=True)
+class SensorDeviceListSerializer(serializers.ModelSerializer):
+    """Device row with the latest value per metric instead of its full history."""
+
+    latest = LatestReadingSerializer(many=True, read_only=True, source="latest_readings")
 
     class Meta:
         model = SensorDevice
@@ -26,23 +35,64 @@ class SensorDeviceSerializer(serializers.ModelSerializer):
             "metadata",
             "created_at",
             "updated_at",
-            "readings",
+            "latest",
         ]
 
 
+class SensorDeviceWithRecentReadingsSerializer(SensorDeviceListSerializer):
+    """Adds a bounded slice of recent readings (prefetched into ``recent_readings``)."""
+
+    readings = CompactReadingSerializer(many=True, read_only=True, source="recent_readings")
+
+    class Meta(SensorDeviceListSerializer.Meta):
+        fields = [*SensorDeviceListSerializer.Meta.fields, "readings"]
+
+
 class RecommendationSerializer(serializers.ModelSerializer):
-    device = SensorDeviceSerializer(read_only=True)
+    """Recommendation with its device as a slug reference (load it with ``select_related("device")``)."""
+
+    device = serializers.SlugRelatedField(slug_field="slug", read_only=True)
 
     class Meta:
         model = Recommendation
         fields = ["id", "device", "category", "message", "confidence", "context", "created_at"]
 
 
+class RecommendationJobSerializer(serializers.ModelSerializer):
+    device = serializers.SlugRelatedField(slug_field="slug", read_only=True)
+    status_url = serializers.SerializerMethodField()
+    stream_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RecommendationJob
+        fields = [
+            "id",
+            "device",
+            "model",
+            "status",
+            "output",
+            "attempt",
+            "error",
+            "recommendation",
+            "created_at",
+            "started_at",
+            "finished_at",
+            "status_url",
+            "stream_url",
+        ]
+
+    def get_status_url(self, obj: RecommendationJob) -> str:
+        return reverse("recommendation-job-detail", args=[obj.pk])
+
+    def get_stream_url(self, obj: RecommendationJob) -> str:
+        return reverse("recommendation-job-stream", args=[obj.pk])
+
+
 class InsightSerializer(serializers.Serializer):
     """Aggregated payload that combines sensor data, weather, and insights."""
 
-    radon = serializers.DictField(child=serializers.FloatField(), required=False)
-    weather = serializers.DictField(child=serializers.CharField(), required=False)
-    environment = serializers.DictField(child=serializers.CharField(), required=False)
+    radon = serializers.DictField(required=False)
+    weather = serializers.DictField(required=False)
+    environment = serializers.DictField(required=False)
     recommendations = RecommendationSerializer(many=True)
-    metadata = serializers.DictField(child=serializers.CharField(), required=False)
+    metadata = serializers.DictField(required=False)
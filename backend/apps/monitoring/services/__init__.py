@@ -2,15 +2,34 @@
 from .allthings_wave import AllthingsWaveClient
 from .home_assistant import HomeAssistantClient
 from .ollama import OllamaClient
-from .recommendations import RecommendationEngine
+from .recommendations import RecommendationEngine, build_recommendation_engine
 from .weather import WeatherClient
 from .base import SensorConnector
+from .connectors import build_connectors, connector_classes
+from .ingestion import (
+    IngestionScheduler,
+    bulk_ingest_readings,
+    ensure_device_record,
+    record_readings,
+    upsert_readings,
+)
+from .jobs import RecommendationJobWorker, enqueue_recommendation_job
 
 __all__ = [
     "AllthingsWaveClient",
     "HomeAssistantClient",
+    "IngestionScheduler",
     "OllamaClient",
     "RecommendationEngine",
+    "RecommendationJobWorker",
     "SensorConnector",
     "WeatherClient",
+    "build_connectors",
+    "connector_classes",
+    "build_recommendation_engine",
+    "bulk_ingest_readings",
+    "enqueue_recommendation_job",
+    "ensure_device_record",
+    "record_readings",
+    "upsert_readings",
 ]
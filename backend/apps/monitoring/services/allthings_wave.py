@@ -4,8 +4,12 @@ import datetime as dt
 from typing import Any, Dict, List, Optional
 
 import requests
+from django.conf import settings
 
 from .base import SensorConnector
+from .breaker import CircuitBreaker, get_breaker
+from .http import get_session
+from .metrics import track_upstream
 
 
 class AllthingsWaveClient(SensorConnector):
@@ -19,13 +23,21 @@ class AllthingsWaveClient(SensorConnector):
         api_key: str,
         timeout: int = 15,
         session: Optional[requests.Session] = None,
+        breaker: Optional[CircuitBreaker] = None,
     ) -> None:
         if not api_key:
             raise ValueError("Allthings Wave API key is required")
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
         self.timeout = timeout
-        self.session = session or requests.Session()
+        self.session = session or get_session(self.base_url)
+        self.breaker = breaker or get_breaker(self.slug)
+
+    @classmethod
+    def from_settings(cls) -> Optional["AllthingsWaveClient"]:
+        if not settings.ALLTHINGS_WAVE_API_KEY:
+            return None
+        return cls(settings.ALLTHINGS_WAVE_BASE_URL, settings.ALLTHINGS_WAVE_API_KEY)
 
     def _headers(self) -> Dict[str, str]:
         return {
@@ -33,17 +45,20 @@ class AllthingsWaveClient(SensorConnector):
             "Accept": "application/json",
         }
 
-    def _request(self, method: str, path: str, **kwargs: Any) -> Any:
+    def _request(self, method: str, path: str, *, endpoint: Optional[str] = None, **kwargs: Any) -> Any:
         url = f"{self.base_url}{path}"
-        response = self.session.request(
-            method=method,
-            url=url,
-            timeout=self.timeout,
-            headers={**self._headers(), **kwargs.pop("headers", {})},
-            **kwargs,
-        )
-        response.raise_for_status()
-        return response.json()
+        with track_upstream(self.slug, self.base_url, endpoint or path, method) as call, self.breaker.guard(self.timeout):
+            response = call.observe(
+                self.session.request(
+                    method=method,
+                    url=url,
+                    timeout=self.timeout,
+                    headers={**self._headers(), **kwargs.pop("headers", {})},
+                    **kwargs,
+                )
+            )
+            response.raise_for_status()
+            return response.json()
 
     def list_devices(self) -> List[Dict[str, Any]]:
         """Return devices that belong to the authenticated account."""
@@ -54,7 +69,7 @@ class AllthingsWaveClient(SensorConnector):
     def latest_radon_readings(self, device_id: str) -> Dict[str, Any]:
         """Return the latest radon readings for a device."""
 
-        payload = self._request("GET", f"/v1/devices/{device_id}/radon/latest")
+        payload = self._request("GET", f"/v1/devices/{device_id}/radon/latest", endpoint="/v1/devices/{id}/radon/latest")
         reading = payload.get("reading", payload)
 
         timestamp = reading.get("timestamp")
@@ -71,9 +86,47 @@ class AllthingsWaveClient(SensorConnector):
     def latest_environmental_snapshot(self, device_id: str) -> Dict[str, Any]:
         """Return the latest temperature/humidity snapshot if the device supports it."""
 
-        payload = self._request("GET", f"/v1/devices/{device_id}/environment/latest")
+        payload = self._request(
+            "GET", f"/v1/devices/{device_id}/environment/latest", endpoint="/v1/devices/{id}/environment/latest"
+        )
         snapshot = payload.get("snapshot", payload)
         timestamp = snapshot.get("timestamp")
         if timestamp and isinstance(timestamp, str):
             snapshot["timestamp"] = dt.datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
         return snapshot
+
+    def fetch_readings(self, device_id: str) -> List[Dict[str, Any]]:
+        """Return radon, temperature and humidity readings for a device."""
+
+        readings: List[Dict[str, Any]] = []
+        radon = self.latest_radon_readings(device_id)
+        radon_value = radon.get("value") or radon.get("pCiL")
+        if radon_value is not None:
+            readings.append(
+                {
+                    "metric": "radon",
+                    "value": float(radon_value),
+                    "unit": radon.get("unit", "pCi/L"),
+                    "timestamp": radon.get("timestamp"),
+                    "payload": radon,
+                }
+            )
+
+        environment = self.latest_environmental_snapshot(device_id)
+        if environment:
+            for metric, unit_key, default_unit in (
+                ("temperature", "temperature_unit", "°C"),
+                ("humidity", "humidity_unit", "%"),
+            ):
+                value = environment.get(metric)
+                if value is not None:
+                    readings.append(
+                        {
+                            "metric": metric,
+                            "value": float(value),
+                            "unit": environment.get(unit_key, default_unit),
+                            "timestamp": environment.get("timestamp"),
+                            "payload": environment,
+                        }
+                    )
+        return readings
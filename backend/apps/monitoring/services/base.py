@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Iterable
+from typing import Any, Dict, Iterable, List, Optional
 
 
 class SensorConnector(ABC):
     """Base class for hardware integrations."""
 
     slug: str
+    #: Maximum upstream requests per second (``None`` for no limit); see ``CONNECTOR_RATE_LIMITS``.
+    rate_limit: Optional[float] = None
+
+    @classmethod
+    def from_settings(cls) -> Optional["SensorConnector"]:
+        """Build the connector from Django settings, or return ``None`` when it is not configured."""
+        return cls()
 
     @abstractmethod
     def fetch_devices(self) -> Iterable[Dict[str, Any]]:
@@ -20,3 +27,22 @@ class SensorConnector(ABC):
     def prepare_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Normalize payload prior to persistence or downstream use."""
         return payload
+
+    def fetch_readings(self, device_id: str) -> List[Dict[str, Any]]:
+        """Return normalized readings (``metric``, ``value``, ``unit``, ``timestamp``, ``payload``).
+
+        The default implementation treats ``fetch_latest`` as a single reading;
+        connectors exposing several metrics per device should override it.
+        """
+        payload = self.prepare_payload(self.fetch_latest(device_id))
+        if payload.get("metric") is None or payload.get("value") is None:
+            return []
+        return [
+            {
+                "metric": payload["metric"],
+                "value": float(payload["value"]),
+                "unit": payload.get("unit", ""),
+                "timestamp": payload.get("timestamp"),
+                "payload": payload,
+            }
+        ]
@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import datetime as dt
+import itertools
+import json
+import math
+import platform
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+import django
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..models import LatestReading, SensorDevice, SensorReading
+from .allthings_wave import AllthingsWaveClient
+from .ingestion import IngestionScheduler
+from .rollups import rebuild_rollups
+
+BENCH_PREFIX = "bench-"
+BENCH_LOCATION = {"lat": "59.91", "lon": "10.75"}
+
+# metric -> (unit, baseline, daily swing, noise)
+BENCH_METRICS = {
+    "radon": ("pCi/L", 2.0, 0.8, 0.3),
+    "temperature": ("°C", 21.0, 2.5, 0.2),
+    "humidity": ("%", 45.0, 8.0, 1.0),
+}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Answers like Allthings Wave, OpenWeatherMap, Ollama and Home Assistant."""
+
+    latency = 0.0
+    wave_devices = 3
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, payload: Any) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        now = timezone.now()
+        if path == "/v1/devices":
+            return self._reply(
+                {"devices": [{"id": f"wave-{index}", "name": f"Wave {index}"} for index in range(self.wave_devices)]}
+            )
+        if path.endswith("/radon/latest"):
+            reading = {"value": round(random.uniform(1, 4), 2), "unit": "pCi/L", "timestamp": now.isoformat()}
+            return self._reply({"reading": reading})
+        if path.endswith("/environment/latest"):
+            snapshot = {
+                "temperature": round(random.uniform(19, 23), 1),
+                "humidity": random.randint(35, 55),
+                "timestamp": now.isoformat(),
+            }
+            return self._reply({"snapshot": snapshot})
+        if path.endswith("/weather"):
+            return self._reply(
+                {
+                    "main": {"temp": 8.5, "humidity": 71, "pressure": 1012},
+                    "weather": [{"main": "Clouds", "description": "overcast clouds"}],
+                    "wind": {"speed": 3.1},
+                    "dt": int(now.timestamp()) // 600 * 600,
+                }
+            )
+        if path == "/api/tags":
+            return self._reply({"models": [{"name": "llama2"}]})
+        self.send_error(404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        path = urlsplit(self.path).path
+        if path == "/api/generate":
+            return self._reply({"model": "llama2", "response": "Keep ventilating the basement for an hour.", "done": True})
+        if path.startswith(("/api/states/", "/api/events/")):
+            return self._reply({})
+        self.send_error(404)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubProviders:
+    """In-process HTTP server standing in for every upstream provider during a benchmark.
+
+    ``latency`` adds a fixed delay to each response, to model a slow vendor.
+    ``settings()`` returns the overrides that point the clients at the stub.
+    """
+
+    def __init__(self, *, latency: float = 0.0, wave_devices: int = 3) -> None:
+        handler = type("StubHandler", (_StubHandler,), {"latency": latency, "wave_devices": wave_devices})
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self) -> "StubProviders":
+        threading.Thread(target=self.server.serve_forever, name="benchmark-stub", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def settings(self) -> Dict[str, Any]:
+        return {
+            "ALLTHINGS_WAVE_BASE_URL": self.url,
+            "ALLTHINGS_WAVE_API_KEY": "benchmark",
+            "WEATHER_API_BASE_URL": self.url,
+            "WEATHER_API_KEY": "benchmark",
+            "OLLAMA_BASE_URL": self.url,
+            "HOME_ASSISTANT_BASE_URL": self.url,
+            "HOME_ASSISTANT_TOKEN": "benchmark",
+            # Exercise the Ollama leg of the summary instead of queueing a job.
+            "SUMMARY_LLM_MODE": "inline",
+        }
+
+
+def _series(rng: random.Random, start: dt.datetime, count: int, interval: int, metric: str) -> Iterator[tuple]:
+    _, baseline, swing, noise = BENCH_METRICS[metric]
+    for step in range(count):
+        timestamp = start + dt.timedelta(seconds=step * interval)
+        phase = 2 * math.pi * (timestamp.timestamp() % 86400) / 86400
+        yield timestamp, round(baseline + swing * math.sin(phase) + rng.gauss(0, noise), 3)
+
+
+def seed_readings(
+    *,
+    devices: int,
+    days: float,
+    interval: int = 900,
+    end: Optional[dt.datetime] = None,
+    batch_size: int = 10000,
+    seed: int = 0,
+) -> int:
+    """Create ``devices`` benchmark devices with ``days`` of readings per metric, plus latest values and rollups.
+
+    Rows are generated and written in ``batch_size`` batches, so millions of
+    readings can be seeded in constant memory; rows that already exist are
+    left alone. Returns the number of readings generated.
+    """
+
+    end = end or timezone.now().replace(minute=0, second=0, microsecond=0)
+    count = int(days * 86400 // interval)
+    start = end - dt.timedelta(seconds=count * interval)
+    rng = random.Random(seed)
+    bench_devices = [
+        SensorDevice.objects.get_or_create(
+            slug=f"{BENCH_PREFIX}{index}", defaults={"name": f"Benchmark {index}", "sensor_type": "radon"}
+        )[0]
+        for index in range(devices)
+    ]
+    rows = (
+        SensorReading(device=device, metric=metric, value=value, unit=BENCH_METRICS[metric][0], timestamp=timestamp)
+        for device in bench_devices
+        for metric in BENCH_METRICS
+        for timestamp, value in _series(rng, start, count, interval, metric)
+    )
+    written = 0
+    while batch := list(itertools.islice(rows, batch_size)):
+        SensorReading.objects.bulk_create(batch, ignore_conflicts=True)
+        written += len(batch)
+
+    last = start + dt.timedelta(seconds=(count - 1) * interval)
+    LatestReading.objects.bulk_create(
+        [
+            LatestReading(
+                device_id=row.device_id, metric=row.metric, value=row.value, unit=row.unit, timestamp=row.timestamp
+            )
+            for row in SensorReading.objects.filter(device__in=bench_devices, timestamp=last)
+        ],
+        update_conflicts=True,
+        unique_fields=["device", "metric"],
+        update_fields=["value", "unit", "timestamp"],
+    )
+    rebuild_rollups(start, end)
+    return written
+
+
+class Scenario(NamedTuple):
+    """One measured operation: ``call`` returns the number of rows it processed (0 for reads)."""
+
+    name: str
+    call: Callable[[Client], int]
+    prepare: Optional[Callable[[], None]] = None
+
+
+def _get(path: str, params: Optional[Dict[str, Any]] = None) -> Callable[[Client], int]:
+    def call(client: Client) -> int:
+        response = client.get(path, params or {})
+        if response.status_code >= 400:
+            raise RuntimeError(f"GET {path} returned {response.status_code}")
+        return 0
+
+    return call
+
+
+def build_scenarios(*, end: dt.datetime, stub_url: str, bulk_batch: int = 1000) -> Dict[str, Scenario]:
+    """The API and ingest paths measured by ``run_benchmarks``, keyed by name."""
+
+    device = f"{BENCH_PREFIX}0"
+    day = end.replace(hour=0)
+    counter = itertools.count()
+
+    def bulk_ingest(client: Client) -> int:
+        # Timestamps after the seeded range, so every batch inserts new rows.
+        base = end + dt.timedelta(seconds=next(counter) * bulk_batch)
+        readings = [
+            {
+                "device": device,
+                "metric": "radon",
+                "value": 2.0 + index % 7 / 10,
+                "timestamp": (base + dt.timedelta(seconds=index)).isoformat(),
+            }
+            for index in range(bulk_batch)
+        ]
+        response = client.post("/api/readings/bulk/", readings, content_type="application/json")
+        if response.status_code >= 400:
+            raise RuntimeError(f"Bulk ingest returned {response.status_code}")
+        return response.json()["written"]
+
+    scheduler = IngestionScheduler(
+        [AllthingsWaveClient(stub_url, "benchmark")],
+        default_interval=1,
+        discovery_interval=10**9,
+        # Every pass finds every device due.
+        clock=itertools.count(0, 3600).__next__,
+    )
+
+    def ingest_poll(client: Client) -> int:
+        before = sum(stats["rows"] for stats in scheduler.stats.values())
+        scheduler.run_pending()
+        return sum(stats["rows"] for stats in scheduler.stats.values()) - before
+
+    summary_params = {"device_id": device, **BENCH_LOCATION}
+    series = f"/api/devices/{device}/series/"
+    week = {"metric": "radon", "from": (end - dt.timedelta(days=7)).isoformat(), "to": end.isoformat(), "bucket": "15m"}
+    # Day-aligned, so the daily rollups are used.
+    quarter = {"metric": "radon", "from": (day - dt.timedelta(days=90)).isoformat(), "to": day.isoformat(), "bucket": "1d"}
+    return {
+        scenario.name: scenario
+        for scenario in (
+            Scenario("devices", _get("/api/devices/")),
+            Scenario("devices_readings", _get("/api/devices/", {"include": "readings", "limit": 100})),
+            Scenario("summary", _get("/api/summary/", summary_params)),
+            Scenario("summary_uncached", _get("/api/summary/", summary_params), prepare=cache.clear),
+            Scenario("recommendations", _get("/api/recommendations/")),
+            Scenario("series_raw", _get(series, week)),
+            Scenario("series_rollup", _get(series, quarter)),
+            Scenario("bulk_ingest", bulk_ingest),
+            Scenario("ingest_poll", ingest_poll),
+        )
+    }
+
+
+def _percentile(ordered: List[float], percent: float) -> float:
+    position = (len(ordered) - 1) * percent / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def measure(scenario: Scenario, client: Client, *, iterations: int, warmup: int = 0) -> Dict[str, Any]:
+    """Run ``scenario`` and report latency percentiles (ms), queries per call, and rows/sec."""
+
+    for _ in range(warmup):
+        if scenario.prepare:
+            scenario.prepare()
+        scenario.call(client)
+
+    timings: List[float] = []
+    queries: List[int] = []
+    rows = 0
+    for _ in range(iterations):
+        if scenario.prepare:
+            scenario.prepare()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            rows += scenario.call(client)
+            timings.append(time.perf_counter() - started)
+        queries.append(len(captured))
+
+    ordered = sorted(timings)
+    result = {
+        "iterations": iterations,
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 3),
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(_percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(_percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+        "queries_per_request": round(sum(queries) / len(queries), 2),
+        "max_queries": max(queries),
+    }
+    if rows:
+        result["rows_per_second"] = round(rows / sum(timings), 1)
+    return result
+
+
+def run_benchmarks(
+    scenarios: Dict[str, Scenario],
+    *,
+    iterations: int,
+    warmup: int = 0,
+    meta: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Measure each scenario in turn and return a JSON-serializable report."""
+
+    client = Client()
+    return {
+        "meta": {
+            "created_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "readings": SensorReading.objects.count(),
+            **(meta or {}),
+        },
+        "scenarios": {
+            name: measure(scenario, client, iterations=iterations, warmup=warmup) for name, scenario in scenarios.items()
+        },
+    }
+
+
+def compare_reports(current: Dict[str, Any], baseline: Dict[str, Any], *, threshold: float) -> List[str]:
+    """Describe every regression of ``current`` against ``baseline``; empty when within ``threshold``.
+
+    Latency (p50/p95) and throughput may move by ``threshold`` (a fraction);
+    any increase in queries per request is a regression. Scenarios missing
+    from the baseline are not compared.
+    """
+
+    regressions = []
+    for name, result in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        for key in ("p50_ms", "p95_ms"):
+            if result[key] > base[key] * (1 + threshold):
+                regressions.append(f"{name}: {key} {result[key]} > {base[key]} (+{threshold:.0%})")
+        if result["queries_per_request"] > base["queries_per_request"]:
+            regressions.append(
+                f"{name}: queries_per_request {result['queries_per_request']} > {base['queries_per_request']}"
+            )
+        rate = result.get("rows_per_second", 0)
+        if "rows_per_second" in base and rate < base["rows_per_second"] * (1 - threshold):
+            regressions.append(f"{name}: rows_per_second {rate} < {base['rows_per_second']} (-{threshold:.0%})")
+    return regressions
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import contextlib
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# One breaker per upstream dependency; the names are what /api/health/ reports.
+DEPENDENCIES = ("allthings_wave", "weather", "ollama", "home_assistant")
+BUCKETS = 6
+STATE_TTL = 86400
+# Extra life for the half-open probe lock beyond the probe's request timeout.
+PROBE_GRACE_SECONDS = 5
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a dependency whose breaker is open."""
+
+    def __init__(self, name: str, retry_in: float) -> None:
+        super().__init__(f"{name} is unavailable (circuit open, retry in {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+def is_failure(exc: BaseException) -> bool:
+    """Count outages (network errors, timeouts, 429/5xx) but not client errors such as bad credentials."""
+
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code >= 500 or exc.response.status_code == 429
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker whose state lives in the Django cache.
+
+    Calls and failures are counted in ``BUCKETS`` time buckets spanning
+    ``window`` seconds, so every worker sharing the cache sees the same
+    failure rate. At ``failure_rate`` (with at least ``min_calls`` calls) the
+    breaker opens; after ``cooldown`` seconds one caller is let through as a
+    half-open probe, whose outcome closes or re-opens the circuit (and
+    releases the probe lock; the lock also outlives the probe's request
+    timeout, so a slow probe is never joined by a second one). While
+    open, each process remembers the re-open time locally, so rejected calls
+    do not even hit the cache.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        window: Optional[float] = None,
+        min_calls: Optional[int] = None,
+        failure_rate: Optional[float] = None,
+        cooldown: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.name = name
+        self.window = window or settings.CIRCUIT_BREAKER_WINDOW_SECONDS
+        self.min_calls = min_calls or settings.CIRCUIT_BREAKER_MIN_CALLS
+        self.failure_rate = failure_rate or settings.CIRCUIT_BREAKER_FAILURE_RATE
+        self.cooldown = cooldown or settings.CIRCUIT_BREAKER_COOLDOWN_SECONDS
+        self.clock = clock
+        self._open_until = 0.0
+
+    def _key(self, suffix: str) -> str:
+        return f"breaker:{self.name}:{suffix}"
+
+    def _bucket(self, now: float) -> int:
+        return int(now // (self.window / BUCKETS))
+
+    def _incr(self, key: str) -> None:
+        cache.add(key, 0, timeout=int(self.window * 2))
+        try:
+            cache.incr(key)
+        except ValueError:  # expired between add and incr
+            cache.set(key, 1, timeout=int(self.window * 2))
+
+    def _counts(self, now: float) -> Dict[str, int]:
+        current = self._bucket(now)
+        keys = [self._key(f"{kind}:{bucket}") for bucket in range(current - BUCKETS + 1, current + 1) for kind in ("calls", "failures")]
+        values = cache.get_many(keys)
+        calls = sum(value for key, value in values.items() if ":calls:" in key)
+        failures = sum(value for key, value in values.items() if ":failures:" in key)
+        return {"calls": calls, "failures": failures}
+
+    def _reset_counts(self, now: float) -> None:
+        current = self._bucket(now)
+        cache.delete_many(
+            [self._key(f"{kind}:{bucket}") for bucket in range(current - BUCKETS + 1, current + 1) for kind in ("calls", "failures")]
+        )
+
+    def _open(self, now: float) -> None:
+        cache.set(self._key("state"), {"state": OPEN, "opened_at": now}, timeout=STATE_TTL)
+        cache.delete(self._key("probe"))
+        self._open_until = now + self.cooldown
+
+    def state(self) -> str:
+        stored = cache.get(self._key("state"))
+        if not stored:
+            return CLOSED
+        if self.clock() - stored["opened_at"] >= self.cooldown:
+            return HALF_OPEN
+        return OPEN
+
+    def before_call(self, timeout: Optional[float] = None) -> None:
+        """Raise ``CircuitOpenError`` unless a call may go through right now.
+
+        ``timeout`` is the guarded request's timeout; it sizes the half-open probe lock.
+        """
+
+        now = self.clock()
+        if now < self._open_until:
+            raise CircuitOpenError(self.name, self._open_until - now)
+        stored = cache.get(self._key("state"))
+        if not stored:
+            return
+        reopen_at = stored["opened_at"] + self.cooldown
+        if now < reopen_at:
+            self._open_until = reopen_at
+            raise CircuitOpenError(self.name, reopen_at - now)
+        # Half-open: exactly one caller (across workers) probes the dependency. The lock is
+        # released by record_success/record_failure; its expiry only covers a crashed prober.
+        probe_ttl = max(self.cooldown, (timeout or 0) + PROBE_GRACE_SECONDS, 1)
+        if not cache.add(self._key("probe"), 1, timeout=int(math.ceil(probe_ttl))):
+            raise CircuitOpenError(self.name, 0)
+
+    def record_success(self) -> None:
+        now = self.clock()
+        self._incr(self._key(f"calls:{self._bucket(now)}"))
+        if cache.get(self._key("state")):
+            cache.delete_many([self._key("state"), self._key("probe")])
+            self._reset_counts(now)
+            self._open_until = 0.0
+
+    def record_failure(self) -> None:
+        now = self.clock()
+        if cache.get(self._key("state")):
+            # A failed half-open probe re-opens the circuit for another cool-down.
+            self._open(now)
+            return
+        bucket = self._bucket(now)
+        self._incr(self._key(f"calls:{bucket}"))
+        self._incr(self._key(f"failures:{bucket}"))
+        counts = self._counts(now)
+        if counts["calls"] >= self.min_calls and counts["failures"] / counts["calls"] >= self.failure_rate:
+            self._open(now)
+
+    @contextlib.contextmanager
+    def guard(self, timeout: Optional[float] = None) -> Iterator[None]:
+        self.before_call(timeout)
+        try:
+            yield
+        except Exception as exc:
+            if is_failure(exc):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self.guard():
+            return fn(*args, **kwargs)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = self.clock()
+        counts = self._counts(now)
+        stored = cache.get(self._key("state")) or {}
+        snapshot: Dict[str, Any] = {"state": self.state(), **counts}
+        if stored:
+            snapshot["retry_in"] = round(max(0.0, stored["opened_at"] + self.cooldown - now), 1)
+        return snapshot
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Process-wide breaker for a dependency (its state is shared via the cache)."""
+
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _lock:
+            breaker = _breakers.setdefault(name, CircuitBreaker(name))
+    return breaker
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    return {name: get_breaker(name).snapshot() for name in DEPENDENCIES}
+
+
+def reset_breakers() -> None:
+    """Forget process-local breaker instances (used by tests alongside ``cache.clear()``)."""
+
+    with _lock:
+        _breakers.clear()
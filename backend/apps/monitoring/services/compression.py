@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import copy
+import datetime as dt
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+
+from ..models import LatestReading, SensorReading
+
+COMPRESSION_MODES = ("off", "deadband", "swinging_door")
+
+SeriesKey = Tuple[int, str]
+
+
+class _Series:
+    """Ingest state for one (device, metric).
+
+    ``last`` is the newest reading seen, stored or not; ``archived`` the newest
+    stored one; ``held`` an unsaved reading that is written only if the next
+    reading shows it was a turning point. ``high``/``low`` bound the slopes
+    from ``archived`` that keep every skipped reading within the deviation.
+    """
+
+    __slots__ = ("last", "archived", "held", "high", "low")
+
+    def __init__(self) -> None:
+        self.last: Optional[Tuple[dt.datetime, float]] = None
+        self.archived: Optional[Tuple[dt.datetime, float]] = None
+        self.held: Optional[SensorReading] = None
+        self.high = float("inf")
+        self.low = float("-inf")
+
+    def archive(self, row: SensorReading) -> None:
+        self.archived = (row.timestamp, row.value)
+        self.held = None
+        self.high, self.low = float("inf"), float("-inf")
+
+    def narrow(self, row: SensorReading, deviation: float) -> None:
+        elapsed = (row.timestamp - self.archived[0]).total_seconds()
+        self.high = min(self.high, (row.value + deviation - self.archived[1]) / elapsed)
+        self.low = max(self.low, (row.value - deviation - self.archived[1]) / elapsed)
+
+
+class ReadingDeduper:
+    """Per-(device, metric) last-value cache that thins out the ingest write path.
+
+    A reading repeating the newest timestamp with the same value is dropped
+    outright, so re-polling an unchanged ``latest`` endpoint writes nothing.
+    With ``mode`` ``deadband`` or ``swinging_door`` and a deviation configured
+    for the metric, newer readings are stored only when needed to reconstruct
+    the series within that deviation by interpolation (see ``fill_series``);
+    at least one reading is stored every ``max_gap`` seconds. Readings that
+    are not stored still advance ``LatestReading``. Backfills older than the
+    newest reading always pass through.
+
+    State is primed from ``LatestReading`` and the newest stored reading the
+    first time a series is seen, and only advances when the write commits.
+    """
+
+    def __init__(
+        self,
+        *,
+        mode: Optional[str] = None,
+        deviations: Optional[Dict[str, float]] = None,
+        max_gap: Optional[float] = None,
+    ) -> None:
+        self.mode = mode or settings.READING_COMPRESSION
+        if self.mode not in COMPRESSION_MODES:
+            raise ValueError(f"Unknown compression mode {self.mode!r}; choose from {', '.join(COMPRESSION_MODES)}")
+        self.deviations = deviations if deviations is not None else settings.READING_COMPRESSION_DEVIATIONS
+        self.max_gap = max_gap or settings.READING_COMPRESSION_MAX_GAP_SECONDS
+        self.duplicates = 0
+        self.compressed = 0
+        self._series: Dict[SeriesKey, _Series] = {}
+
+    def prime(self, keys: Iterable[SeriesKey]) -> None:
+        """Load state for series not seen yet from the latest and newest stored readings."""
+
+        missing: Set[SeriesKey] = set(keys) - self._series.keys()
+        if not missing:
+            return
+        device_ids = {device_id for device_id, _ in missing}
+        metrics = {metric for _, metric in missing}
+        latest = {
+            (row.device_id, row.metric): row
+            for row in LatestReading.objects.filter(device_id__in=device_ids, metric__in=metrics)
+        }
+        newest = {
+            (row["device_id"], row["metric"]): row["newest"]
+            for row in SensorReading.objects.filter(device_id__in=device_ids, metric__in=metrics)
+            .values("device_id", "metric")
+            .annotate(newest=Max("timestamp"))
+            .order_by()
+        }
+        stored = {
+            (device_id, metric): (timestamp, value)
+            for device_id, metric, timestamp, value in SensorReading.objects.filter(
+                device_id__in=device_ids, metric__in=metrics, timestamp__in=set(newest.values())
+            ).values_list("device_id", "metric", "timestamp", "value")
+            if newest.get((device_id, metric)) == timestamp
+        }
+        for key in missing:
+            series = self._series[key] = _Series()
+            series.archived = stored.get(key)
+            current = latest.get(key)
+            if current is None:
+                series.last = series.archived
+                continue
+            series.last = (current.timestamp, current.value)
+            if series.archived is None or current.timestamp > series.archived[0]:
+                # The latest value was held back before a restart; keep holding it.
+                series.held = SensorReading(
+                    device_id=current.device_id,
+                    metric=current.metric,
+                    value=current.value,
+                    unit=current.unit,
+                    timestamp=current.timestamp,
+                )
+
+    def apply(self, rows: Iterable[SensorReading]) -> Tuple[List[SensorReading], List[SensorReading]]:
+        """Split ``rows`` into those to store and those that advance ``LatestReading``."""
+
+        rows = sorted(rows, key=lambda row: row.timestamp)
+        self.prime((row.device_id, row.metric) for row in rows)
+        working: Dict[SeriesKey, _Series] = {}
+        store: List[SensorReading] = []
+        latest: List[SensorReading] = []
+        duplicates = compressed = 0
+
+        for row in rows:
+            key = (row.device_id, row.metric)
+            if key not in working:
+                working[key] = copy.copy(self._series[key])
+            series = working[key]
+
+            if series.last is not None and row.timestamp < series.last[0]:
+                store.append(row)
+                latest.append(row)
+                continue
+            if series.last is not None and row.timestamp == series.last[0]:
+                if row.value == series.last[1]:
+                    duplicates += 1
+                    continue
+                # A corrected value for the newest timestamp is always stored.
+                store.append(row)
+                latest.append(row)
+                series.last = (row.timestamp, row.value)
+                series.archive(row)
+                continue
+
+            latest.append(row)
+            series.last = (row.timestamp, row.value)
+            deviation = self.deviations.get(row.metric) if self.mode != "off" else None
+            if deviation is None or series.archived is None:
+                store.append(row)
+                series.archive(row)
+                continue
+
+            gap = (row.timestamp - series.archived[0]).total_seconds() >= self.max_gap
+            if self.mode == "deadband":
+                if gap or abs(row.value - series.archived[1]) > deviation:
+                    # Store the last in-band value too, so the step is kept.
+                    if series.held is not None:
+                        store.append(series.held)
+                    store.append(row)
+                    series.archive(row)
+                else:
+                    if series.held is not None:
+                        compressed += 1
+                    series.held = row
+                continue
+
+            # Swinging door: hold the newest reading while a line from the
+            # archived point can still pass within ``deviation`` of all of them.
+            if series.held is None:
+                series.held = row
+                series.narrow(row, deviation)
+                continue
+            series.narrow(row, deviation)
+            if gap or series.low > series.high:
+                held = series.held
+                store.append(held)
+                series.archive(held)
+                series.held = row
+                series.narrow(row, deviation)
+            else:
+                compressed += 1
+                series.held = row
+
+        def commit() -> None:
+            self._series.update(working)
+            self.duplicates += duplicates
+            self.compressed += compressed
+
+        transaction.on_commit(commit)
+        return store, latest
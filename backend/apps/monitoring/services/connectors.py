@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from importlib.metadata import entry_points
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .base import SensorConnector
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "home_monitor.connectors"
+STATS_KEY = "ingest:connector-stats:{slug}"
+
+
+def connector_classes() -> Dict[str, Type[SensorConnector]]:
+    """Registered connector classes by slug.
+
+    ``SENSOR_CONNECTORS`` (dotted paths) comes first; installed packages can add
+    more through the ``home_monitor.connectors`` entry point group. A slug that
+    is already registered is not replaced. Connectors that cannot be imported are
+    logged and skipped, so one broken plugin does not take down the others.
+    """
+
+    classes: Dict[str, Type[SensorConnector]] = {}
+    for path in settings.SENSOR_CONNECTORS:
+        try:
+            cls = import_string(path)
+        except ImportError:
+            logger.exception("Could not import connector %s", path)
+            continue
+        classes.setdefault(cls.slug, cls)
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        try:
+            cls = entry_point.load()
+        except Exception:
+            logger.exception("Could not load connector entry point %s", entry_point.name)
+            continue
+        classes.setdefault(cls.slug, cls)
+    return classes
+
+
+def rate_limit_for(connector: SensorConnector) -> Optional[float]:
+    """Requests per second allowed for ``connector``; ``CONNECTOR_RATE_LIMITS`` overrides the class value."""
+
+    return settings.CONNECTOR_RATE_LIMITS.get(connector.slug, connector.rate_limit)
+
+
+def build_connectors() -> List[SensorConnector]:
+    """Instantiate every registered connector that is configured."""
+
+    connectors: List[SensorConnector] = []
+    for cls in connector_classes().values():
+        connector = cls.from_settings()
+        if connector is not None:
+            connectors.append(connector)
+    return connectors
+
+
+class RateLimiter:
+    """Thread-safe request spacing: at most ``rate`` acquisitions per second.
+
+    ``acquire`` reserves the next free slot under the lock and sleeps outside
+    it, so concurrent callers queue up in order without holding each other up.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.interval = 1.0 / rate
+        self.clock = clock
+        self.sleep = sleep
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a request may be made and return how long that took."""
+
+        with self._lock:
+            now = self.clock()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        wait = slot - now
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+
+def record_connector_stats(slug: str, stats: Dict[str, Any]) -> None:
+    """Publish a connector's poll metrics through the cache for the API process to read."""
+
+    cache.set(STATS_KEY.format(slug=slug), {**stats, "updated_at": timezone.now().isoformat()}, None)
+
+
+def connector_stats() -> Dict[str, Dict[str, Any]]:
+    """Registered connectors with their configuration and last published poll metrics."""
+
+    result: Dict[str, Dict[str, Any]] = {}
+    for slug, cls in connector_classes().items():
+        result[slug] = {
+            "class": f"{cls.__module__}.{cls.__qualname__}",
+            "rate_limit": settings.CONNECTOR_RATE_LIMITS.get(slug, cls.rate_limit),
+            "stats": cache.get(STATS_KEY.format(slug=slug)),
+        }
+    return result
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import csv
+import datetime as dt
+import io
+import json
+from itertools import islice
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import QuerySet
+
+from ..models import SensorDevice, SensorReading
+
+EXPORT_COLUMNS = ("device", "metric", "value", "unit", "timestamp")
+
+Row = Tuple[str, str, float, str, dt.datetime]
+
+
+def export_queryset(
+    *,
+    device: Optional[SensorDevice] = None,
+    metric: Optional[str] = None,
+    start: Optional[dt.datetime] = None,
+    end: Optional[dt.datetime] = None,
+) -> QuerySet:
+    """Readings in ``[start, end)`` as ``EXPORT_COLUMNS`` tuples.
+
+    Ordered by (device, metric, timestamp) so the database can walk the
+    ``unique_sensor_reading`` index instead of sorting the whole range.
+    """
+
+    readings = SensorReading.objects.all()
+    if device is not None:
+        readings = readings.filter(device=device)
+    if metric:
+        readings = readings.filter(metric=metric)
+    if start is not None:
+        readings = readings.filter(timestamp__gte=start)
+    if end is not None:
+        readings = readings.filter(timestamp__lt=end)
+    return readings.order_by("device_id", "metric", "timestamp").values_list("device__slug", *EXPORT_COLUMNS[1:])
+
+
+class CsvEncoder:
+    content_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self) -> None:
+        self.rows = 0
+
+    def begin(self) -> bytes:
+        return (",".join(EXPORT_COLUMNS) + "\r\n").encode()
+
+    def encode(self, rows: List[Row]) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for device, metric, value, unit, timestamp in rows:
+            writer.writerow((device, metric, value, unit, timestamp.isoformat()))
+        self.rows += len(rows)
+        return buffer.getvalue().encode()
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class NdjsonEncoder:
+    content_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def __init__(self) -> None:
+        self.rows = 0
+
+    def begin(self) -> bytes:
+        return b""
+
+    def encode(self, rows: List[Row]) -> bytes:
+        lines = [
+            json.dumps(
+                {"device": device, "metric": metric, "value": value, "unit": unit, "timestamp": timestamp.isoformat()}
+            )
+            for device, metric, value, unit, timestamp in rows
+        ]
+        self.rows += len(rows)
+        return ("\n".join(lines) + "\n").encode() if lines else b""
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class _Drain:
+    """Write-only file object that hands written bytes back to the caller as they arrive."""
+
+    closed = False
+
+    def __init__(self) -> None:
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def take(self) -> bytes:
+        data, self.chunks = b"".join(self.chunks), []
+        return data
+
+
+class ParquetEncoder:
+    """Writes one Parquet row group per ``row_group_size`` rows and returns the bytes as each completes."""
+
+    content_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def __init__(self, row_group_size: Optional[int] = None) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:  # pragma: no cover - depends on the environment
+            raise ImproperlyConfigured("pyarrow is required for Parquet export (pip install pyarrow)") from exc
+
+        self.pa = pa
+        self.row_group_size = row_group_size or settings.EXPORT_PARQUET_ROW_GROUP_SIZE
+        self.schema = pa.schema(
+            [
+                ("device", pa.string()),
+                ("metric", pa.string()),
+                ("value", pa.float64()),
+                ("unit", pa.string()),
+                ("timestamp", pa.timestamp("us", tz="UTC")),
+            ]
+        )
+        self.rows = 0
+        self._pending: List[Row] = []
+        self._sink = _Drain()
+        self._writer = pq.ParquetWriter(pa.PythonFile(self._sink, mode="w"), self.schema, compression="zstd")
+
+    def _write_group(self, rows: List[Row]) -> None:
+        arrays = [self.pa.array(column, type=field.type) for column, field in zip(zip(*rows), self.schema)]
+        self._writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema), row_group_size=self.row_group_size)
+        self.rows += len(rows)
+
+    def begin(self) -> bytes:
+        return self._sink.take()
+
+    def encode(self, rows: List[Row]) -> bytes:
+        self._pending.extend(rows)
+        while len(self._pending) >= self.row_group_size:
+            group, self._pending = self._pending[: self.row_group_size], self._pending[self.row_group_size :]
+            self._write_group(group)
+        return self._sink.take()
+
+    def finish(self) -> bytes:
+        if self._pending:
+            self._write_group(self._pending)
+            self._pending = []
+        self._writer.close()
+        return self._sink.take()
+
+
+EXPORT_FORMATS = {"csv": CsvEncoder, "ndjson": NdjsonEncoder, "parquet": ParquetEncoder}
+
+
+def encoder_for(format: str):
+    """Return a fresh encoder for ``format``; raises ``ValueError`` for unknown formats."""
+
+    try:
+        return EXPORT_FORMATS[format]()
+    except KeyError:
+        raise ValueError(f"Unknown export format {format!r}; choose from {', '.join(EXPORT_FORMATS)}") from None
+
+
+def _batches(rows: Iterable[Row], size: int) -> Iterator[List[Row]]:
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def export_chunks(readings: QuerySet, encoder, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+    """Encode ``readings`` chunk by chunk from a server-side cursor, in constant memory."""
+
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    if head := encoder.begin():
+        yield head
+    for batch in _batches(readings.iterator(chunk_size=chunk_size), chunk_size):
+        if data := encoder.encode(batch):
+            yield data
+    if tail := encoder.finish():
+        yield tail
+
+
+async def aexport_chunks(readings: QuerySet, encoder, chunk_size: Optional[int] = None) -> AsyncIterator[bytes]:
+    """``export_chunks`` for async views: each cursor fetch runs in the sync thread, off the event loop."""
+
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    # QuerySet.aiterator() runs values_list() queries on the event loop in Django 5.0,
+    # so drive the sync server-side cursor from the thread-sensitive executor instead.
+    rows = readings.iterator(chunk_size=chunk_size)
+    fetch = sync_to_async(lambda: list(islice(rows, chunk_size)))
+    if head := encoder.begin():
+        yield head
+    while batch := await fetch():
+        if data := encoder.encode(batch):
+            yield data
+    if tail := encoder.finish():
+        yield tail
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+# Slow legs (the inline Ollama call) get their own bounded pool, so a backlog of
+# late generations can never occupy the threads the fast legs need.
+POOL_SETTINGS = {"default": "SUMMARY_FANOUT_WORKERS", "llm": "SUMMARY_LLM_WORKERS"}
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def _get_executor(pool: str) -> ThreadPoolExecutor:
+    executor = _executors.get(pool)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(pool)
+            if executor is None:
+                executor = _executors[pool] = ThreadPoolExecutor(
+                    max_workers=getattr(settings, POOL_SETTINGS[pool]),
+                    thread_name_prefix=f"summary-fanout-{pool}",
+                )
+    return executor
+
+
+def reset_executors(wait: bool = False) -> None:
+    """Shut the pools down; the next fan-out creates them from the current settings."""
+
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+
+class FanOut:
+    """Run independent upstream calls concurrently within an overall time budget.
+
+    Each leg has its own deadline (capped by the budget). ``collect`` returns the
+    results of legs that finished in time plus the names of late and failed legs.
+    Late legs that never started are cancelled; running ones keep their thread
+    until their own request timeout fires, so legs should be given ``remaining()``
+    as that timeout.
+    """
+
+    def __init__(self, budget: float, executor: Optional[ThreadPoolExecutor] = None) -> None:
+        self.budget = budget
+        self.executor = executor
+        self.started = time.monotonic()
+        self._legs: Dict[str, Tuple[Future, float]] = {}
+
+    def remaining(self, deadline: Optional[float] = None) -> float:
+        """Seconds left before ``deadline`` (capped by the budget) runs out."""
+
+        return max(0.0, self.started + min(deadline or self.budget, self.budget) - time.monotonic())
+
+    def submit(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        deadline: Optional[float] = None,
+        pool: str = "default",
+        **kwargs: Any,
+    ) -> Future:
+        executor = self.executor or _get_executor(pool)
+        # Run in a copy of the caller's context so legs are attributed to the request's timings.
+        future = executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+        self._legs[name] = (future, min(deadline or self.budget, self.budget))
+        return future
+
+    def collect(self) -> Tuple[Dict[str, Any], List[str], Dict[str, str]]:
+        results: Dict[str, Any] = {}
+        late: List[str] = []
+        failed: Dict[str, str] = {}
+        for name, (future, deadline) in self._legs.items():
+            try:
+                results[name] = future.result(timeout=self.remaining(deadline))
+            except FutureTimeout:
+                future.cancel()
+                late.append(name)
+            except Exception as exc:
+                failed[name] = str(exc)
+        return results, late, failed
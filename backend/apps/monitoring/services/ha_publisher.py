@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from ..models import SensorReading
+from .home_assistant import HomeAssistantClient
+
+logger = logging.getLogger(__name__)
+
+
+class StateUpdate(NamedTuple):
+    entity_id: str
+    metric: str
+    state: Any
+    attributes: Dict[str, Any]
+
+
+def entity_id_for(device_slug: str, metric: str) -> str:
+    return f"sensor.{metric}_{device_slug}".replace("-", "_")
+
+
+class HomeAssistantPublisher:
+    """Coalescing outbound queue of sensor states for Home Assistant.
+
+    ``enqueue`` only records the newest state per ``entity_id``; ``flush``
+    drops updates within the metric's deadband of the last published state
+    (unless ``republish`` seconds have passed) and POSTs the rest over the
+    shared keep-alive session with at most ``concurrency`` requests in flight.
+    ``start`` runs ``flush`` every ``flush_interval`` seconds on a daemon
+    thread, so callers never wait on Home Assistant.
+    """
+
+    def __init__(
+        self,
+        client: HomeAssistantClient,
+        *,
+        deadbands: Optional[Dict[str, float]] = None,
+        republish: Optional[float] = None,
+        concurrency: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.client = client
+        self.deadbands = deadbands if deadbands is not None else settings.HOME_ASSISTANT_DEADBANDS
+        self.republish = republish or settings.HOME_ASSISTANT_REPUBLISH_SECONDS
+        self.concurrency = concurrency or settings.HOME_ASSISTANT_PUBLISH_CONCURRENCY
+        self.flush_interval = flush_interval or settings.HOME_ASSISTANT_FLUSH_SECONDS
+        self.clock = clock
+        self._pending: Dict[str, StateUpdate] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def enqueue(self, update: StateUpdate) -> None:
+        with self._lock:
+            self._pending[update.entity_id] = update
+
+    def enqueue_readings(self, rows: Iterable[SensorReading]) -> None:
+        for row in rows:
+            device = row.device
+            self.enqueue(
+                StateUpdate(
+                    entity_id=entity_id_for(device.slug, row.metric),
+                    metric=row.metric,
+                    state=row.value,
+                    attributes={
+                        "unit_of_measurement": row.unit,
+                        "friendly_name": f"{device.name} {row.metric.replace('_', ' ').title()}",
+                        "measured_at": row.timestamp.isoformat(),
+                    },
+                )
+            )
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _published_key(self, entity_id: str) -> str:
+        return f"ha:published:{entity_id}"
+
+    def _changed(self, update: StateUpdate) -> bool:
+        last = cache.get(self._published_key(update.entity_id))
+        if last is None or self.clock() - last["at"] >= self.republish:
+            return True
+        try:
+            return abs(float(update.state) - float(last["state"])) >= self.deadbands.get(update.metric, 0.0) and update.state != last["state"]
+        except (TypeError, ValueError):
+            return update.state != last["state"]
+
+    def _send(self, update: StateUpdate) -> bool:
+        try:
+            self.client.publish_sensor_state(update.entity_id, update.state, update.attributes)
+        except Exception:
+            logger.warning("Publishing %s to Home Assistant failed", update.entity_id, exc_info=True)
+            with self._lock:
+                # Retry on the next flush unless a newer state has been queued meanwhile.
+                self._pending.setdefault(update.entity_id, update)
+            return False
+        cache.set(self._published_key(update.entity_id), {"state": update.state, "at": self.clock()}, timeout=None)
+        return True
+
+    def flush(self) -> Dict[str, int]:
+        """Publish every pending update that moved beyond its deadband."""
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        due: List[StateUpdate] = [update for update in pending.values() if self._changed(update)]
+        sent = 0
+        if due:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="ha-publish") as pool:
+                sent = sum(pool.map(self._send, due))
+        return {"queued": len(pending), "published": sent, "skipped": len(pending) - len(due), "failed": len(due) - sent}
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="ha-publisher", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self) -> None:  # pragma: no cover - background loop
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Home Assistant flush failed")
+
+
+_publisher: Optional[HomeAssistantPublisher] = None
+_publisher_lock = threading.Lock()
+
+
+def get_publisher() -> Optional[HomeAssistantPublisher]:
+    """Process-wide publisher (started on first use), or ``None`` when Home Assistant is not configured."""
+
+    global _publisher
+    if not settings.HOME_ASSISTANT_TOKEN:
+        return None
+    with _publisher_lock:
+        if _publisher is None:
+            _publisher = HomeAssistantPublisher(
+                HomeAssistantClient(
+                    settings.HOME_ASSISTANT_BASE_URL,
+                    settings.HOME_ASSISTANT_TOKEN,
+                    timeout=settings.HOME_ASSISTANT_TIMEOUT_SECONDS,
+                )
+            )
+            _publisher.start()
+    return _publisher
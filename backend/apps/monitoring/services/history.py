@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import bisect
+import datetime as dt
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from django.db.models import Avg, Count, FloatField, Func, IntegerField, Max, Min, Sum
+
+from ..models import LatestReading, SensorDevice, SensorReading, SensorReadingDaily, SensorReadingHourly
+
+AGGREGATES = {
+    "avg": Avg,
+    "min": Min,
+    "max": Max,
+    "sum": Sum,
+    "count": Count,
+}
+
+FILL_MODES = ("none", "linear", "previous")
+
+_BUCKET_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+_BUCKET_RE = re.compile(r"^(\d+)([smhdw])$")
+
+
+def parse_bucket(raw: str) -> int:
+    """Translate a bucket spec such as ``15m``, ``1h`` or ``1d`` into seconds."""
+
+    match = _BUCKET_RE.match(raw.strip().lower())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid bucket {raw!r}; use e.g. 30s, 15m, 1h, 1d or 1w")
+    return int(match.group(1)) * _BUCKET_UNITS[match.group(2)]
+
+
+def parse_aggregates(raw: str) -> List[str]:
+    names = [name.strip().lower() for name in raw.split(",") if name.strip()]
+    unknown = [name for name in names if name not in AGGREGATES]
+    if unknown or not names:
+        raise ValueError(f"Unsupported aggregate(s) {unknown or raw!r}; choose from {', '.join(AGGREGATES)}")
+    return names
+
+
+class EpochBucket(Func):
+    """Floor a timestamp to the start of its ``seconds``-wide bucket, as Unix epoch seconds.
+
+    Buckets are aligned to the Unix epoch (UTC), so ``1h``/``1d`` match
+    ``date_trunc('hour'|'day', ...)`` in UTC while still allowing widths like ``15m``.
+    """
+
+    output_field = IntegerField()
+
+    def __init__(self, expression: Any, seconds: int, **extra: Any) -> None:
+        self.seconds = int(seconds)
+        super().__init__(expression, **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):  # pragma: no cover - unsupported backends
+        raise NotImplementedError(f"EpochBucket is not implemented for {connection.vendor}")
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler,
+            connection,
+            template=f"((CAST(strftime('%%%%s', %(expressions)s) AS INTEGER) / {self.seconds}) * {self.seconds})",
+            **extra_context,
+        )
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler,
+            connection,
+            template=f"(FLOOR(EXTRACT(EPOCH FROM %(expressions)s) / {self.seconds}) * {self.seconds})::bigint",
+            **extra_context,
+        )
+
+
+# How each aggregate is re-derived from rollup columns.
+ROLLUP_AGGREGATES = {
+    "avg": lambda: Sum("sum", output_field=FloatField()) / Sum("count", output_field=FloatField()),
+    "min": lambda: Min("min", output_field=FloatField()),
+    "max": lambda: Max("max", output_field=FloatField()),
+    "sum": lambda: Sum("sum", output_field=FloatField()),
+    "count": lambda: Sum("count"),
+}
+
+ROLLUP_SOURCES = (
+    ("daily", SensorReadingDaily, 86400),
+    ("hourly", SensorReadingHourly, 3600),
+)
+
+
+def _aligned(value: dt.datetime, seconds: int) -> bool:
+    return int(value.timestamp()) % seconds == 0 and value.microsecond == 0
+
+
+def select_source(start: dt.datetime, end: dt.datetime, bucket_seconds: int) -> str:
+    """Pick the coarsest table whose buckets nest exactly inside the requested ones."""
+
+    for name, _, width in ROLLUP_SOURCES:
+        if bucket_seconds % width == 0 and _aligned(start, width) and _aligned(end, width):
+            return name
+    return "raw"
+
+
+def plan_sources(
+    start: dt.datetime, end: dt.datetime, bucket_seconds: int, horizon: Optional[dt.datetime] = None
+) -> List[Tuple[str, dt.datetime, dt.datetime]]:
+    """Split ``[start, end)`` into ``(source, start, end)`` segments to query.
+
+    Raw readings before the retention ``horizon`` may have been purged, so that
+    part is always read from a rollup: the coarsest one whose buckets nest in the
+    requested ones (hourly when none does), widened to whole rollup buckets. The
+    rest of the range uses ``select_source``.
+    """
+
+    if horizon is None or start >= horizon:
+        return [(select_source(start, end, bucket_seconds), start, end)]
+    name, width = next(
+        ((name, width) for name, _, width in ROLLUP_SOURCES if bucket_seconds % width == 0), ("hourly", 3600)
+    )
+    floored = dt.datetime.fromtimestamp(int(start.timestamp()) // width * width, tz=dt.timezone.utc)
+    segments = [(name, floored, min(end, horizon))]
+    if end > horizon:
+        segments.append((select_source(horizon, end, bucket_seconds), horizon, end))
+    return segments
+
+
+def query_series(
+    device: SensorDevice,
+    metric: str,
+    *,
+    start: dt.datetime,
+    end: dt.datetime,
+    bucket_seconds: int,
+    aggregates: Sequence[str] = ("avg",),
+    source: str = "raw",
+) -> List[Dict[str, Any]]:
+    """Return one row per non-empty bucket with the requested aggregates, oldest first.
+
+    ``source`` selects raw readings or the ``hourly``/``daily`` rollup tables
+    (see ``select_source``); rollups return the same aggregates from far fewer rows.
+    """
+
+    if source == "raw":
+        annotations = {
+            name: AGGREGATES[name]("value") if name == "count" else AGGREGATES[name]("value", output_field=FloatField())
+            for name in aggregates
+        }
+        queryset = SensorReading.objects.filter(device=device, metric=metric, timestamp__gte=start, timestamp__lt=end)
+        time_field = "timestamp"
+    else:
+        model = next(model for name, model, _ in ROLLUP_SOURCES if name == source)
+        annotations = {name: ROLLUP_AGGREGATES[name]() for name in aggregates}
+        queryset = model.objects.filter(device=device, metric=metric, bucket_start__gte=start, bucket_start__lt=end)
+        time_field = "bucket_start"
+
+    rows = (
+        queryset.annotate(bucket=EpochBucket(time_field, bucket_seconds))
+        .values("bucket")
+        .annotate(**annotations)
+        .order_by("bucket")
+    )
+    return [
+        {
+            "timestamp": dt.datetime.fromtimestamp(row["bucket"], tz=dt.timezone.utc).isoformat(),
+            **{name: row[name] for name in aggregates},
+        }
+        for row in rows
+    ]
+
+
+def _combine(first: Dict[str, Any], second: Dict[str, Any]) -> Dict[str, Any]:
+    # One bucket straddling the retention horizon, read partly from rollups and partly raw.
+    combined = dict(first, count=first["count"] + second["count"], sum=first["sum"] + second["sum"])
+    combined["avg"] = combined["sum"] / combined["count"] if combined["count"] else None
+    for name, pick in (("min", min), ("max", max)):
+        if name in first:
+            combined[name] = pick(first[name], second[name])
+    return combined
+
+
+def query_plan(
+    device: SensorDevice,
+    metric: str,
+    plan: Sequence[Tuple[str, dt.datetime, dt.datetime]],
+    *,
+    bucket_seconds: int,
+    aggregates: Sequence[str] = ("avg",),
+) -> List[Dict[str, Any]]:
+    """``query_series`` over every segment of ``plan_sources``, merging buckets split between segments."""
+
+    if len(plan) == 1:
+        source, start, end = plan[0]
+        return query_series(
+            device, metric, start=start, end=end, bucket_seconds=bucket_seconds, aggregates=aggregates, source=source
+        )
+    needed = list(dict.fromkeys([*aggregates, "sum", "count"]))
+    merged: Dict[str, Dict[str, Any]] = {}
+    for source, start, end in plan:
+        for point in query_series(
+            device, metric, start=start, end=end, bucket_seconds=bucket_seconds, aggregates=needed, source=source
+        ):
+            current = merged.get(point["timestamp"])
+            merged[point["timestamp"]] = point if current is None else _combine(current, point)
+    return [
+        {"timestamp": timestamp, **{name: point[name] for name in aggregates}} for timestamp, point in merged.items()
+    ]
+
+
+def parse_fill(raw: str) -> str:
+    fill = raw.strip().lower()
+    if fill not in FILL_MODES:
+        raise ValueError(f"Unsupported fill {raw!r}; choose from {', '.join(FILL_MODES)}")
+    return fill
+
+
+def series_anchors(device: SensorDevice, metric: str, start: dt.datetime, end: dt.datetime) -> List[Tuple[int, float]]:
+    """Stored values just outside ``[start, end)`` plus the latest value, as ``(epoch, value)`` pairs.
+
+    Compressed series may have no stored reading inside a long range, so fills
+    interpolate towards these neighbours; the latest value can be newer than
+    anything stored while the compressor is holding it.
+    """
+
+    readings = SensorReading.objects.filter(device=device, metric=metric)
+    anchors = []
+    before = readings.filter(timestamp__lt=start).order_by("-timestamp").values_list("timestamp", "value").first()
+    after = readings.filter(timestamp__gte=end).order_by("timestamp").values_list("timestamp", "value").first()
+    latest = LatestReading.objects.filter(device=device, metric=metric).values_list("timestamp", "value").first()
+    for anchor in (before, after, latest):
+        if anchor is not None:
+            anchors.append((int(anchor[0].timestamp()), anchor[1]))
+    return anchors
+
+
+def _known_value(point: Dict[str, Any]) -> Optional[float]:
+    if point.get("avg") is not None:
+        return point["avg"]
+    if point.get("min") is not None and point.get("max") is not None:
+        return (point["min"] + point["max"]) / 2
+    return None
+
+
+def fill_series(
+    points: List[Dict[str, Any]],
+    *,
+    start: dt.datetime,
+    end: dt.datetime,
+    bucket_seconds: int,
+    aggregates: Sequence[str],
+    fill: str,
+    anchors: Sequence[Tuple[int, float]] = (),
+) -> List[Dict[str, Any]]:
+    """Add a point for each empty bucket that lies between known values.
+
+    ``linear`` interpolates between the neighbouring values (matching how a
+    swinging-door compressed series is reconstructed); ``previous`` holds the
+    last value (matching deadband storage). Known values are bucket averages at
+    the bucket start plus ``anchors``; nothing is extrapolated past them. Filled
+    points carry the estimate as ``avg``/``min``/``max``, a zero ``count``, no
+    ``sum``, and ``"filled": true``.
+    """
+
+    if fill == "none":
+        return points
+    present = {int(dt.datetime.fromisoformat(point["timestamp"]).timestamp()): point for point in points}
+    values = dict(anchors)
+    values.update(
+        {epoch: value for epoch, point in present.items() if (value := _known_value(point)) is not None}
+    )
+    known = sorted(values.items())
+    if not known:
+        return points
+    times = [epoch for epoch, _ in known]
+
+    filled = []
+    first = int(start.timestamp()) // bucket_seconds * bucket_seconds
+    for bucket in range(first, int(end.timestamp()), bucket_seconds):
+        if bucket in present:
+            filled.append(present[bucket])
+            continue
+        index = bisect.bisect_right(times, bucket)
+        if index == 0 or index == len(known):
+            continue
+        (before_time, before_value), (after_time, after_value) = known[index - 1], known[index]
+        if fill == "previous":
+            value = before_value
+        else:
+            value = before_value + (after_value - before_value) * (bucket - before_time) / (after_time - before_time)
+        estimate = {
+            "avg": value,
+            "min": value,
+            "max": value,
+            "sum": None,
+            "count": 0,
+        }
+        filled.append(
+            {
+                "timestamp": dt.datetime.fromtimestamp(bucket, tz=dt.timezone.utc).isoformat(),
+                **{name: estimate[name] for name in aggregates},
+                "filled": True,
+            }
+        )
+    return filled
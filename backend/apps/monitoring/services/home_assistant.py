@@ -4,6 +4,10 @@ from typing import Any, Dict, Optional
 
 import requests
 
+from .breaker import CircuitBreaker, get_breaker
+from .http import get_session
+from .metrics import track_upstream
+
 
 class HomeAssistantClient:
     """Push updates to Home Assistant sensor entities."""
@@ -14,32 +18,35 @@ class HomeAssistantClient:
         token: str,
         timeout: int = 10,
         session: Optional[requests.Session] = None,
+        breaker: Optional[CircuitBreaker] = None,
     ) -> None:
         if not token:
             raise ValueError("Home Assistant token is required")
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
-        self.session = session or requests.Session()
+        # Setting an entity state is idempotent, so POSTs may be retried too.
+        self.session = session or get_session(self.base_url, retry_methods=("POST",))
+        self.breaker = breaker or get_breaker("home_assistant")
         self.headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
         }
 
+    def _post(self, path: str, payload: Dict[str, Any], *, endpoint: str) -> None:
+        with track_upstream("home_assistant", self.base_url, endpoint, "POST") as call, self.breaker.guard(self.timeout):
+            response = call.observe(
+                self.session.post(
+                    f"{self.base_url}{path}",
+                    json=payload,
+                    timeout=self.timeout,
+                    headers=self.headers,
+                )
+            )
+            response.raise_for_status()
+
     def publish_sensor_state(self, entity_id: str, state: Any, attributes: Optional[Dict[str, Any]] = None) -> None:
         payload = {"state": state, "attributes": attributes or {}}
-        response = self.session.post(
-            f"{self.base_url}/api/states/{entity_id}",
-            json=payload,
-            timeout=self.timeout,
-            headers=self.headers,
-        )
-        response.raise_for_status()
+        self._post(f"/api/states/{entity_id}", payload, endpoint="/api/states/{entity_id}")
 
     def trigger_event(self, event_type: str, data: Optional[Dict[str, Any]] = None) -> None:
-        response = self.session.post(
-            f"{self.base_url}/api/events/{event_type}",
-            json=data or {},
-            timeout=self.timeout,
-            headers=self.headers,
-        )
-        response.raise_for_status()
+        self._post(f"/api/events/{event_type}", data or {}, endpoint="/api/events/{event_type}")
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import random
+import socket
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_sessions: Dict[Tuple[str, frozenset], requests.Session] = {}
+_lock = threading.Lock()
+
+
+class JitteredRetry(Retry):
+    """``Retry`` with full-jitter exponential backoff and a cap on ``Retry-After``.
+
+    Jitter spreads out retries from concurrent workers hitting the same
+    provider; the cap keeps a hostile ``Retry-After`` from stalling a request.
+    """
+
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time()
+        return random.uniform(0, backoff) if backoff else 0.0
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, settings.HTTP_RETRY_AFTER_MAX_SECONDS)
+
+
+class PooledAdapter(HTTPAdapter):
+    """``HTTPAdapter`` whose pooled sockets send TCP keep-alive probes while idle."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        idle = settings.HTTP_KEEPALIVE_IDLE_SECONDS
+        if idle:
+            options = list(HTTPConnection.default_socket_options) + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle))
+            kwargs["socket_options"] = options
+        super().init_poolmanager(*args, **kwargs)
+
+
+def _origin(base_url: str) -> str:
+    parts = urlsplit(base_url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def build_session(retry_methods: Iterable[str] = ()) -> requests.Session:
+    retry = JitteredRetry(
+        total=settings.HTTP_RETRY_TOTAL,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {method.upper() for method in retry_methods},
+        backoff_factor=settings.HTTP_RETRY_BACKOFF_FACTOR,
+        backoff_max=settings.HTTP_RETRY_BACKOFF_MAX_SECONDS,
+        raise_on_status=False,
+    )
+    adapter = PooledAdapter(
+        pool_connections=settings.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session(base_url: str, *, retry_methods: Iterable[str] = ()) -> requests.Session:
+    """Process-wide session for ``base_url``'s origin, so connections are reused across client instances.
+
+    Idempotent methods are retried on connection errors and 429/5xx responses;
+    pass ``retry_methods`` (e.g. ``("POST",)``) to opt in others that are safe to repeat.
+    """
+
+    key = (_origin(base_url), frozenset(method.upper() for method in retry_methods))
+    session = _sessions.get(key)
+    if session is None:
+        with _lock:
+            session = _sessions.get(key)
+            if session is None:
+                session = _sessions[key] = build_session(retry_methods)
+    return session
+
+
+def close_sessions() -> None:
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,426 @@
+from __future__ import annotations
+
+import datetime as dt
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..models import LatestReading, SensorDevice, SensorReading
+from .base import SensorConnector
+from .compression import ReadingDeduper
+from .connectors import RateLimiter, rate_limit_for, record_connector_stats
+from .ha_publisher import get_publisher
+from .live import publish_readings
+from .rollups import merge_rollups, raw_retention_horizon, refresh_rollups
+
+logger = logging.getLogger(__name__)
+
+# Column limits checked before writing, so one over-long value is rejected on its own
+# instead of failing (with a DataError on PostgreSQL) the whole batch it arrived in.
+FIELD_LIMITS = {
+    "device": SensorDevice._meta.get_field("slug").max_length,
+    "metric": SensorReading._meta.get_field("metric").max_length,
+    "unit": SensorReading._meta.get_field("unit").max_length,
+}
+
+
+def parse_timestamp(raw: Any) -> dt.datetime:
+    """Coerce upstream timestamps into aware datetimes, defaulting to now."""
+
+    if raw is None:
+        return timezone.now()
+    if isinstance(raw, dt.datetime):
+        return raw if timezone.is_aware(raw) else timezone.make_aware(raw)
+    if isinstance(raw, str):
+        parsed = parse_datetime(raw.replace("Z", "+00:00"))
+        if parsed is None:
+            return timezone.now()
+        return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+    return timezone.now()
+
+
+def ensure_device_record(device_payload: Dict[str, Any], connector: Optional[SensorConnector] = None) -> SensorDevice:
+    """Create or refresh the ``SensorDevice`` row backing an upstream device.
+
+    The row is only written when one of the tracked fields actually changed.
+    """
+
+    identifier = device_payload.get("id") or device_payload.get("slug") or device_payload.get("serial")
+    if not identifier:
+        raise ValueError("Device payload missing id/slug")
+
+    metadata = dict(device_payload)
+    if connector is not None:
+        metadata.setdefault("connector", connector.slug)
+    defaults = {
+        "name": device_payload.get("name", identifier),
+        "manufacturer": device_payload.get("manufacturer", "Allthings Wave"),
+        "sensor_type": device_payload.get("sensor_type", "radon"),
+        "connection_type": "api",
+        "metadata": metadata,
+    }
+    device = SensorDevice.objects.filter(slug=identifier).first()
+    if device is None:
+        device, _ = SensorDevice.objects.get_or_create(slug=identifier, defaults=defaults)
+        return device
+
+    changed = [field for field, value in defaults.items() if getattr(device, field) != value]
+    if changed:
+        for field in changed:
+            setattr(device, field, defaults[field])
+        device.save(update_fields=[*changed, "updated_at"])
+    return device
+
+
+def upsert_readings(rows: List[SensorReading], deduper: Optional[ReadingDeduper] = None) -> int:
+    """Insert or update readings in one statement, keyed on (device, metric, timestamp).
+
+    Rows sharing a key within the batch are collapsed (last one wins), since a
+    single ``ON CONFLICT DO UPDATE`` cannot touch the same row twice. With a
+    ``deduper``, repeated readings are dropped and compressed-away readings
+    only advance ``LatestReading``. Returns the number of rows stored.
+    """
+
+    unique: Dict[Tuple[int, str, dt.datetime], SensorReading] = {}
+    for row in rows:
+        unique[(row.device_id, row.metric, row.timestamp)] = row
+    if not unique:
+        return 0
+    if deduper is None:
+        return _store_readings(list(unique.values()), list(unique.values()))
+    # The deduper's state advances on commit, so keep its decision and the write together.
+    with transaction.atomic():
+        stored, latest = deduper.apply(unique.values())
+        return _store_readings(stored, latest)
+
+
+def _store_readings(stored: List[SensorReading], latest: List[SensorReading]) -> int:
+    if not stored:
+        refresh_latest_readings(latest)
+        return 0
+
+    # Rows older than the raw retention horizon are merged into rollups instead of
+    # recomputed; only genuinely new ones may be added, so look up existing keys first.
+    horizon = raw_retention_horizon()
+    recent = [row for row in stored if horizon is None or row.timestamp >= horizon]
+    archived = [row for row in stored if horizon is not None and row.timestamp < horizon]
+    if archived:
+        existing = set(
+            SensorReading.objects.filter(
+                device_id__in={row.device_id for row in archived},
+                metric__in={row.metric for row in archived},
+                timestamp__in={row.timestamp for row in archived},
+            ).values_list("device_id", "metric", "timestamp")
+        )
+        archived = [row for row in archived if (row.device_id, row.metric, row.timestamp) not in existing]
+
+    SensorReading.objects.bulk_create(
+        stored,
+        update_conflicts=True,
+        unique_fields=["device", "metric", "timestamp"],
+        update_fields=["value", "unit", "raw_payload", "updated_at"],
+    )
+    refresh_latest_readings(latest)
+    refresh_rollups(recent)
+    merge_rollups(archived)
+    return len(stored)
+
+
+def refresh_latest_readings(rows: Iterable[SensorReading]) -> int:
+    """Advance ``LatestReading`` for every (device, metric) whose newest row is in ``rows``.
+
+    Older rows (backfills) never overwrite a newer latest value. Once the
+    transaction commits, advanced values are queued for the Home Assistant
+    publisher when it is configured and published as live ``reading`` events.
+    """
+
+    newest: Dict[Tuple[int, str], SensorReading] = {}
+    for row in rows:
+        key = (row.device_id, row.metric)
+        if key not in newest or row.timestamp >= newest[key].timestamp:
+            newest[key] = row
+    if not newest:
+        return 0
+
+    current = {
+        (device_id, metric): timestamp
+        for device_id, metric, timestamp in LatestReading.objects.filter(
+            device_id__in={device_id for device_id, _ in newest},
+            metric__in={metric for _, metric in newest},
+        ).values_list("device_id", "metric", "timestamp")
+    }
+    advanced = [row for key, row in newest.items() if key not in current or row.timestamp >= current[key]]
+    if advanced:
+        LatestReading.objects.bulk_create(
+            [
+                LatestReading(device_id=row.device_id, metric=row.metric, value=row.value, unit=row.unit, timestamp=row.timestamp)
+                for row in advanced
+            ],
+            update_conflicts=True,
+            unique_fields=["device", "metric"],
+            update_fields=["value", "unit", "timestamp"],
+        )
+        publisher = get_publisher()
+        if publisher is not None:
+            # A rolled-back ingest must not reach Home Assistant.
+            transaction.on_commit(lambda: publisher.enqueue_readings(advanced))
+        publish_readings(advanced)
+    return len(advanced)
+
+
+def record_readings(
+    device: SensorDevice, readings: Iterable[Dict[str, Any]], deduper: Optional[ReadingDeduper] = None
+) -> int:
+    """Persist normalized connector readings for a device and return the row count."""
+
+    rows = [
+        SensorReading(
+            device=device,
+            metric=reading["metric"],
+            value=float(reading["value"]),
+            unit=reading.get("unit", ""),
+            timestamp=parse_timestamp(reading.get("timestamp")),
+            raw_payload=reading.get("payload") or {},
+        )
+        for reading in readings
+    ]
+    return upsert_readings(rows, deduper)
+
+
+def _resolve_devices(slugs: Iterable[str]) -> Dict[str, SensorDevice]:
+    wanted = set(slugs)
+    devices = {device.slug: device for device in SensorDevice.objects.filter(slug__in=wanted)}
+    missing = wanted - devices.keys()
+    if missing:
+        SensorDevice.objects.bulk_create(
+            [
+                SensorDevice(name=slug, slug=slug, sensor_type="custom", connection_type="push")
+                for slug in sorted(missing)
+            ],
+            ignore_conflicts=True,
+        )
+        devices.update({device.slug: device for device in SensorDevice.objects.filter(slug__in=missing)})
+    return devices
+
+
+def _chunks(items: List[Any], size: int) -> Iterator[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def bulk_ingest_readings(
+    readings: Iterable[Dict[str, Any]],
+    batch_size: Optional[int] = None,
+    deduper: Optional[ReadingDeduper] = None,
+) -> Dict[str, Any]:
+    """Validate and upsert many readings, one transaction per batch.
+
+    Each item needs ``device`` (slug), ``metric``, ``value`` and ``timestamp``;
+    ``unit`` and ``payload`` are optional. Unknown device slugs are registered
+    as push devices. Invalid items, including values longer than their column
+    (``FIELD_LIMITS``), are skipped and reported by index.
+    """
+
+    batch_size = batch_size or settings.BULK_INGEST_BATCH_SIZE
+    valid: List[Tuple[Dict[str, Any], dt.datetime]] = []
+    errors: List[Dict[str, Any]] = []
+    received = 0
+    for index, item in enumerate(readings):
+        received += 1
+        try:
+            if not isinstance(item, dict):
+                raise ValueError("Reading must be an object")
+            missing = [key for key in ("device", "metric", "value", "timestamp") if item.get(key) in (None, "")]
+            if missing:
+                raise ValueError(f"Missing field(s): {', '.join(missing)}")
+            too_long = [
+                f"{key} (max {limit})" for key, limit in FIELD_LIMITS.items() if len(str(item.get(key) or "")) > limit
+            ]
+            if too_long:
+                raise ValueError(f"Field(s) too long: {', '.join(too_long)}")
+            timestamp = parse_datetime(str(item["timestamp"]).replace("Z", "+00:00"))
+            if timestamp is None:
+                raise ValueError("Invalid timestamp")
+            if timezone.is_naive(timestamp):
+                timestamp = timezone.make_aware(timestamp)
+            item = {**item, "value": float(item["value"])}
+        except (TypeError, ValueError) as exc:
+            errors.append({"index": index, "error": str(exc)})
+            continue
+        valid.append((item, timestamp))
+
+    devices = _resolve_devices(str(item["device"]) for item, _ in valid)
+    written = 0
+    for batch in _chunks(valid, batch_size):
+        rows = [
+            SensorReading(
+                device=devices[str(item["device"])],
+                metric=str(item["metric"]),
+                value=item["value"],
+                unit=str(item.get("unit", "")),
+                timestamp=timestamp,
+                raw_payload=item.get("payload") or {},
+            )
+            for item, timestamp in batch
+        ]
+        with transaction.atomic():
+            written += upsert_readings(rows, deduper)
+
+    return {"received": received, "written": written, "errors": errors}
+
+
+def _list_devices(connector: SensorConnector) -> List[Dict[str, Any]]:
+    return list(connector.fetch_devices())
+
+
+class IngestionScheduler:
+    """Poll connectors on a fixed cadence, honouring per-device intervals.
+
+    Device discovery (``fetch_devices``) runs every ``discovery_interval``
+    seconds; each known device is then polled whenever its own interval
+    (``SensorDevice.poll_interval_seconds`` or ``default_interval``) elapses.
+
+    Due upstream calls for every connector run in parallel on at most
+    ``concurrency`` threads, each connector throttled by its own rate limit.
+    Results are written on the calling thread as they complete, so the pool
+    never touches the database. Per-connector poll duration, error count and
+    rows written are published with ``record_connector_stats`` after each pass.
+    Devices that fail to register are counted as connector errors and skipped.
+    """
+
+    def __init__(
+        self,
+        connectors: List[SensorConnector],
+        *,
+        default_interval: Optional[int] = None,
+        discovery_interval: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        deduper: Optional[ReadingDeduper] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.connectors = connectors
+        self.default_interval = default_interval or settings.INGEST_POLL_INTERVAL_SECONDS
+        self.discovery_interval = discovery_interval or settings.INGEST_DISCOVERY_INTERVAL_SECONDS
+        self.concurrency = concurrency or settings.INGEST_POLL_CONCURRENCY
+        self.deduper = deduper or ReadingDeduper()
+        self.clock = clock
+        self.sleep = sleep
+        self.limiters: Dict[str, RateLimiter] = {}
+        for connector in connectors:
+            rate = rate_limit_for(connector)
+            if rate:
+                self.limiters[connector.slug] = RateLimiter(rate)
+        self.stats: Dict[str, Dict[str, Any]] = {
+            connector.slug: {"polls": 0, "errors": 0, "rows": 0, "last_poll_seconds": None, "last_error": ""}
+            for connector in connectors
+        }
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._devices: Dict[str, List[Tuple[str, SensorDevice]]] = {}
+        self._next_discovery: Dict[str, float] = {}
+        self._next_poll: Dict[Tuple[str, str], float] = {}
+
+    def _interval_for(self, device: SensorDevice) -> int:
+        return device.poll_interval_seconds or self.default_interval
+
+    def _call(self, connector: SensorConnector, fn: Callable[..., Any], *args: Any) -> Any:
+        limiter = self.limiters.get(connector.slug)
+        if limiter is not None:
+            limiter.acquire()
+        return fn(*args)
+
+    def _map(
+        self, calls: List[Tuple[Any, SensorConnector, Callable[..., Any], Tuple[Any, ...]]]
+    ) -> Iterator[Tuple[Any, Any, Optional[BaseException]]]:
+        """Run ``(key, connector, fn, args)`` calls in the pool, yielding ``(key, result, error)`` as they finish."""
+
+        if not calls:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="ingest-poll")
+        futures = {
+            self._executor.submit(self._call, connector, fn, *args): key for key, connector, fn, args in calls
+        }
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as exc:
+                yield futures[future], None, exc
+
+    def _fail(self, slug: str, message: str, exc: BaseException) -> None:
+        logger.error(message, exc_info=exc)
+        self.stats[slug]["errors"] += 1
+        self.stats[slug]["last_error"] = str(exc)
+
+    def run_pending(self) -> float:
+        """Poll every device that is due and return seconds until the next one."""
+
+        now = self.clock()
+        started = time.perf_counter()
+        finished: Dict[str, float] = {}
+
+        discovery = [
+            (connector, connector, _list_devices, (connector,))
+            for connector in self.connectors
+            if self._next_discovery.get(connector.slug, 0.0) <= now
+        ]
+        for connector, payloads, error in self._map(discovery):
+            finished[connector.slug] = time.perf_counter() - started
+            if error is not None:
+                self._fail(connector.slug, f"Device discovery failed for {connector.slug}", error)
+                self._next_discovery[connector.slug] = now + self.default_interval
+                continue
+            devices: List[Tuple[str, SensorDevice]] = []
+            for payload in payloads:
+                # One malformed payload must not keep the connector's other devices from registering.
+                try:
+                    device = ensure_device_record(payload, connector)
+                except Exception as exc:
+                    self._fail(connector.slug, f"Could not register a device from {connector.slug}", exc)
+                    continue
+                devices.append((str(payload.get("id") or device.slug), device))
+            self._devices[connector.slug] = devices
+            self._next_discovery[connector.slug] = now + self.discovery_interval
+
+        next_wake = now + self.discovery_interval
+        polls = []
+        for connector in self.connectors:
+            next_wake = min(next_wake, self._next_discovery[connector.slug])
+            for device_id, device in self._devices.get(connector.slug, []):
+                key = (connector.slug, device_id)
+                due = self._next_poll.get(key, 0.0)
+                if due <= now:
+                    polls.append(((connector, device_id, device), connector, connector.fetch_readings, (device_id,)))
+                    due = now + self._interval_for(device)
+                    self._next_poll[key] = due
+                next_wake = min(next_wake, due)
+
+        for (connector, device_id, device), readings, error in self._map(polls):
+            stats = self.stats[connector.slug]
+            stats["polls"] += 1
+            finished[connector.slug] = time.perf_counter() - started
+            if error is not None:
+                self._fail(connector.slug, f"Polling failed for {connector.slug}/{device_id}", error)
+                continue
+            try:
+                written = record_readings(device, readings, self.deduper)
+            except Exception as exc:
+                self._fail(connector.slug, f"Storing readings failed for {connector.slug}/{device_id}", exc)
+                continue
+            stats["rows"] += written
+            logger.info("Ingested %s readings for %s/%s", written, connector.slug, device_id)
+
+        for slug, seconds in finished.items():
+            self.stats[slug]["last_poll_seconds"] = round(seconds, 3)
+            record_connector_stats(slug, self.stats[slug])
+        return max(0.0, next_wake - self.clock())
+
+    def run_forever(self) -> None:  # pragma: no cover - exercised via the management command
+        while True:
+            self.sleep(self.run_pending())
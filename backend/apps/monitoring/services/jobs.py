@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import Recommendation, RecommendationJob, SensorDevice
+from .live import publish_recommendations
+from .recommendations import RecommendationEngine, build_recommendation_engine
+from .weather import WeatherClient
+from .weather_cache import WeatherCache, WeatherLocation
+
+logger = logging.getLogger(__name__)
+
+
+def _submission_key(device: Optional[SensorDevice], model: str, inputs: Dict[str, Any], location: Dict[str, Any]) -> str:
+    encoded = json.dumps(
+        {"device": device.pk if device else None, "model": model, "inputs": inputs, "location": location},
+        cls=DjangoJSONEncoder,
+        sort_keys=True,
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def enqueue_recommendation_job(
+    *,
+    device: Optional[SensorDevice],
+    inputs: Dict[str, Any],
+    model: Optional[str] = None,
+    location: Optional[Dict[str, Any]] = None,
+) -> RecommendationJob:
+    """Queue an LLM generation, reusing an identical job that is still pending or running.
+
+    ``inputs`` holds the ``radon``/``environment``/``weather`` snapshots; when
+    ``weather`` is missing the worker looks it up from ``location``.
+    """
+
+    model = model or ""
+    location = {key: value for key, value in (location or {}).items() if value}
+    key = _submission_key(device, model, inputs, location)
+    existing = RecommendationJob.objects.filter(submission_key=key, status__in=RecommendationJob.ACTIVE_STATUSES).first()
+    if existing is not None:
+        return existing
+    return RecommendationJob.objects.create(
+        device=device,
+        model=model,
+        submission_key=key,
+        inputs=inputs,
+        location=location,
+    )
+
+
+def claim_next_job() -> Optional[RecommendationJob]:
+    """Atomically move the oldest pending job to ``running``; safe with several workers."""
+
+    while True:
+        candidate = (
+            RecommendationJob.objects.filter(status=RecommendationJob.PENDING)
+            .order_by("created_at", "id")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if candidate is None:
+            return None
+        now = timezone.now()
+        claimed = RecommendationJob.objects.filter(pk=candidate, status=RecommendationJob.PENDING).update(
+            status=RecommendationJob.RUNNING, started_at=now, updated_at=now
+        )
+        if claimed:
+            return RecommendationJob.objects.get(pk=candidate)
+
+
+def requeue_stale_jobs(older_than: Optional[float] = None) -> int:
+    """Return ``running`` jobs that stopped making progress (e.g. a killed worker) to the queue.
+
+    The next attempt streams its output from scratch; bumping ``attempt`` tells
+    open streams and reconnecting clients to discard the text they already have.
+    """
+
+    older_than = older_than or settings.RECOMMENDATION_JOB_STALE_SECONDS
+    cutoff = timezone.now() - dt.timedelta(seconds=older_than)
+    return RecommendationJob.objects.filter(status=RecommendationJob.RUNNING, updated_at__lt=cutoff).update(
+        status=RecommendationJob.PENDING,
+        output="",
+        attempt=F("attempt") + 1,
+        started_at=None,
+        updated_at=timezone.now(),
+    )
+
+
+def _fetch_weather(location: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if not (settings.WEATHER_API_KEY and location):
+        return None
+    client = WeatherClient(settings.WEATHER_API_BASE_URL, settings.WEATHER_API_KEY, timeout=settings.WEATHER_TIMEOUT_SECONDS)
+    try:
+        resolved = WeatherLocation.from_params(location.get("lat"), location.get("lon"), location.get("city"))
+        if resolved is not None:
+            return WeatherCache(client).get(resolved)
+    except Exception:
+        logger.warning("Weather lookup failed for recommendation job", exc_info=True)
+    return None
+
+
+class RecommendationJobWorker:
+    """Process queued jobs one at a time, streaming Ollama output into ``RecommendationJob.output``.
+
+    Partial output is flushed every ``flush_interval`` seconds so the stream
+    endpoint can relay tokens while the generation is still running.
+    """
+
+    def __init__(
+        self,
+        *,
+        engine_factory: Callable[[], Optional[RecommendationEngine]] = build_recommendation_engine,
+        poll_interval: Optional[float] = None,
+        flush_interval: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.engine_factory = engine_factory
+        self.poll_interval = poll_interval or settings.RECOMMENDATION_JOB_POLL_SECONDS
+        self.flush_interval = flush_interval if flush_interval is not None else settings.RECOMMENDATION_JOB_FLUSH_SECONDS
+        self.clock = clock
+        self.sleep = sleep
+
+    def _flush(self, job: RecommendationJob, output: str) -> None:
+        # A worker that stalled past the requeue must not write into the next attempt's output.
+        RecommendationJob.objects.filter(pk=job.pk, attempt=job.attempt).update(output=output, updated_at=timezone.now())
+
+    def _generate(self, job: RecommendationJob, engine: RecommendationEngine, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        parts = []
+        final: Dict[str, Any] = {}
+        last_flush = self.clock()
+        for chunk in engine.stream_insight(**inputs):
+            parts.append(chunk.get("response", ""))
+            if chunk.get("done"):
+                final = chunk
+            if self.clock() - last_flush >= self.flush_interval:
+                self._flush(job, "".join(parts))
+                last_flush = self.clock()
+        return {**final, "response": "".join(parts)}
+
+    def run_job(self, job: RecommendationJob) -> RecommendationJob:
+        try:
+            engine = self.engine_factory()
+            if engine is None:
+                raise RuntimeError("Ollama integration is not configured")
+            inputs = {
+                "radon": job.inputs.get("radon"),
+                "environment": job.inputs.get("environment"),
+                "weather": job.inputs.get("weather") or _fetch_weather(job.location),
+                "model": job.model or None,
+            }
+            response = engine.cached_insight(**inputs)
+            cached = response is not None
+            if response is None:
+                response = self._generate(job, engine, inputs)
+                engine.store_insight(response, **inputs)
+
+            insight = engine.build_insight(response, cached=cached)
+            if insight:
+                job.recommendation = Recommendation.objects.create(
+                    device=job.device,
+                    category=insight["category"],
+                    message=insight["message"],
+                    confidence=insight["confidence"],
+                    context=insight["context"],
+                )
+                publish_recommendations([job.recommendation])
+            # Keep the text exactly as streamed so SSE offsets stay valid.
+            job.output = response.get("response") or ""
+            job.status = RecommendationJob.SUCCEEDED
+        except Exception as exc:
+            logger.exception("Recommendation job %s failed", job.pk)
+            job.status = RecommendationJob.FAILED
+            job.error = str(exc)
+        job.finished_at = job.updated_at = timezone.now()
+        RecommendationJob.objects.filter(pk=job.pk, attempt=job.attempt).update(
+            status=job.status,
+            output=job.output,
+            error=job.error,
+            recommendation=job.recommendation,
+            finished_at=job.finished_at,
+            updated_at=job.updated_at,
+        )
+        return job
+
+    def run_pending(self) -> int:
+        """Drain the queue and return how many jobs were processed."""
+
+        processed = 0
+        while (job := claim_next_job()) is not None:
+            self.run_job(job)
+            processed += 1
+        return processed
+
+    def run_forever(self) -> None:  # pragma: no cover - exercised via the management command
+        while True:
+            requeue_stale_jobs()
+            if not self.run_pending():
+                self.sleep(self.poll_interval)
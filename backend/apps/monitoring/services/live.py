@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from ..models import Recommendation, SensorReading
+
+logger = logging.getLogger(__name__)
+
+LIVE_BACKENDS = ("memory", "redis")
+
+
+class LiveEvent(NamedTuple):
+    id: str
+    type: str
+    data: Dict[str, Any]
+
+
+def _position(event_id: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Order key of a ``<ms>-<seq>`` event id, or ``None`` if it is missing or malformed."""
+
+    try:
+        high, _, low = (event_id or "").partition("-")
+        return int(high), int(low or 0)
+    except ValueError:
+        return None
+
+
+class _Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, size: int) -> None:
+        self.loop = loop
+        self.queue: "asyncio.Queue[LiveEvent]" = asyncio.Queue(maxsize=size)
+        self.lagged = False
+
+
+class EventLayer(ABC):
+    """Fans published events out to every subscriber in this process.
+
+    ``publish`` may be called from any thread; each subscriber has a bounded
+    queue on its own event loop. A subscriber that falls more than
+    ``queue_size`` events behind is marked lagged and catches up from
+    ``backlog`` instead, so a slow client never blocks publishers or other
+    clients. Event ids are ``<ms>-<seq>`` strings ordered like Redis stream ids.
+    A ``Last-Event-ID`` ahead of the newest event was not issued by this layer
+    (another process, or before a restart), so nothing is replayed for it.
+    """
+
+    def __init__(self, *, backlog_size: Optional[int] = None, queue_size: Optional[int] = None) -> None:
+        self.backlog_size = backlog_size or settings.LIVE_EVENTS_BACKLOG
+        self.queue_size = queue_size or settings.LIVE_EVENTS_QUEUE_SIZE
+        self._subscribers: Set[_Subscriber] = set()
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def publish(self, event_type: str, data: Dict[str, Any]) -> LiveEvent:
+        """Retain the event and deliver it to subscribers; may be called from any thread."""
+
+    @abstractmethod
+    def backlog(self, after: Optional[str]) -> List[LiveEvent]:
+        """Retained events newer than ``after`` (none when ``after`` is unknown)."""
+
+    @abstractmethod
+    def head(self) -> Optional[str]:
+        """Id of the newest event, or ``None`` before the first one."""
+
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def _register(self, subscriber: _Subscriber) -> None:
+        with self._lock:
+            self._subscribers.add(subscriber)
+
+    def _unregister(self, subscriber: _Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def _deliver(self, event: LiveEvent) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(self._offer, subscriber, event)
+            except RuntimeError:  # the subscriber's loop has closed
+                self._unregister(subscriber)
+
+    @staticmethod
+    def _offer(subscriber: _Subscriber, event: LiveEvent) -> None:
+        try:
+            subscriber.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            subscriber.lagged = True
+
+    async def subscribe(
+        self, last_id: Optional[str] = None, *, idle: Optional[float] = None
+    ) -> AsyncIterator[Optional[LiveEvent]]:
+        """Yield events newer than ``last_id``, then live ones; yields ``None`` after ``idle`` quiet seconds."""
+
+        subscriber = _Subscriber(asyncio.get_running_loop(), self.queue_size)
+        self._register(subscriber)
+        position = _position(last_id)
+        try:
+            if position is not None:
+                head = _position(await asyncio.to_thread(self.head))
+                if head is None or position > head:
+                    # Not issued by this layer: replay nothing, deliver everything new.
+                    position = None
+            pending = await asyncio.to_thread(self.backlog, last_id) if position else []
+            while True:
+                for event in pending:
+                    event_position = _position(event.id)
+                    if position is None or event_position > position:
+                        position = event_position
+                        yield event
+                if subscriber.lagged:
+                    # The queue holds the oldest undelivered events; fetch what overflowed after them.
+                    subscriber.lagged = False
+                    queued = []
+                    while not subscriber.queue.empty():
+                        queued.append(subscriber.queue.get_nowait())
+                    pending = queued + await asyncio.to_thread(self.backlog, queued[-1].id if queued else None)
+                    continue
+                try:
+                    pending = [await asyncio.wait_for(subscriber.queue.get(), timeout=idle)]
+                except asyncio.TimeoutError:
+                    pending = []
+                    yield None
+        finally:
+            self._unregister(subscriber)
+
+
+class MemoryEventLayer(EventLayer):
+    """In-process layer: only clients of this process see events (tests, single-process dev)."""
+
+    def __init__(self, *, clock: Callable[[], float] = time.time, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.clock = clock
+        self._events: "deque[LiveEvent]" = deque(maxlen=self.backlog_size)
+        self._last: Tuple[int, int] = (0, -1)
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> LiveEvent:
+        with self._lock:
+            # Wall-clock ids like Redis assigns, so ids from before a restart stay behind new ones.
+            ms = max(int(self.clock() * 1000), self._last[0])
+            self._last = (ms, self._last[1] + 1 if ms == self._last[0] else 0)
+            event = LiveEvent(f"{ms}-{self._last[1]}", event_type, data)
+            self._events.append(event)
+        self._deliver(event)
+        return event
+
+    def backlog(self, after: Optional[str]) -> List[LiveEvent]:
+        position = _position(after)
+        if position is None:
+            return []
+        with self._lock:
+            return [event for event in self._events if _position(event.id) > position]
+
+    def head(self) -> Optional[str]:
+        with self._lock:
+            return self._events[-1].id if self._events else None
+
+
+class RedisEventLayer(EventLayer):
+    """Cross-process layer on a capped Redis stream.
+
+    Writers ``XADD`` to the stream; each process runs one ``XREAD BLOCK`` pump
+    (while it has subscribers) and fans entries out locally, so Redis serves one
+    reader per process rather than one per browser tab.
+    """
+
+    def __init__(self, url: Optional[str] = None, *, stream: Optional[str] = None, **kwargs: Any) -> None:
+        import redis
+
+        super().__init__(**kwargs)
+        self.url = url or settings.LIVE_EVENTS_REDIS_URL
+        self.stream = stream or settings.LIVE_EVENTS_STREAM
+        self.client = redis.Redis.from_url(self.url)
+        self._pump: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _decode(entry_id: bytes, fields: Dict[bytes, bytes]) -> LiveEvent:
+        return LiveEvent(entry_id.decode(), fields[b"type"].decode(), json.loads(fields[b"data"]))
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> LiveEvent:
+        encoded = json.dumps(data, cls=DjangoJSONEncoder)
+        entry_id = self.client.xadd(
+            self.stream, {"type": event_type, "data": encoded}, maxlen=self.backlog_size, approximate=True
+        )
+        return LiveEvent(entry_id.decode(), event_type, json.loads(encoded))
+
+    def backlog(self, after: Optional[str]) -> List[LiveEvent]:
+        if _position(after) is None:
+            return []
+        entries = self.client.xrange(self.stream, min=f"({after}", count=self.backlog_size)
+        return [self._decode(entry_id, fields) for entry_id, fields in entries]
+
+    def head(self) -> Optional[str]:
+        entries = self.client.xrevrange(self.stream, count=1)
+        return entries[0][0].decode() if entries else None
+
+    def _register(self, subscriber: _Subscriber) -> None:
+        super()._register(subscriber)
+        pump = self._pump
+        if pump is None or pump.done() or pump.get_loop() is not subscriber.loop:
+            self._pump = subscriber.loop.create_task(self._run_pump())
+
+    async def _run_pump(self) -> None:
+        from redis import asyncio as aioredis
+
+        client = aioredis.Redis.from_url(self.url)
+        last = "$"
+        try:
+            while self._subscribers:
+                try:
+                    response = await client.xread({self.stream: last}, block=5000, count=100)
+                except Exception:
+                    logger.exception("Reading live events from Redis failed")
+                    await asyncio.sleep(1)
+                    continue
+                for _, entries in response or []:
+                    for entry_id, fields in entries:
+                        last = entry_id.decode()
+                        self._deliver(self._decode(entry_id, fields))
+        finally:
+            # Let the next subscriber start a fresh pump even while this one closes.
+            if self._pump is asyncio.current_task():
+                self._pump = None
+            await client.aclose()
+
+
+_layer: Optional[EventLayer] = None
+_layer_lock = threading.Lock()
+
+
+def get_event_layer() -> EventLayer:
+    global _layer
+    with _layer_lock:
+        if _layer is None:
+            backend = settings.LIVE_EVENTS_BACKEND
+            if backend not in LIVE_BACKENDS:
+                raise ValueError(f"Unknown live events backend {backend!r}; choose from {', '.join(LIVE_BACKENDS)}")
+            _layer = RedisEventLayer() if backend == "redis" else MemoryEventLayer()
+        return _layer
+
+
+def reset_event_layer() -> None:
+    """Forget the process-wide layer (used by tests)."""
+
+    global _layer
+    with _layer_lock:
+        _layer = None
+
+
+def _publish(events: List[Tuple[str, Dict[str, Any]]]) -> None:
+    try:
+        layer = get_event_layer()
+        for event_type, data in events:
+            layer.publish(event_type, data)
+    except Exception:
+        # Live updates are best-effort; never fail the write that triggered them.
+        logger.exception("Publishing %s live event(s) failed", len(events))
+
+
+def publish_events(events: List[Tuple[str, Dict[str, Any]]]) -> None:
+    """Publish ``(type, data)`` events once the current transaction commits."""
+
+    if events:
+        transaction.on_commit(lambda: _publish(events))
+
+
+def reading_event(row: SensorReading) -> Tuple[str, Dict[str, Any]]:
+    return "reading", {
+        "device": row.device.slug,
+        "metric": row.metric,
+        "value": row.value,
+        "unit": row.unit,
+        "timestamp": row.timestamp.isoformat(),
+    }
+
+
+def recommendation_event(recommendation: Recommendation) -> Tuple[str, Dict[str, Any]]:
+    return "recommendation", {
+        "id": recommendation.pk,
+        "device": recommendation.device.slug if recommendation.device else None,
+        "category": recommendation.category,
+        "message": recommendation.message,
+        "confidence": recommendation.confidence,
+        "context": json.loads(json.dumps(recommendation.context, cls=DjangoJSONEncoder)),
+        "created_at": recommendation.created_at.isoformat(),
+    }
+
+
+def publish_readings(rows: Iterable[SensorReading]) -> None:
+    publish_events([reading_event(row) for row in rows])
+
+
+def publish_recommendations(recommendations: Iterable[Recommendation]) -> None:
+    publish_events([recommendation_event(recommendation) for recommendation in recommendations])
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+
+from .breaker import CircuitOpenError
+
+# Upstream calls range from cached weather lookups to multi-minute Ollama generations.
+UPSTREAM_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 500)
+
+REQUEST_SECONDS = Histogram(
+    "home_monitor_http_request_duration_seconds",
+    "Time from request to response headers, per view.",
+    ["view", "method", "status"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "home_monitor_http_request_db_queries",
+    "Database queries issued per request.",
+    ["view"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "home_monitor_http_request_db_seconds",
+    "Time spent executing database queries per request.",
+    ["view"],
+)
+UPSTREAM_SECONDS = Histogram(
+    "home_monitor_upstream_request_duration_seconds",
+    "Provider client calls by service, host, endpoint and outcome.",
+    ["service", "host", "endpoint", "method", "status"],
+    buckets=UPSTREAM_BUCKETS,
+)
+OLLAMA_TOKENS = Counter(
+    "home_monitor_ollama_tokens",
+    "Tokens Ollama reported evaluating, by model and kind (prompt or eval).",
+    ["model", "kind"],
+)
+OLLAMA_SECONDS = Histogram(
+    "home_monitor_ollama_duration_seconds",
+    "Ollama's own timings per generation, by model and phase (total, load, prompt_eval, eval).",
+    ["model", "phase"],
+    buckets=UPSTREAM_BUCKETS,
+)
+
+# Ollama reports durations in nanoseconds under these keys.
+OLLAMA_PHASES = {
+    "total": "total_duration",
+    "load": "load_duration",
+    "prompt_eval": "prompt_eval_duration",
+    "eval": "eval_duration",
+}
+
+
+class RequestTimings:
+    """Database and upstream time spent on behalf of one request.
+
+    Upstream legs may record from fan-out worker threads, hence the lock.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.upstream: Dict[str, List[float]] = {}
+        self.tokens: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add_query(self, seconds: float) -> None:
+        with self._lock:
+            self.db_queries += 1
+            self.db_seconds += seconds
+
+    def add_upstream(self, service: str, seconds: float) -> None:
+        with self._lock:
+            calls = self.upstream.setdefault(service, [0, 0.0])
+            calls[0] += 1
+            calls[1] += seconds
+
+    def add_tokens(self, service: str, count: int) -> None:
+        with self._lock:
+            self.tokens[service] = self.tokens.get(service, 0) + count
+
+    def server_timing(self) -> str:
+        """``Server-Timing`` value: one entry for the database, one per upstream service and the total.
+
+        Upstream legs can run concurrently, so their durations may add up to more than ``total``.
+        """
+
+        entries = [f'db;dur={self.db_seconds * 1000:.1f};desc="{self.db_queries} queries"']
+        with self._lock:
+            upstream = sorted((service, tuple(calls)) for service, calls in self.upstream.items())
+            tokens = dict(self.tokens)
+        for service, (count, seconds) in upstream:
+            desc = f"{count} call{'' if count == 1 else 's'}"
+            if service in tokens:
+                desc += f", {tokens[service]} tokens"
+            entries.append(f'{service};dur={seconds * 1000:.1f};desc="{desc}"')
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_current: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+@contextlib.contextmanager
+def collect_timings() -> Iterator[RequestTimings]:
+    """Attribute database queries and upstream calls made in this context (and its copies) to one request."""
+
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """``connection.execute_wrappers`` hook timing every query issued while collecting."""
+
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add_query(time.perf_counter() - started)
+
+
+def install_query_timer(sender, connection, **kwargs) -> None:
+    """``connection_created`` receiver adding ``record_query`` to each new database connection once."""
+
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def observe_request(view: str, method: str, status: int, timings: RequestTimings) -> None:
+    REQUEST_SECONDS.labels(view, method, str(status)).observe(time.perf_counter() - timings.started)
+    REQUEST_DB_QUERIES.labels(view).observe(timings.db_queries)
+    REQUEST_DB_SECONDS.labels(view).observe(timings.db_seconds)
+
+
+class UpstreamCall:
+    """Outcome of one tracked provider call; clients report the response via ``observe``."""
+
+    __slots__ = ("status",)
+
+    def __init__(self) -> None:
+        self.status: Optional[str] = None
+
+    def observe(self, response: requests.Response) -> requests.Response:
+        self.status = str(response.status_code)
+        return response
+
+
+def _error_status(exc: BaseException) -> str:
+    if isinstance(exc, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return str(exc.response.status_code)
+    return type(exc).__name__
+
+
+@contextlib.contextmanager
+def track_upstream(service: str, base_url: str, endpoint: str, method: str = "GET") -> Iterator[UpstreamCall]:
+    """Time a provider call and record it under ``service``, the base URL's host and ``endpoint``.
+
+    ``endpoint`` is the path template (``/v1/devices/{id}/radon/latest``), never
+    the concrete path, to keep label cardinality bounded. Failures are labelled
+    with the HTTP status when there is one, ``circuit_open`` for calls the
+    breaker rejected, or the exception class (``ConnectTimeout``) otherwise.
+    """
+
+    call = UpstreamCall()
+    started = time.perf_counter()
+    try:
+        yield call
+    except Exception as exc:
+        if call.status is None or isinstance(exc, CircuitOpenError):
+            call.status = _error_status(exc)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        UPSTREAM_SECONDS.labels(service, urlsplit(base_url).netloc, endpoint, method, call.status or "ok").observe(
+            elapsed
+        )
+        timings = _current.get()
+        if timings is not None:
+            timings.add_upstream(service, elapsed)
+
+
+def record_ollama_usage(model: str, response: Dict[str, Any]) -> None:
+    """Record the token counts and phase durations Ollama returns with a finished generation."""
+
+    prompt_tokens = response.get("prompt_eval_count") or 0
+    eval_tokens = response.get("eval_count") or 0
+    if prompt_tokens:
+        OLLAMA_TOKENS.labels(model, "prompt").inc(prompt_tokens)
+    if eval_tokens:
+        OLLAMA_TOKENS.labels(model, "eval").inc(eval_tokens)
+    for phase, key in OLLAMA_PHASES.items():
+        nanoseconds = response.get(key)
+        if nanoseconds:
+            OLLAMA_SECONDS.labels(model, phase).observe(nanoseconds / 1e9)
+    timings = _current.get()
+    if timings is not None and (prompt_tokens or eval_tokens):
+        timings.add_tokens("ollama", prompt_tokens + eval_tokens)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Prometheus text exposition for this process, or for all workers when multiprocess mode is configured."""
+
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+import logging
+import queue
+import threading
+import time
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import DataError, IntegrityError
+from django.utils import timezone
+
+from .base import SensorConnector
+from .ingestion import bulk_ingest_readings
+
+logger = logging.getLogger(__name__)
+# Readings given up on after MQTT_BATCH_MAX_ATTEMPTS, one JSON line each; route this logger to keep them.
+dead_letter_logger = logging.getLogger(f"{__name__}.dead_letter")
+# Failures caused by the rows themselves; anything else (a lost connection) is an outage and retried as is.
+POISON_ERRORS = (DataError, IntegrityError, ValidationError)
+
+TIMESTAMP_KEYS = ("timestamp", "ts", "time")
+RESERVED_KEYS = {"device", "metric", "value", "unit", "units", *TIMESTAMP_KEYS}
+
+
+def _timestamp(payload: Dict[str, Any]) -> str:
+    for key in TIMESTAMP_KEYS:
+        raw = payload.get(key)
+        if raw in (None, ""):
+            continue
+        if isinstance(raw, (int, float)):
+            # Epoch seconds (or milliseconds, as many firmwares send).
+            seconds = raw / 1000 if raw > 1e11 else raw
+            return dt.datetime.fromtimestamp(seconds, tz=dt.timezone.utc).isoformat()
+        return str(raw)
+    return timezone.now().isoformat()
+
+
+class MqttConnector(SensorConnector):
+    """Push connector that turns MQTT messages into reading dicts for ``bulk_ingest_readings``.
+
+    Topics are read as ``…/<device>/<metric>`` when the payload is a bare number
+    or an object with a ``value``, and as ``…/<device>`` when the payload is an
+    object of ``metric: value`` pairs (``units`` may map metrics to units).
+    Objects go through ``prepare_payload`` first, so subclasses can rename
+    vendor fields. Timestamps default to the time of receipt.
+    """
+
+    slug = "mqtt"
+
+    def __init__(self, topics: Optional[List[str]] = None) -> None:
+        self.topics = topics if topics is not None else settings.MQTT_TOPICS
+
+    def fetch_devices(self) -> Iterable[Dict[str, Any]]:
+        # Devices are registered by bulk_ingest_readings when their first message arrives.
+        return []
+
+    def fetch_latest(self, device_id: str) -> Dict[str, Any]:
+        raise NotImplementedError("MQTT devices push their readings; there is nothing to poll")
+
+    def decode(self, topic: str, payload: bytes) -> List[Dict[str, Any]]:
+        """Return the readings carried by one message; raise ``ValueError`` if it has none."""
+
+        text = payload.decode("utf-8").strip()
+        try:
+            body = json.loads(text)
+        except json.JSONDecodeError:
+            raise ValueError(f"Payload on {topic} is not JSON or a number") from None
+        if isinstance(body, (int, float)) and not isinstance(body, bool):
+            body = {"value": body}
+        if not isinstance(body, dict):
+            raise ValueError(f"Unsupported payload type on {topic}")
+
+        body = self.prepare_payload(body)
+        levels = [level for level in topic.split("/") if level]
+        timestamp = _timestamp(body)
+        if "value" in body:
+            if len(levels) < 2 and not ("device" in body and "metric" in body):
+                raise ValueError(f"Cannot derive device/metric from topic {topic}")
+            return [
+                {
+                    "device": body.get("device") or levels[-2],
+                    "metric": body.get("metric") or levels[-1],
+                    "value": body["value"],
+                    "unit": body.get("unit", ""),
+                    "timestamp": timestamp,
+                    "payload": body,
+                }
+            ]
+
+        device = body.get("device") or (levels[-1] if levels else None)
+        units = body.get("units") or {}
+        readings = [
+            {
+                "device": device,
+                "metric": metric,
+                "value": value,
+                "unit": units.get(metric, ""),
+                "timestamp": timestamp,
+                "payload": body,
+            }
+            for metric, value in body.items()
+            if metric not in RESERVED_KEYS and isinstance(value, (int, float)) and not isinstance(value, bool)
+        ]
+        if not device or not readings:
+            raise ValueError(f"No readings in payload on {topic}")
+        return readings
+
+
+class Delivery:
+    """One MQTT message awaiting acknowledgement until all of its readings are settled."""
+
+    __slots__ = ("ack", "remaining")
+
+    def __init__(self, ack: Callable[[], Any], remaining: int) -> None:
+        self.ack = ack
+        self.remaining = remaining
+
+    def settle(self) -> None:
+        self.remaining -= 1
+        if self.remaining == 0:
+            self.ack()
+
+
+class ReadingBatcher:
+    """Bounded hand-off between the MQTT network thread and the database writer.
+
+    ``offer`` (network thread) never blocks, so paho keeps servicing keepalives.
+    Readings offered with an ``ack`` are acknowledged only once written (or
+    rejected), so the broker keeps them until then; their number is bounded by
+    the broker's in-flight window rather than ``max_pending``. Readings without
+    one (QoS 0) are dropped and counted when ``max_pending`` are waiting.
+    ``drain`` (writer thread) writes up to ``batch_size`` readings once the batch
+    is full or its oldest reading has waited ``max_latency`` seconds. A failed
+    write keeps the batch and backs off exponentially. After ``max_attempts``
+    data errors (``POISON_ERRORS``) the batch is written one reading at a time
+    and the readings that still fail are dead-lettered, so one poison message
+    cannot stall ingestion; outages are retried until the database is back.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[List[Dict[str, Any]]], Dict[str, Any]] = bulk_ingest_readings,
+        *,
+        batch_size: Optional[int] = None,
+        max_latency: Optional[float] = None,
+        max_pending: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        backoff_max: float = 30.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.write = write
+        self.batch_size = batch_size or settings.MQTT_BATCH_SIZE
+        self.max_latency = max_latency if max_latency is not None else settings.MQTT_BATCH_SECONDS
+        self.max_pending = max_pending or settings.MQTT_QUEUE_MAX
+        self.max_attempts = max_attempts or settings.MQTT_BATCH_MAX_ATTEMPTS
+        self.backoff_max = backoff_max
+        self.sleep = sleep
+        self.queue: "queue.Queue[Tuple[Dict[str, Any], Optional[Delivery]]]" = queue.Queue()
+        self.dropped = 0
+        self.dead_lettered = 0
+        self.written = 0
+        self._batch: List[Tuple[Dict[str, Any], Optional[Delivery]]] = []
+        self._failures = 0
+
+    def offer(self, readings: List[Dict[str, Any]], ack: Optional[Callable[[], Any]] = None) -> bool:
+        """Queue readings without waiting; return ``False`` if they had to be dropped.
+
+        ``ack`` is called once every reading has been written or rejected.
+        """
+
+        if not readings:
+            if ack is not None:
+                ack()
+            return True
+        if ack is None and self.queue.qsize() + len(readings) > self.max_pending:
+            self.dropped += len(readings)
+            logger.warning("MQTT ingest queue full; dropped %s reading(s) (%s in total)", len(readings), self.dropped)
+            return False
+        delivery = Delivery(ack, len(readings)) if ack is not None else None
+        for reading in readings:
+            self.queue.put_nowait((reading, delivery))
+        return True
+
+    def pending(self) -> int:
+        return len(self._batch) + self.queue.qsize()
+
+    def _fill(self, timeout: float) -> None:
+        # Wait up to ``timeout`` for the first reading, then at most ``max_latency`` for the rest.
+        deadline = time.monotonic() + timeout
+        while len(self._batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                return
+            if not self._batch and timeout:
+                deadline = time.monotonic() + self.max_latency
+            self._batch.append(item)
+
+    def drain(self, timeout: float = 0.0) -> int:
+        """Write one batch (waiting up to ``timeout`` for the first reading) and return rows written."""
+
+        self._fill(timeout)
+        if not self._batch:
+            return 0
+        try:
+            result = self.write([reading for reading, _ in self._batch])
+        except Exception as exc:
+            self._failures += 1
+            if isinstance(exc, POISON_ERRORS) and self._failures >= self.max_attempts:
+                logger.exception(
+                    "MQTT batch of %s readings failed %s times; writing it one by one", len(self._batch), self._failures
+                )
+                return self._write_individually()
+            self._back_off()
+            return 0
+        batch, self._batch, self._failures = self._batch, [], 0
+        self._settle(batch)
+        return self._record(result)
+
+    def _back_off(self) -> None:
+        delay = min(self.backoff_max, 0.5 * 2 ** (self._failures - 1))
+        logger.exception("MQTT batch of %s readings failed; retrying in %.1fs", len(self._batch), delay)
+        self.sleep(delay)
+
+    def _settle(self, items: List[Tuple[Dict[str, Any], Optional[Delivery]]]) -> None:
+        for _, delivery in items:
+            if delivery is not None:
+                delivery.settle()
+
+    def _record(self, result: Dict[str, Any]) -> int:
+        for error in result.get("errors", []):
+            logger.warning("Rejected MQTT reading: %s", error["error"])
+        self.written += result["written"]
+        return result["written"]
+
+    def _write_individually(self) -> int:
+        # Isolate the readings that make the batch fail; the rest are still stored.
+        batch, self._failures = self._batch, 0
+        written = 0
+        for position, (reading, delivery) in enumerate(batch):
+            try:
+                written += self._record(self.write([reading]))
+            except POISON_ERRORS as exc:
+                self.dead_lettered += 1
+                dead_letter_logger.error(json.dumps({"reading": reading, "error": str(exc)}, default=str))
+            except Exception:
+                # The database went away part-way: keep what is left and retry it as a batch.
+                self._batch = batch[position:]
+                self._failures = 1
+                self._back_off()
+                return written
+            if delivery is not None:
+                delivery.settle()
+        self._batch = []
+        return written
+
+    def flush(self) -> int:
+        """Write everything queued so far without waiting for more."""
+
+        written = 0
+        while self.pending():
+            count = self.drain()
+            if not count and self._failures:
+                break
+            written += count
+        return written
+
+    def run(self, stop: threading.Event) -> None:
+        while not stop.is_set():
+            self.drain(timeout=self.max_latency or 1.0)
+        self.flush()
+
+
+class MqttSubscriber:
+    """paho-mqtt client that feeds decoded messages from ``connector.topics`` into a batcher.
+
+    Messages are handled on paho's network thread and never touch the database.
+    The session is persistent (``clean_session=False``) and QoS 1/2 messages are
+    acknowledged manually, only after the batcher has written them, so the
+    broker redelivers whatever was still unwritten when the ingester stopped
+    and its in-flight window throttles delivery while writes are slow.
+    """
+
+    def __init__(
+        self,
+        connector: MqttConnector,
+        batcher: ReadingBatcher,
+        *,
+        broker_url: Optional[str] = None,
+        qos: Optional[int] = None,
+        client_id: Optional[str] = None,
+        keepalive: Optional[int] = None,
+    ) -> None:
+        self.connector = connector
+        self.batcher = batcher
+        self.broker_url = broker_url or settings.MQTT_BROKER_URL
+        if not self.broker_url:
+            raise ImproperlyConfigured("MQTT_BROKER_URL is not set")
+        self.qos = qos if qos is not None else settings.MQTT_QOS
+        self.client_id = client_id or settings.MQTT_CLIENT_ID
+        self.keepalive = keepalive or settings.MQTT_KEEPALIVE_SECONDS
+        self.rejected = 0
+        self.connected = threading.Event()
+        self.client = self._build_client()
+
+    def _build_client(self):
+        try:
+            from paho.mqtt import client as mqtt
+        except ImportError as exc:  # pragma: no cover - depends on the environment
+            raise ImproperlyConfigured("paho-mqtt is required for MQTT ingestion (pip install paho-mqtt)") from exc
+
+        url = urlsplit(self.broker_url)
+        if url.scheme not in ("mqtt", "mqtts"):
+            raise ImproperlyConfigured(f"Unsupported MQTT_BROKER_URL scheme {url.scheme!r}; use mqtt:// or mqtts://")
+        self.host = url.hostname or "localhost"
+        self.port = url.port or (8883 if url.scheme == "mqtts" else 1883)
+
+        client = mqtt.Client(
+            mqtt.CallbackAPIVersion.VERSION2, client_id=self.client_id, clean_session=False, manual_ack=True
+        )
+        if url.username:
+            client.username_pw_set(url.username, url.password)
+        if url.scheme == "mqtts":
+            client.tls_set()
+        client.on_connect = self._on_connect
+        client.on_disconnect = self._on_disconnect
+        client.on_message = self._on_message
+        return client
+
+    def _on_connect(self, client, userdata, flags, reason_code, properties) -> None:
+        if reason_code.is_failure:
+            logger.error("MQTT broker refused connection: %s", reason_code)
+            return
+        # Subscribe on every (re)connect; the broker may have lost the session.
+        client.subscribe([(topic, self.qos) for topic in self.connector.topics])
+        self.connected.set()
+        logger.info("Subscribed to %s on %s:%s", ", ".join(self.connector.topics), self.host, self.port)
+
+    def _on_disconnect(self, client, userdata, flags, reason_code, properties) -> None:
+        self.connected.clear()
+        if reason_code.is_failure:
+            logger.warning("MQTT connection lost (%s); reconnecting", reason_code)
+
+    def _on_message(self, client, userdata, message) -> None:
+        ack = partial(client.ack, message.mid, message.qos) if message.qos else None
+        try:
+            readings = self.connector.decode(message.topic, message.payload)
+        except (UnicodeDecodeError, ValueError) as exc:
+            self.rejected += 1
+            logger.warning("Ignoring MQTT message: %s", exc)
+            if ack is not None:
+                ack()
+            return
+        self.batcher.offer(readings, ack)
+
+    def start(self) -> None:
+        self.client.connect_async(self.host, self.port, self.keepalive)
+        self.client.loop_start()
+
+    def stop(self) -> None:
+        self.client.disconnect()
+        self.client.loop_stop()
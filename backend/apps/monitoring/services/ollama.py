@@ -1,9 +1,24 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import json
+from typing import Any, Dict, Iterator, List, Optional
 
 import requests
 
+from .breaker import CircuitBreaker, get_breaker
+from .http import get_session
+from .metrics import record_ollama_usage, track_upstream
+
+# Response keys that only matter for continuing a conversation; the ``context``
+# token array is usually larger than everything else in a response combined.
+CONVERSATION_KEYS = frozenset({"context"})
+
+
+def strip_conversation_state(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of an Ollama response without ``CONVERSATION_KEYS``, for storing or returning to clients."""
+
+    return {key: value for key, value in response.items() if key not in CONVERSATION_KEYS}
+
 
 class OllamaClient:
     """HTTP client for interacting with a local Ollama server."""
@@ -14,13 +29,15 @@ class OllamaClient:
         default_model: str,
         timeout: int = 120,
         session: Optional[requests.Session] = None,
+        breaker: Optional[CircuitBreaker] = None,
     ) -> None:
         if not default_model:
             raise ValueError("An Ollama model must be configured")
         self.base_url = base_url.rstrip("/")
         self.default_model = default_model
         self.timeout = timeout
-        self.session = session or requests.Session()
+        self.session = session or get_session(self.base_url)
+        self.breaker = breaker or get_breaker("ollama")
 
     def generate(
         self,
@@ -29,6 +46,7 @@ class OllamaClient:
         model: Optional[str] = None,
         system_prompt: Optional[str] = None,
         stream: bool = False,
+        timeout: Optional[float] = None,
     ) -> Dict[str, Any]:
         payload: Dict[str, Any] = {
             "model": model or self.default_model,
@@ -38,16 +56,63 @@ class OllamaClient:
         if system_prompt:
             payload["system"] = system_prompt
 
-        response = self.session.post(
-            f"{self.base_url}/api/generate",
-            json=payload,
-            timeout=self.timeout,
-        )
-        response.raise_for_status()
-        return response.json()
+        timeout = timeout or self.timeout
+        with track_upstream("ollama", self.base_url, "/api/generate", "POST") as call, self.breaker.guard(timeout):
+            response = call.observe(
+                self.session.post(
+                    f"{self.base_url}/api/generate",
+                    json=payload,
+                    timeout=timeout,
+                )
+            )
+            response.raise_for_status()
+            result = response.json()
+        record_ollama_usage(payload["model"], result)
+        return result
+
+    def generate_stream(
+        self,
+        prompt: str,
+        *,
+        model: Optional[str] = None,
+        system_prompt: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield Ollama's ``stream: true`` chunks as they arrive; the last one has ``done: true``."""
+
+        payload: Dict[str, Any] = {
+            "model": model or self.default_model,
+            "prompt": prompt,
+            "stream": True,
+        }
+        if system_prompt:
+            payload["system"] = system_prompt
+
+        # The tracked duration spans the whole stream, up to the final chunk.
+        with (
+            track_upstream("ollama", self.base_url, "/api/generate", "POST") as call,
+            self.breaker.guard(self.timeout),
+            self.session.post(
+                f"{self.base_url}/api/generate",
+                json=payload,
+                timeout=self.timeout,
+                stream=True,
+            ) as response,
+        ):
+            call.observe(response)
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+                if chunk.get("done"):
+                    record_ollama_usage(payload["model"], chunk)
+                yield chunk
 
     def list_models(self) -> List[Dict[str, Any]]:
-        response = self.session.get(f"{self.base_url}/api/tags", timeout=self.timeout)
-        response.raise_for_status()
-        payload = response.json()
+        with track_upstream("ollama", self.base_url, "/api/tags") as call, self.breaker.guard(self.timeout):
+            response = call.observe(self.session.get(f"{self.base_url}/api/tags", timeout=self.timeout))
+            response.raise_for_status()
+            payload = response.json()
         return payload.get("models", payload)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import RecommendationCacheEntry
+from .ollama import strip_conversation_state
+
+
+def _band(value: Any, step: float) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return round(round(float(value) / step) * step, 2)
+    except (TypeError, ValueError):
+        return None
+
+
+class RecommendationCache:
+    """Database-backed LRU cache of LLM responses with a TTL.
+
+    Inputs are normalized into bands (radon, indoor temperature/humidity,
+    outdoor temperature and condition) so sensor jitter maps to the same
+    fingerprint and a prior insight can be reused.
+    """
+
+    RADON_STEP = 0.5
+    TEMPERATURE_STEP = 1.0
+    HUMIDITY_STEP = 5.0
+    OUTDOOR_TEMPERATURE_STEP = 5.0
+
+    def __init__(self, ttl_seconds: Optional[int] = None, max_entries: Optional[int] = None) -> None:
+        self.ttl = dt.timedelta(seconds=ttl_seconds or settings.RECOMMENDATION_CACHE_TTL_SECONDS)
+        self.max_entries = max_entries or settings.RECOMMENDATION_CACHE_MAX_ENTRIES
+
+    def normalize(
+        self,
+        *,
+        radon: Optional[Dict[str, Any]],
+        environment: Optional[Dict[str, Any]],
+        weather: Optional[Dict[str, Any]],
+        model: str,
+    ) -> Dict[str, Any]:
+        radon = radon or {}
+        environment = environment or {}
+        weather = weather or {}
+        conditions = weather.get("weather") or [{}]
+        return {
+            "model": model,
+            "radon": _band(radon.get("value"), self.RADON_STEP),
+            "temperature": _band(environment.get("temperature"), self.TEMPERATURE_STEP),
+            "humidity": _band(environment.get("humidity"), self.HUMIDITY_STEP),
+            "outdoor_temperature": _band((weather.get("main") or {}).get("temp"), self.OUTDOOR_TEMPERATURE_STEP),
+            "outdoor_condition": (conditions[0] or {}).get("main"),
+        }
+
+    def fingerprint(self, **inputs: Any) -> Tuple[str, Dict[str, Any]]:
+        normalized = self.normalize(**inputs)
+        encoded = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest(), normalized
+
+    def get(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        entry = RecommendationCacheEntry.objects.filter(fingerprint=fingerprint).first()
+        if entry is None:
+            return None
+        now = timezone.now()
+        if entry.created_at < now - self.ttl:
+            entry.delete()
+            return None
+        RecommendationCacheEntry.objects.filter(pk=entry.pk).update(hits=F("hits") + 1, last_used_at=now)
+        return entry.response
+
+    def put(self, fingerprint: str, normalized: Dict[str, Any], response: Dict[str, Any]) -> None:
+        stored = strip_conversation_state(response)
+        now = timezone.now()
+        RecommendationCacheEntry.objects.update_or_create(
+            fingerprint=fingerprint,
+            defaults={
+                "model": normalized.get("model", ""),
+                "inputs": normalized,
+                "response": stored,
+                "hits": 0,
+                "created_at": now,
+                "last_used_at": now,
+            },
+        )
+        self.evict()
+
+    def evict(self) -> int:
+        """Drop expired entries and the least recently used ones beyond ``max_entries``."""
+
+        expired, _ = RecommendationCacheEntry.objects.filter(created_at__lt=timezone.now() - self.ttl).delete()
+        overflow = list(
+            RecommendationCacheEntry.objects.order_by("-last_used_at").values_list("pk", flat=True)[self.max_entries:]
+        )
+        if overflow:
+            RecommendationCacheEntry.objects.filter(pk__in=overflow).delete()
+        return expired + len(overflow)
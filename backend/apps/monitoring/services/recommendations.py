@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 import datetime as dt
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from django.conf import settings
 
-from .ollama import OllamaClient
+from .ollama import OllamaClient, strip_conversation_state
+from .recommendation_cache import RecommendationCache
+from .trends import TrendStats
+
+
+def _duration(seconds: float) -> str:
+    return f"{round(seconds / 60)} min" if seconds < 3600 else f"{seconds / 3600:.1f} h"
 
 
 class RecommendationEngine:
@@ -14,20 +20,30 @@ class RecommendationEngine:
     # EPA safety level for radon in pCi/L (~148 Bq/m^3)
     RADON_CAUTION_THRESHOLD = 4.0
     RADON_ELEVATED_THRESHOLD = 8.0
+    SYSTEM_PROMPT = "Provide practical home monitoring advice."
+    # Category and action for a tracked metric that stays above, or is heading for, its TREND_THRESHOLDS value.
+    TREND_ADVICE = {
+        "radon": ("air_quality", "Keep the basement ventilated or the mitigation fan running, and retest once it settles."),
+        "humidity": ("comfort", "Run a dehumidifier and improve air circulation until it comes back down."),
+        "temperature": ("comfort", "Cool the space or improve airflow, and check that vents are not blocked."),
+    }
 
     def __init__(
         self,
         ollama_client: OllamaClient,
         time_window_hours: Optional[int] = None,
+        cache: Optional[RecommendationCache] = None,
     ) -> None:
         self.ollama = ollama_client
         self.window_hours = time_window_hours or getattr(settings, "RECOMMENDATION_WINDOW_HOURS", 6)
+        self.cache = cache
 
     def _baseline_recommendations(
         self,
         radon: Optional[Dict[str, Any]],
         environment: Optional[Dict[str, Any]],
         weather: Optional[Dict[str, Any]],
+        trends: Optional[Dict[str, TrendStats]] = None,
     ) -> List[Dict[str, Any]]:
         actions: List[Dict[str, Any]] = []
 
@@ -98,6 +114,50 @@ class RecommendationEngine:
                         }
                     )
 
+        if trends:
+            actions.extend(self._trend_recommendations(trends))
+        return actions
+
+    def _trend_recommendations(self, trends: Dict[str, TrendStats]) -> List[Dict[str, Any]]:
+        """Advice for series that stayed above their threshold, or are rising towards it, over the window."""
+
+        actions: List[Dict[str, Any]] = []
+        for metric, stats in trends.items():
+            advice = self.TREND_ADVICE.get(metric)
+            if advice is None or stats.threshold is None or stats.points < settings.TREND_MIN_POINTS:
+                continue
+            category, action = advice
+            if stats.exceedance_seconds >= settings.TREND_SUSTAINED_MINUTES * 60:
+                message = (
+                    f"{metric.capitalize()} has stayed above {stats.threshold:g} for {_duration(stats.exceedance_seconds)}"
+                    f" (averaging {stats.mean:.2f} over the last {self.window_hours} h). {action}"
+                )
+                confidence = 0.85
+            elif (
+                stats.slope_per_hour > 0
+                and stats.rate_per_hour > 0
+                and max(stats.last_value, stats.ewma) < stats.threshold
+            ):
+                # Both the window's fitted slope and the recent rate must agree before projecting a crossing;
+                # a lone reading already past the threshold is a spike, not a trend.
+                hours_left = (stats.threshold - stats.ewma) / stats.slope_per_hour
+                if hours_left > self.window_hours:
+                    continue
+                message = (
+                    f"{metric.capitalize()} is rising by {stats.slope_per_hour:.2f} per hour and is on course to pass"
+                    f" {stats.threshold:g} within about {_duration(hours_left * 3600)}. {action}"
+                )
+                confidence = 0.6
+            else:
+                continue
+            actions.append(
+                {
+                    "category": category,
+                    "message": message,
+                    "confidence": confidence,
+                    "context": {"trend": stats.as_context()},
+                }
+            )
         return actions
 
     def _build_prompt(self, data: Dict[str, Any]) -> str:
@@ -118,6 +178,91 @@ class RecommendationEngine:
             f"{radon}\n\nIndoor environment:\n{environment}\n\nWeather data:\n{weather}\n"
         )
 
+    def _fingerprint(
+        self,
+        radon: Optional[Dict[str, Any]],
+        environment: Optional[Dict[str, Any]],
+        weather: Optional[Dict[str, Any]],
+        model: Optional[str],
+    ):
+        return self.cache.fingerprint(
+            radon=radon,
+            environment=environment,
+            weather=weather,
+            model=model or self.ollama.default_model,
+        )
+
+    def cached_insight(
+        self,
+        *,
+        radon: Optional[Dict[str, Any]] = None,
+        environment: Optional[Dict[str, Any]] = None,
+        weather: Optional[Dict[str, Any]] = None,
+        model: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Return a memoized Ollama response for materially identical inputs, if any."""
+
+        if self.cache is None:
+            return None
+        fingerprint, _ = self._fingerprint(radon, environment, weather, model)
+        return self.cache.get(fingerprint)
+
+    def store_insight(
+        self,
+        response: Dict[str, Any],
+        *,
+        radon: Optional[Dict[str, Any]] = None,
+        environment: Optional[Dict[str, Any]] = None,
+        weather: Optional[Dict[str, Any]] = None,
+        model: Optional[str] = None,
+    ) -> None:
+        if self.cache is None or not response.get("response"):
+            return
+        fingerprint, normalized = self._fingerprint(radon, environment, weather, model)
+        self.cache.put(fingerprint, normalized, response)
+
+    def request_insight(
+        self,
+        *,
+        radon: Optional[Dict[str, Any]] = None,
+        environment: Optional[Dict[str, Any]] = None,
+        weather: Optional[Dict[str, Any]] = None,
+        model: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Ask Ollama for fresh advice. Performs no database access, so it is safe in worker threads.
+
+        ``timeout`` overrides the client's request timeout, e.g. with what is left of a request budget.
+        """
+
+        prompt = self._build_prompt({"radon": radon, "environment": environment, "weather": weather})
+        return self.ollama.generate(prompt, model=model, system_prompt=self.SYSTEM_PROMPT, timeout=timeout)
+
+    def stream_insight(
+        self,
+        *,
+        radon: Optional[Dict[str, Any]] = None,
+        environment: Optional[Dict[str, Any]] = None,
+        weather: Optional[Dict[str, Any]] = None,
+        model: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Like ``request_insight`` but yields Ollama's streamed chunks."""
+
+        prompt = self._build_prompt({"radon": radon, "environment": environment, "weather": weather})
+        return self.ollama.generate_stream(prompt, model=model, system_prompt=self.SYSTEM_PROMPT)
+
+    @staticmethod
+    def build_insight(response: Optional[Dict[str, Any]], *, cached: bool = False) -> Optional[Dict[str, Any]]:
+        message = (response or {}).get("response") or ""
+        if not message:
+            return None
+        return {
+            "category": "ai_insight",
+            "message": message.strip(),
+            "confidence": response.get("done_reason") == "stop" and 0.75 or 0.5,
+            "context": {**strip_conversation_state(response), "cached": cached},
+        }
+
     def generate(
         self,
         *,
@@ -125,25 +270,34 @@ class RecommendationEngine:
         environment: Optional[Dict[str, Any]] = None,
         weather: Optional[Dict[str, Any]] = None,
         model: Optional[str] = None,
+        use_llm: bool = True,
+        trends: Optional[Dict[str, TrendStats]] = None,
     ) -> List[Dict[str, Any]]:
-        compiled: Dict[str, Any] = {
-            "radon": radon,
-            "environment": environment,
-            "weather": weather,
-        }
-        baseline = self._baseline_recommendations(radon, environment, weather)
+        baseline = self._baseline_recommendations(radon, environment, weather, trends)
+        if not use_llm:
+            return baseline
 
-        prompt = self._build_prompt(compiled)
-        response = self.ollama.generate(prompt, model=model, system_prompt="Provide practical home monitoring advice.")
+        inputs = {"radon": radon, "environment": environment, "weather": weather, "model": model}
+        response = self.cached_insight(**inputs)
+        cached = response is not None
+        if response is None:
+            response = self.request_insight(**inputs)
+            self.store_insight(response, **inputs)
 
-        message = response.get("response") or ""
-        if message:
-            baseline.append(
-                {
-                    "category": "ai_insight",
-                    "message": message.strip(),
-                    "confidence": response.get("done_reason") == "stop" and 0.75 or 0.5,
-                    "context": response,
-                }
-            )
+        insight = self.build_insight(response, cached=cached)
+        if insight:
+            baseline.append(insight)
         return baseline
+
+
+def build_recommendation_engine() -> Optional[RecommendationEngine]:
+    """Engine wired to the configured Ollama server and the persistent cache, or ``None``."""
+
+    if not (settings.OLLAMA_BASE_URL and settings.DEFAULT_OLLAMA_MODEL):
+        return None
+    ollama_client = OllamaClient(
+        settings.OLLAMA_BASE_URL,
+        settings.DEFAULT_OLLAMA_MODEL,
+        timeout=settings.OLLAMA_TIMEOUT_SECONDS,
+    )
+    return RecommendationEngine(ollama_client, cache=RecommendationCache())
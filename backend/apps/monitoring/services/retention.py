@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import json
+import time
+from typing import Dict, Iterable, Optional, Set
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import ReadingPayload, SensorReading
+from .rollups import raw_retention_horizon
+
+PAYLOAD_POLICIES = ("dedupe", "drop")
+
+
+def payload_digest(payload: dict) -> str:
+    """SHA-256 of the canonical JSON encoding, so equal payloads share one digest."""
+
+    encoded = json.dumps(payload, cls=DjangoJSONEncoder, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _pause() -> None:
+    if settings.RETENTION_CHUNK_PAUSE_SECONDS:
+        time.sleep(settings.RETENTION_CHUNK_PAUSE_SECONDS)
+
+
+def compact_payloads(cutoff: dt.datetime, *, policy: Optional[str] = None, chunk_size: Optional[int] = None) -> int:
+    """Strip ``raw_payload`` from readings older than ``cutoff``, one short transaction per chunk.
+
+    ``dedupe`` moves each distinct payload into ``ReadingPayload`` and keeps its
+    digest on the reading; ``drop`` discards it. Returns the number of rows compacted.
+    """
+
+    policy = policy or settings.READING_PAYLOAD_POLICY
+    if policy not in PAYLOAD_POLICIES:
+        raise ValueError(f"Unknown payload policy {policy!r}; choose from {', '.join(PAYLOAD_POLICIES)}")
+    chunk_size = chunk_size or settings.RETENTION_CHUNK_SIZE
+
+    compacted = 0
+    last_id = 0
+    while True:
+        rows = list(
+            SensorReading.objects.filter(id__gt=last_id, timestamp__lt=cutoff)
+            .exclude(raw_payload={})
+            .order_by("id")
+            .only("id", "raw_payload", "payload_digest")[:chunk_size]
+        )
+        if not rows:
+            return compacted
+        last_id = rows[-1].id
+
+        payloads: Dict[str, dict] = {}
+        for row in rows:
+            if policy == "dedupe":
+                row.payload_digest = payload_digest(row.raw_payload)
+                payloads[row.payload_digest] = row.raw_payload
+            row.raw_payload = {}
+
+        with transaction.atomic():
+            if payloads:
+                ReadingPayload.objects.bulk_create(
+                    [ReadingPayload(digest=digest, payload=payload) for digest, payload in payloads.items()],
+                    ignore_conflicts=True,
+                )
+            SensorReading.objects.bulk_update(rows, ["raw_payload", "payload_digest"])
+        compacted += len(rows)
+        _pause()
+
+
+def purge_raw_readings(cutoff: dt.datetime, *, chunk_size: Optional[int] = None) -> int:
+    """Delete raw readings older than ``cutoff`` in bounded chunks; rollups are left intact."""
+
+    chunk_size = chunk_size or settings.RETENTION_CHUNK_SIZE
+    deleted = 0
+    released: Set[str] = set()
+    while True:
+        # Unordered on purpose: every row before the cutoff goes, and without a sort
+        # PostgreSQL can read a chunk straight off the BRIN timestamp index.
+        rows = list(
+            SensorReading.objects.filter(timestamp__lt=cutoff)
+            .order_by()
+            .values_list("id", "payload_digest")[:chunk_size]
+        )
+        if not rows:
+            break
+        released.update(digest for _, digest in rows if digest)
+        with transaction.atomic():
+            count, _ = SensorReading.objects.filter(id__in=[pk for pk, _ in rows]).delete()
+        deleted += count
+        _pause()
+
+    delete_orphaned_payloads(released, chunk_size=chunk_size)
+    return deleted
+
+
+def delete_orphaned_payloads(digests: Iterable[str], *, chunk_size: Optional[int] = None) -> int:
+    """Delete the payloads among ``digests`` that no reading refers to any more, a chunk at a time.
+
+    Only the digests released by a purge are checked, each against the partial
+    ``reading_payload_digest`` index, so the sweep never scans the readings table.
+    """
+
+    chunk_size = chunk_size or settings.RETENTION_CHUNK_SIZE
+    ordered = sorted(digests)
+    deleted = 0
+    for offset in range(0, len(ordered), chunk_size):
+        chunk = ordered[offset:offset + chunk_size]
+        referenced = set(
+            SensorReading.objects.filter(payload_digest__in=chunk)
+            .exclude(payload_digest="")
+            .order_by()
+            .values_list("payload_digest", flat=True)
+            .distinct()
+        )
+        orphaned = [digest for digest in chunk if digest not in referenced]
+        count, _ = ReadingPayload.objects.filter(digest__in=orphaned).delete()
+        deleted += count
+        _pause()
+    return deleted
+
+
+def apply_retention(now: Optional[dt.datetime] = None) -> Dict[str, int]:
+    """Run payload compaction and raw-row purging according to the retention settings."""
+
+    now = now or timezone.now()
+    result = {"payloads_compacted": 0, "readings_deleted": 0}
+    # Purge first so compaction does not rewrite rows that are about to be deleted.
+    horizon = raw_retention_horizon(now)
+    if horizon is not None:
+        result["readings_deleted"] = purge_raw_readings(horizon)
+    if settings.READING_PAYLOAD_RETENTION_DAYS:
+        cutoff = now - dt.timedelta(days=settings.READING_PAYLOAD_RETENTION_DAYS)
+        result["payloads_compacted"] = compact_payloads(cutoff)
+    return result
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import datetime as dt
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+
+from django.conf import settings
+from django.db.models import Count, Max, Min, Sum
+from django.utils import timezone
+
+from ..models import ReadingRollup, SensorReading, SensorReadingDaily, SensorReadingHourly
+from .history import EpochBucket
+
+HOUR = 3600
+DAY = 86400
+REBUILD_CHUNK = dt.timedelta(days=30)
+
+
+def floor_timestamp(value: dt.datetime, seconds: int) -> dt.datetime:
+    """Floor an aware datetime to an epoch-aligned bucket (UTC)."""
+
+    epoch = int(value.timestamp()) // seconds * seconds
+    return dt.datetime.fromtimestamp(epoch, tz=dt.timezone.utc)
+
+
+def raw_retention_horizon(now: Optional[dt.datetime] = None) -> Optional[dt.datetime]:
+    """Oldest instant for which raw readings are still complete, or ``None`` without retention.
+
+    Retention purges strictly before this (day-aligned) instant, so rollup buckets
+    before it can no longer be recomputed from raw rows.
+    """
+
+    days = settings.READING_RAW_RETENTION_DAYS
+    if not days:
+        return None
+    return floor_timestamp((now or timezone.now()) - dt.timedelta(days=days), DAY)
+
+
+def _aggregate(queryset, *, time_field: str, bucket_seconds: int, count, total, low, high, last_field: str, value_field: str):
+    """Group ``queryset`` into buckets and attach the value at each bucket's newest timestamp."""
+
+    groups = list(
+        queryset.annotate(bucket=EpochBucket(time_field, bucket_seconds))
+        .values("bucket")
+        .annotate(count=count, sum=total, min=low, max=high, last_timestamp=Max(last_field))
+        .order_by("bucket")
+    )
+    if not groups:
+        return []
+    last_values = dict(
+        queryset.filter(**{f"{last_field}__in": [group["last_timestamp"] for group in groups]})
+        .order_by()
+        .values_list(last_field, value_field)
+    )
+    for group in groups:
+        group["bucket_start"] = dt.datetime.fromtimestamp(group.pop("bucket"), tz=dt.timezone.utc)
+        group["last"] = last_values[group["last_timestamp"]]
+    return groups
+
+
+def _write(model: Type[ReadingRollup], device_id: int, metric: str, groups: List[dict]) -> int:
+    if not groups:
+        return 0
+    model.objects.bulk_create(
+        [model(device_id=device_id, metric=metric, **group) for group in groups],
+        update_conflicts=True,
+        unique_fields=["device", "metric", "bucket_start"],
+        update_fields=["count", "sum", "min", "max", "last", "last_timestamp"],
+    )
+    return len(groups)
+
+
+def _rollup_hours(device_id: int, metric: str, hour_start: dt.datetime, hour_end: dt.datetime) -> int:
+    raw = SensorReading.objects.filter(
+        device_id=device_id, metric=metric, timestamp__gte=hour_start, timestamp__lt=hour_end
+    )
+    hourly = _aggregate(
+        raw,
+        time_field="timestamp",
+        bucket_seconds=HOUR,
+        count=Count("value"),
+        total=Sum("value"),
+        low=Min("value"),
+        high=Max("value"),
+        last_field="timestamp",
+        value_field="value",
+    )
+    return _write(SensorReadingHourly, device_id, metric, hourly)
+
+
+def _rollup_days(device_id: int, metric: str, day_start: dt.datetime, day_end: dt.datetime) -> int:
+    hours = SensorReadingHourly.objects.filter(
+        device_id=device_id, metric=metric, bucket_start__gte=day_start, bucket_start__lt=day_end
+    )
+    daily = _aggregate(
+        hours,
+        time_field="bucket_start",
+        bucket_seconds=DAY,
+        count=Sum("count"),
+        total=Sum("sum"),
+        low=Min("min"),
+        high=Max("max"),
+        last_field="last_timestamp",
+        value_field="last",
+    )
+    return _write(SensorReadingDaily, device_id, metric, daily)
+
+
+def _runs(buckets: Iterable[dt.datetime], seconds: int) -> List[Tuple[dt.datetime, dt.datetime]]:
+    """Merge bucket starts into ``[start, end)`` runs of adjacent buckets."""
+
+    step = dt.timedelta(seconds=seconds)
+    runs: List[Tuple[dt.datetime, dt.datetime]] = []
+    for bucket in sorted(set(buckets)):
+        if runs and runs[-1][1] == bucket:
+            runs[-1] = (runs[-1][0], bucket + step)
+        else:
+            runs.append((bucket, bucket + step))
+    return runs
+
+
+def rollup_range(device_id: int, metric: str, start: dt.datetime, end: dt.datetime) -> int:
+    """Recompute hourly rollups from raw rows, then daily rollups from hourly, for ``[start, end)``.
+
+    ``start``/``end`` are widened to whole days so daily buckets stay complete.
+    """
+
+    day_start = floor_timestamp(start, DAY)
+    day_end = floor_timestamp(end - dt.timedelta(microseconds=1), DAY) + dt.timedelta(days=1)
+    hour_start = floor_timestamp(start, HOUR)
+    hour_end = floor_timestamp(end - dt.timedelta(microseconds=1), HOUR) + dt.timedelta(hours=1)
+    written = _rollup_hours(device_id, metric, hour_start, hour_end)
+    return written + _rollup_days(device_id, metric, day_start, day_end)
+
+
+def refresh_rollups(rows: Iterable[SensorReading]) -> int:
+    """Incrementally refresh only the buckets touched by freshly written ``rows``.
+
+    Only the distinct touched hours are recomputed from raw rows (adjacent hours
+    in one query), then the touched days from their hourly rollups; a late row
+    does not drag the untouched buckets between it and the current ones along.
+
+    Rows must be newer than ``raw_retention_horizon()``; older rows go through
+    ``merge_rollups`` because their buckets may already be compacted.
+    """
+
+    touched: Dict[Tuple[int, str], List[dt.datetime]] = defaultdict(list)
+    for row in rows:
+        touched[(row.device_id, row.metric)].append(row.timestamp)
+    written = 0
+    for (device_id, metric), timestamps in touched.items():
+        for hour_start, hour_end in _runs((floor_timestamp(ts, HOUR) for ts in timestamps), HOUR):
+            written += _rollup_hours(device_id, metric, hour_start, hour_end)
+        for day_start, day_end in _runs((floor_timestamp(ts, DAY) for ts in timestamps), DAY):
+            written += _rollup_days(device_id, metric, day_start, day_end)
+    return written
+
+
+def _merge(model: Type[ReadingRollup], seconds: int, rows: List[SensorReading]) -> int:
+    deltas: Dict[Tuple[int, str, dt.datetime], dict] = {}
+    for row in rows:
+        key = (row.device_id, row.metric, floor_timestamp(row.timestamp, seconds))
+        delta = deltas.setdefault(
+            key,
+            {"count": 0, "sum": 0.0, "min": row.value, "max": row.value, "last": row.value, "last_timestamp": row.timestamp},
+        )
+        delta["count"] += 1
+        delta["sum"] += row.value
+        delta["min"] = min(delta["min"], row.value)
+        delta["max"] = max(delta["max"], row.value)
+        if row.timestamp >= delta["last_timestamp"]:
+            delta["last"], delta["last_timestamp"] = row.value, row.timestamp
+
+    existing = model.objects.filter(
+        device_id__in={key[0] for key in deltas},
+        metric__in={key[1] for key in deltas},
+        bucket_start__in={key[2] for key in deltas},
+    )
+    for rollup in existing:
+        delta = deltas.get((rollup.device_id, rollup.metric, rollup.bucket_start))
+        if delta is None:
+            continue
+        delta["count"] += rollup.count
+        delta["sum"] += rollup.sum
+        delta["min"] = min(delta["min"], rollup.min)
+        delta["max"] = max(delta["max"], rollup.max)
+        if rollup.last_timestamp > delta["last_timestamp"]:
+            delta["last"], delta["last_timestamp"] = rollup.last, rollup.last_timestamp
+
+    model.objects.bulk_create(
+        [
+            model(device_id=device_id, metric=metric, bucket_start=bucket_start, **delta)
+            for (device_id, metric, bucket_start), delta in deltas.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["device", "metric", "bucket_start"],
+        update_fields=["count", "sum", "min", "max", "last", "last_timestamp"],
+    )
+    return len(deltas)
+
+
+def merge_rollups(rows: Iterable[SensorReading]) -> int:
+    """Add brand-new rows older than the raw horizon into existing rollups additively.
+
+    Used for backfills into compacted ranges, where recomputing from raw rows
+    would discard the already-purged history.
+    """
+
+    rows = list(rows)
+    if not rows:
+        return 0
+    return _merge(SensorReadingHourly, HOUR, rows) + _merge(SensorReadingDaily, DAY, rows)
+
+
+def rebuild_rollups(
+    start: dt.datetime,
+    end: dt.datetime,
+    *,
+    device_id: Optional[int] = None,
+    metric: Optional[str] = None,
+) -> int:
+    """Drop and recompute hourly/daily rollups for ``[start, end)`` from raw readings.
+
+    The range is clamped to ``raw_retention_horizon()`` so compacted history is kept.
+    """
+
+    horizon = raw_retention_horizon()
+    if horizon is not None:
+        start = max(start, horizon)
+        if start >= end:
+            return 0
+
+    filters = {}
+    if device_id is not None:
+        filters["device_id"] = device_id
+    if metric is not None:
+        filters["metric"] = metric
+
+    day_start = floor_timestamp(start, DAY)
+    day_end = floor_timestamp(end - dt.timedelta(microseconds=1), DAY) + dt.timedelta(days=1)
+    for model in (SensorReadingHourly, SensorReadingDaily):
+        model.objects.filter(bucket_start__gte=day_start, bucket_start__lt=day_end, **filters).delete()
+
+    pairs = (
+        SensorReading.objects.filter(timestamp__gte=day_start, timestamp__lt=day_end, **filters)
+        .order_by()
+        .values_list("device_id", "metric")
+        .distinct()
+    )
+    written = 0
+    for pair_device, pair_metric in pairs:
+        # Chunk long ranges so the "last value" lookups stay within driver parameter limits.
+        chunk_start = day_start
+        while chunk_start < day_end:
+            chunk_end = min(chunk_start + REBUILD_CHUNK, day_end)
+            written += rollup_range(pair_device, pair_metric, chunk_start, chunk_end)
+            chunk_start = chunk_end
+    return written
@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import datetime as dt
+import math
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from ..models import SensorReading
+
+# Store keys are (series << KEY_SHIFT) | milliseconds since the tracker's origin, so one
+# sorted int64 array orders every point by series, then time (~139 years of milliseconds).
+KEY_SHIFT = 42
+# Updates between exact recomputations of the running sums, bounding floating-point drift.
+RESYNC_EVERY = 500
+
+
+class TrendStats(NamedTuple):
+    """Statistics of one (device, metric) series over the tracker's window."""
+
+    metric: str
+    points: int
+    last_value: float
+    last_timestamp: dt.datetime
+    mean: float
+    ewma: float
+    slope_per_hour: float
+    rate_per_hour: float
+    exceedance_seconds: float
+    threshold: Optional[float]
+
+    def as_context(self) -> Dict[str, Any]:
+        """JSON-safe form for ``Recommendation.context``."""
+
+        return {
+            "metric": self.metric,
+            "points": self.points,
+            "last_value": round(self.last_value, 3),
+            "last_timestamp": self.last_timestamp.isoformat(),
+            "mean": round(self.mean, 3),
+            "ewma": round(self.ewma, 3),
+            "slope_per_hour": round(self.slope_per_hour, 4),
+            "rate_per_hour": round(self.rate_per_hour, 4),
+            "exceedance_seconds": round(self.exceedance_seconds),
+            "threshold": self.threshold,
+        }
+
+
+class TrendTracker:
+    """Rolling trend statistics for every (device, metric) series, maintained incrementally.
+
+    ``refresh`` pulls only readings written since the last call (by ``updated_at``,
+    re-reading an overlap so late commits are not missed) and folds them into
+    per-series state held in NumPy arrays, one slot per series.
+    Every step operates on all series at once:
+
+    - mean and least-squares slope come from running sums (n, Σt, Σv, Σt², Σtv)
+      that new points add to and points leaving the window subtract from;
+    - the time-weighted EWMA (half-life ``halflife_minutes``) is advanced in
+      closed form for each series' whole batch, so irregular polling intervals
+      are weighted correctly;
+    - the exceedance clock records since when each series has stayed above its
+      threshold.
+
+    The window's points are kept in one array sorted by (series, time), which
+    yields the value ``rate_horizon_minutes`` ago for the rate of change.
+    Readings older than a series' newest point (late backfills) are ignored. A
+    new value for a point still in the window (an in-place upsert) replaces it
+    in the mean, slope, rate and last value; the EWMA and exceedance clock keep
+    the value they were advanced with.
+    """
+
+    def __init__(
+        self,
+        *,
+        window_hours: Optional[float] = None,
+        halflife_minutes: Optional[float] = None,
+        rate_horizon_minutes: Optional[float] = None,
+        thresholds: Optional[Dict[str, float]] = None,
+        overlap_seconds: Optional[float] = None,
+    ) -> None:
+        self.window = (window_hours or settings.RECOMMENDATION_WINDOW_HOURS) * 3600.0
+        self.tau = (halflife_minutes or settings.TREND_EWMA_HALFLIFE_MINUTES) * 60.0 / math.log(2)
+        self.horizon = (rate_horizon_minutes or settings.TREND_RATE_HORIZON_MINUTES) * 60.0
+        self.thresholds = dict(settings.TREND_THRESHOLDS if thresholds is None else thresholds)
+        self.overlap = dt.timedelta(
+            seconds=settings.TREND_REFRESH_OVERLAP_SECONDS if overlap_seconds is None else overlap_seconds
+        )
+        self.origin: Optional[float] = None
+        self.watermark: Optional[dt.datetime] = None
+        self._lock = threading.Lock()
+        # (pk, updated_at) of rows folded in that the next overlap may read again.
+        self._seen: Set[Tuple[int, dt.datetime]] = set()
+        self._updates = 0
+        self._center = 0.0
+        self._series: List[Tuple[int, str]] = []
+        self._index: Dict[Tuple[int, str], int] = {}
+        self._by_device: Dict[int, List[int]] = {}
+
+        self._threshold = np.empty(0)
+        self._n = np.zeros(0, dtype=np.int64)
+        # Running sums with t measured from self._center, re-centred on every update.
+        self._sum_t = np.zeros(0)
+        self._sum_v = np.zeros(0)
+        self._sum_tt = np.zeros(0)
+        self._sum_tv = np.zeros(0)
+        self._ewma = np.empty(0)
+        self._last_t = np.empty(0)
+        self._last_v = np.empty(0)
+        self._exceed_since = np.empty(0)
+
+        self._keys = np.empty(0, dtype=np.int64)
+        self._t = np.empty(0)
+        self._v = np.empty(0)
+
+    def refresh(self, now: Optional[dt.datetime] = None) -> int:
+        """Fold readings written since the previous refresh into the statistics; returns the rows folded in.
+
+        The first call loads the trailing window. Later calls read rows updated
+        from ``overlap`` before the newest write already seen, which catches
+        transactions that committed out of order and in-place upserts; rows read
+        before are skipped. The query runs without the lock held.
+        """
+
+        now = now or timezone.now()
+        started = timezone.now()
+        with self._lock:
+            watermark = self.watermark
+        readings = SensorReading.objects.filter(metric__in=list(self.thresholds))
+        if watermark is None:
+            readings = readings.filter(timestamp__gte=now - dt.timedelta(seconds=self.window))
+        else:
+            readings = readings.filter(updated_at__gte=watermark - self.overlap)
+        fetched = list(readings.values_list("id", "updated_at", "device_id", "metric", "timestamp", "value"))
+
+        with self._lock:
+            if self.origin is None:
+                self.origin = math.floor(now.timestamp() - self.window)
+            rows = [row for row in fetched if (row[0], row[1]) not in self._seen]
+            self.watermark = max([self.watermark or started, *(row[1] for row in rows)])
+            horizon = self.watermark - self.overlap
+            self._seen = {key for key in self._seen if key[1] >= horizon}
+            self._seen.update((row[0], row[1]) for row in rows if row[1] >= horizon)
+            series = np.fromiter((self._series_for(row[2], row[3]) for row in rows), dtype=np.int64, count=len(rows))
+            times = np.fromiter((row[4].timestamp() - self.origin for row in rows), dtype=float, count=len(rows))
+            values = np.fromiter((row[5] for row in rows), dtype=float, count=len(rows))
+            self._update(series, times, values, now.timestamp() - self.origin)
+            return len(rows)
+
+    def _series_for(self, device_id: int, metric: str) -> int:
+        key = (device_id, metric)
+        index = self._index.get(key)
+        if index is None:
+            index = self._index[key] = len(self._series)
+            self._series.append(key)
+            self._by_device.setdefault(device_id, []).append(index)
+        return index
+
+    def _grow(self) -> None:
+        missing = len(self._series) - len(self._n)
+        if missing <= 0:
+            return
+        new_thresholds = [self.thresholds.get(metric, np.nan) for _, metric in self._series[len(self._n):]]
+        self._threshold = np.concatenate([self._threshold, np.asarray(new_thresholds, dtype=float)])
+        self._n = np.concatenate([self._n, np.zeros(missing, dtype=np.int64)])
+        for name in ("_sum_t", "_sum_v", "_sum_tt", "_sum_tv"):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(missing)]))
+        for name, fill in (("_ewma", np.nan), ("_last_t", -np.inf), ("_last_v", np.nan), ("_exceed_since", np.nan)):
+            setattr(self, name, np.concatenate([getattr(self, name), np.full(missing, fill)]))
+
+    def _update(self, series: np.ndarray, times: np.ndarray, values: np.ndarray, now: float) -> None:
+        self._grow()
+        size = len(self._n)
+
+        if len(self._keys) and len(series):
+            # Points already in the window were upserted in place: swap their stored value.
+            keys = (series << KEY_SHIFT) | np.round(times * 1000).astype(np.int64)
+            positions = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+            corrected = (self._keys[positions] == keys) & np.isfinite(values)
+            if corrected.any():
+                at, touched = positions[corrected], series[corrected]
+                self._add_sums(touched, self._t[at], self._v[at], sign=-1.0, size=size)
+                self._add_sums(touched, self._t[at], values[corrected], sign=1.0, size=size)
+                self._v[at] = values[corrected]
+                newest = self._last_t[touched] == self._t[at]
+                self._last_v[touched[newest]] = values[corrected][newest]
+
+        # Only points inside the window and newer than their series' newest point, ordered by (series, time).
+        keep = (times > self._last_t[series]) & (times >= now - self.window) & np.isfinite(values)
+        series, times, values = series[keep], times[keep], values[keep]
+        order = np.lexsort((times, series))
+        series, times, values = series[order], times[order], values[order]
+
+        if len(series):
+            starts = np.flatnonzero(np.r_[True, series[1:] != series[:-1]])
+            ends = np.r_[starts[1:], len(series)] - 1
+            touched = series[starts]
+
+            self._add_sums(series, times, values, sign=1.0, size=size)
+            self._advance_ewma(series, times, values, starts, ends, touched, size)
+            self._advance_exceedance(series, times, values, starts, ends, touched)
+            self._last_t[touched] = times[ends]
+            self._last_v[touched] = values[ends]
+
+            keys = (series << KEY_SHIFT) | np.round(times * 1000).astype(np.int64)
+            positions = np.searchsorted(self._keys, keys)
+            self._keys = np.insert(self._keys, positions, keys)
+            self._t = np.insert(self._t, positions, times)
+            self._v = np.insert(self._v, positions, values)
+
+        expired = self._t < now - self.window
+        if expired.any():
+            self._add_sums(self._keys[expired] >> KEY_SHIFT, self._t[expired], self._v[expired], sign=-1.0, size=size)
+            self._keys, self._t, self._v = self._keys[~expired], self._t[~expired], self._v[~expired]
+
+        self._recenter(now)
+        self._updates += 1
+        if self._updates % RESYNC_EVERY == 0:
+            self._resync(size)
+
+    def _add_sums(self, series: np.ndarray, times: np.ndarray, values: np.ndarray, *, sign: float, size: int) -> None:
+        t = times - self._center
+        self._n += (sign * np.bincount(series, minlength=size)).astype(np.int64)
+        self._sum_t += sign * np.bincount(series, weights=t, minlength=size)
+        self._sum_v += sign * np.bincount(series, weights=values, minlength=size)
+        self._sum_tt += sign * np.bincount(series, weights=t * t, minlength=size)
+        self._sum_tv += sign * np.bincount(series, weights=t * values, minlength=size)
+
+    def _recenter(self, center: float) -> None:
+        shift = center - self._center
+        self._sum_tt += -2 * shift * self._sum_t + self._n * shift * shift
+        self._sum_tv -= shift * self._sum_v
+        self._sum_t -= self._n * shift
+        self._center = center
+
+    def _resync(self, size: int) -> None:
+        for name in ("_sum_t", "_sum_v", "_sum_tt", "_sum_tv"):
+            setattr(self, name, np.zeros(size))
+        self._n = np.zeros(size, dtype=np.int64)
+        self._add_sums(self._keys >> KEY_SHIFT, self._t, self._v, sign=1.0, size=size)
+
+    def _advance_ewma(self, series, times, values, starts, ends, touched, size) -> None:
+        # e(T) = e0·exp(-(T - t0)/τ) + Σ (1 - exp(-(tᵢ - tᵢ₋₁)/τ))·vᵢ·exp(-(T - tᵢ)/τ); the weights sum to one.
+        # A new series starts from its first value.
+        fresh = np.isnan(self._ewma[touched])
+        start_t = np.where(fresh, times[starts], self._last_t[touched])
+        start_v = np.where(fresh, values[starts], self._ewma[touched])
+        previous = np.r_[np.nan, times[:-1]]
+        previous[starts] = start_t
+        end_t = np.repeat(times[ends], ends - starts + 1)
+        weights = -np.expm1(-(times - previous) / self.tau) * np.exp(-(end_t - times) / self.tau)
+        carried = np.bincount(series, weights=weights * values, minlength=size)[touched]
+        self._ewma[touched] = start_v * np.exp(-(times[ends] - start_t) / self.tau) + carried
+
+    def _advance_exceedance(self, series, times, values, starts, ends, touched) -> None:
+        # Unthresholded metrics compare against NaN, so they never exceed.
+        below = ~(values > self._threshold[series])
+        last_below = np.maximum.reduceat(np.where(below, np.arange(len(series)), -1), starts)
+        since = self._exceed_since[touched]
+        all_above = last_below < starts
+        since = np.where(all_above & np.isnan(since), times[starts], since)
+        ends_below = last_below == ends
+        since = np.where(ends_below, np.nan, since)
+        recovered = ~all_above & ~ends_below
+        since[recovered] = times[last_below[recovered] + 1]
+        self._exceed_since[touched] = since
+
+    def device_stats(self, device_id: int) -> Dict[str, TrendStats]:
+        """Statistics per metric for one device; series without points in the window are left out."""
+
+        with self._lock:
+            indices = np.asarray(self._by_device.get(device_id, []), dtype=np.int64)
+            return {stats.metric: stats for stats in self._stats(indices)}
+
+    def all_stats(self) -> Dict[int, Dict[str, TrendStats]]:
+        """Statistics for every device, keyed by device id and metric."""
+
+        with self._lock:
+            result: Dict[int, Dict[str, TrendStats]] = {}
+            indices = self._with_points(np.arange(len(self._n)))
+            for index, stats in zip(indices, self._stats(indices)):
+                result.setdefault(self._series[index][0], {})[stats.metric] = stats
+            return result
+
+    def _with_points(self, indices: np.ndarray) -> np.ndarray:
+        return indices[self._n[indices] > 0] if len(indices) else indices
+
+    def _stats(self, indices: np.ndarray) -> List[TrendStats]:
+        indices = self._with_points(indices)
+        if not len(indices):
+            return []
+        n = self._n[indices].astype(float)
+        sum_t, sum_v = self._sum_t[indices], self._sum_v[indices]
+        mean = sum_v / n
+        denominator = n * self._sum_tt[indices] - sum_t * sum_t
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = np.where(
+                (n > 1) & (denominator > 0), (n * self._sum_tv[indices] - sum_t * sum_v) / denominator * 3600, 0.0
+            )
+
+        # Rate of change against the last point at or before the horizon (or the window's first point).
+        last_t, last_v = self._last_t[indices], self._last_v[indices]
+        first = np.searchsorted(self._keys, indices << KEY_SHIFT)
+        at_horizon = np.searchsorted(
+            self._keys, (indices << KEY_SHIFT) | np.round((last_t - self.horizon) * 1000).astype(np.int64), side="right"
+        ) - 1
+        reference = np.maximum(at_horizon, first)
+        elapsed = last_t - self._t[reference]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rate = np.where(elapsed > 0, (last_v - self._v[reference]) / elapsed * 3600, 0.0)
+
+        since = self._exceed_since[indices]
+        exceedance = np.where(np.isnan(since), 0.0, last_t - since)
+        origin = self.origin or 0.0
+        return [
+            TrendStats(
+                metric=self._series[index][1],
+                points=int(self._n[index]),
+                last_value=float(last_v[position]),
+                last_timestamp=dt.datetime.fromtimestamp(origin + float(last_t[position]), tz=dt.timezone.utc),
+                mean=float(mean[position]),
+                ewma=float(self._ewma[index]),
+                slope_per_hour=float(slope[position]),
+                rate_per_hour=float(rate[position]),
+                exceedance_seconds=float(exceedance[position]),
+                threshold=self.thresholds.get(self._series[index][1]),
+            )
+            for position, index in enumerate(indices)
+        ]
+
+
+_tracker: Optional[TrendTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_trend_tracker() -> TrendTracker:
+    """Process-wide tracker; callers ``refresh`` it before reading."""
+
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                _tracker = TrendTracker()
+    return _tracker
+
+
+def reset_trend_tracker() -> None:
+    global _tracker
+    with _tracker_lock:
+        _tracker = None
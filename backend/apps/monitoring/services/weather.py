@@ -4,6 +4,10 @@ from typing import Any, Dict, Optional
 
 import requests
 
+from .breaker import CircuitBreaker, get_breaker
+from .http import get_session
+from .metrics import track_upstream
+
 
 class WeatherClient:
     """Fetch current weather conditions from a supported provider."""
@@ -14,13 +18,27 @@ class WeatherClient:
         api_key: str,
         timeout: int = 10,
         session: Optional[requests.Session] = None,
+        breaker: Optional[CircuitBreaker] = None,
     ) -> None:
         if not api_key:
             raise ValueError("Weather API key is required")
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
         self.timeout = timeout
-        self.session = session or requests.Session()
+        self.session = session or get_session(self.base_url)
+        self.breaker = breaker or get_breaker("weather")
+
+    def _get(self, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        with track_upstream("weather", self.base_url, path) as call, self.breaker.guard(self.timeout):
+            response = call.observe(
+                self.session.get(
+                    f"{self.base_url}{path}",
+                    params=params,
+                    timeout=self.timeout,
+                )
+            )
+            response.raise_for_status()
+            return response.json()
 
     def current_by_coordinates(self, latitude: float, longitude: float, units: str = "metric") -> Dict[str, Any]:
         params = {
@@ -29,13 +47,7 @@ class WeatherClient:
             "appid": self.api_key,
             "units": units,
         }
-        response = self.session.get(
-            f"{self.base_url}/weather",
-            params=params,
-            timeout=self.timeout,
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._get("/weather", params)
 
     def current_by_city(self, city: str, country_code: Optional[str] = None, units: str = "metric") -> Dict[str, Any]:
         query = f"{city},{country_code}" if country_code else city
@@ -44,10 +56,4 @@ class WeatherClient:
             "appid": self.api_key,
             "units": units,
         }
-        response = self.session.get(
-            f"{self.base_url}/weather",
-            params=params,
-            timeout=self.timeout,
-        )
-        response.raise_for_status()
-        return response.json()
+        return self._get("/weather", params)
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import datetime as dt
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Avg, Count, Max, Min
+from django.utils import timezone
+
+from ..models import WeatherObservation
+from .weather import WeatherClient
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _run_in_background(fn: Callable[[], None]) -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="weather-refresh")
+
+    def task() -> None:
+        try:
+            fn()
+        finally:
+            connections.close_all()
+
+    _executor.submit(task)
+
+
+class WeatherBudgetExceeded(RuntimeError):
+    """The per-API-key request budget is spent and no cached conditions are available."""
+
+
+class WeatherLocation(NamedTuple):
+    """Quantized coordinates or a normalized city name; nearby requests share one ``key``."""
+
+    latitude: Optional[float]
+    longitude: Optional[float]
+    city: Optional[str]
+
+    @classmethod
+    def from_params(cls, latitude: Any, longitude: Any, city: Any) -> Optional["WeatherLocation"]:
+        """Raise ``ValueError`` for unparsable coordinates; return ``None`` without a location."""
+
+        if latitude and longitude:
+            precision = settings.WEATHER_COORD_PRECISION
+            return cls(round(float(latitude), precision), round(float(longitude), precision), None)
+        if city:
+            return cls(None, None, " ".join(str(city).split()).lower())
+        return None
+
+    @property
+    def key(self) -> str:
+        if self.city:
+            return f"city:{self.city}"
+        precision = settings.WEATHER_COORD_PRECISION
+        return f"coord:{self.latitude:.{precision}f},{self.longitude:.{precision}f}"
+
+
+class WeatherCache:
+    """Serve current conditions from the cache, refreshing through ``WeatherClient`` sparingly.
+
+    Entries are fresh for ``ttl`` seconds; for a further ``stale`` seconds they
+    are still served while one background refresh runs. Provider calls are
+    capped at ``budget`` per ``budget_window`` seconds per API key; once spent,
+    the newest cached or recorded observation is served instead. Every lookup
+    is recorded as a ``WeatherObservation`` row.
+    """
+
+    def __init__(
+        self,
+        client: WeatherClient,
+        *,
+        ttl: Optional[float] = None,
+        stale: Optional[float] = None,
+        budget: Optional[int] = None,
+        budget_window: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+        background: Callable[[Callable[[], None]], None] = _run_in_background,
+    ) -> None:
+        self.client = client
+        self.ttl = ttl or settings.WEATHER_CACHE_TTL_SECONDS
+        self.stale = stale if stale is not None else settings.WEATHER_CACHE_STALE_SECONDS
+        self.budget = budget or settings.WEATHER_REQUEST_BUDGET
+        self.budget_window = budget_window or settings.WEATHER_BUDGET_WINDOW_SECONDS
+        self.clock = clock
+        self.background = background
+
+    def _cache_key(self, location: WeatherLocation) -> str:
+        return f"weather:{location.key}"
+
+    def _budget_key(self) -> str:
+        account = hashlib.sha256(self.client.api_key.encode("utf-8")).hexdigest()[:16]
+        return f"weather:budget:{account}:{int(self.clock() // self.budget_window)}"
+
+    def budget_remaining(self) -> int:
+        return max(0, self.budget - (cache.get(self._budget_key()) or 0))
+
+    def _take_budget(self) -> bool:
+        key = self._budget_key()
+        cache.add(key, 0, timeout=int(self.budget_window) + 1)
+        try:
+            return cache.incr(key) <= self.budget
+        except ValueError:  # the window rolled over between add and incr
+            cache.set(key, 1, timeout=int(self.budget_window) + 1)
+            return True
+
+    def latest_observation(self, location: WeatherLocation) -> Optional[Dict[str, Any]]:
+        """Newest recorded conditions still within the stale window, the fallback once the budget is spent."""
+
+        since = timezone.now() - dt.timedelta(seconds=self.ttl + self.stale)
+        observation = (
+            WeatherObservation.objects.filter(location_key=location.key, created_at__gte=since)
+            .order_by("-observed_at")
+            .only("payload")
+            .first()
+        )
+        return observation.payload if observation else None
+
+    def lookup(self, location: WeatherLocation) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Return ``(payload, needs_fetch)`` without calling the provider in the foreground.
+
+        Raises ``WeatherBudgetExceeded`` when a fetch is needed, no budget is left,
+        and there is no recorded observation to fall back to.
+        """
+
+        entry = cache.get(self._cache_key(location))
+        if entry is not None:
+            age = self.clock() - entry["fetched_at"]
+            if age < self.ttl:
+                return entry["payload"], False
+            if age < self.ttl + self.stale:
+                self._refresh_in_background(location)
+                return entry["payload"], False
+        if self.budget_remaining() > 0:
+            return None, True
+        return self._fallback(location), False
+
+    def _fallback(self, location: WeatherLocation) -> Dict[str, Any]:
+        fallback = self.latest_observation(location)
+        if fallback is None:
+            raise WeatherBudgetExceeded("Weather request budget exhausted and no cached conditions are available")
+        return fallback
+
+    def fetch(self, location: WeatherLocation) -> Dict[str, Any]:
+        """Call the provider (no database access, safe in worker threads)."""
+
+        if not self._take_budget():
+            raise WeatherBudgetExceeded("Weather request budget exhausted")
+        if location.city:
+            return self.client.current_by_city(location.city)
+        return self.client.current_by_coordinates(location.latitude, location.longitude)
+
+    def store(self, location: WeatherLocation, payload: Dict[str, Any]) -> None:
+        cache.set(
+            self._cache_key(location),
+            {"payload": payload, "fetched_at": self.clock()},
+            timeout=int(self.ttl + self.stale),
+        )
+        record_observation(location, payload)
+
+    def get(self, location: WeatherLocation) -> Dict[str, Any]:
+        payload, needs_fetch = self.lookup(location)
+        if needs_fetch:
+            try:
+                payload = self.fetch(location)
+            except WeatherBudgetExceeded:
+                # A concurrent refresh spent the last of the budget after lookup() checked it.
+                return self._fallback(location)
+            self.store(location, payload)
+        return payload
+
+    def _refresh_in_background(self, location: WeatherLocation) -> None:
+        lock = f"{self._cache_key(location)}:refreshing"
+        if self.budget_remaining() <= 0 or not cache.add(lock, 1, timeout=int(settings.WEATHER_TIMEOUT_SECONDS * 2) + 1):
+            return
+
+        def refresh() -> None:
+            try:
+                self.store(location, self.fetch(location))
+            except Exception:
+                logger.warning("Background weather refresh failed for %s", location.key, exc_info=True)
+            finally:
+                cache.delete(lock)
+
+        self.background(refresh)
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def record_observation(location: WeatherLocation, payload: Dict[str, Any]) -> None:
+    """Store an OpenWeatherMap-style payload; repeated lookups of one observation are ignored."""
+
+    main = payload.get("main") or {}
+    conditions = payload.get("weather") or [{}]
+    observed = payload.get("dt")
+    WeatherObservation.objects.bulk_create(
+        [
+            WeatherObservation(
+                location_key=location.key,
+                latitude=location.latitude,
+                longitude=location.longitude,
+                city=location.city or "",
+                observed_at=dt.datetime.fromtimestamp(observed, tz=dt.timezone.utc) if observed else timezone.now(),
+                temperature=_number(main.get("temp")),
+                humidity=_number(main.get("humidity")),
+                pressure=_number(main.get("pressure")),
+                wind_speed=_number((payload.get("wind") or {}).get("speed")),
+                condition=(conditions[0] or {}).get("main") or "",
+                payload=payload,
+            )
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def weather_history(location: WeatherLocation, hours: int) -> Optional[Dict[str, Any]]:
+    """Summarize recorded outdoor conditions for the last ``hours`` hours, or ``None`` if there are none."""
+
+    stats = WeatherObservation.objects.filter(
+        location_key=location.key,
+        observed_at__gte=timezone.now() - dt.timedelta(hours=hours),
+    ).aggregate(
+        observations=Count("id"),
+        temperature_min=Min("temperature"),
+        temperature_max=Max("temperature"),
+        temperature_avg=Avg("temperature"),
+        humidity_avg=Avg("humidity"),
+    )
+    if not stats["observations"]:
+        return None
+    return {
+        "hours": hours,
+        **{key: round(value, 1) if isinstance(value, float) else value for key, value in stats.items()},
+    }
@@ -0,0 +1,84 @@
+import datetime as dt
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.monitoring.models import LatestReading, SensorReadingDaily
+from apps.monitoring.services.benchmark import (
+    StubProviders,
+    build_scenarios,
+    compare_reports,
+    run_benchmarks,
+    seed_readings,
+)
+from apps.monitoring.services.breaker import reset_breakers
+from apps.monitoring.services.http import close_sessions
+
+END = dt.datetime(2024, 3, 1, tzinfo=dt.timezone.utc)
+
+
+# Rollups are only rebuilt within the raw retention window.
+@override_settings(READING_RAW_RETENTION_DAYS=0)
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.stub = StubProviders(wave_devices=2).start()
+        self.addCleanup(self.stub.stop)
+        self.addCleanup(close_sessions)
+        self.addCleanup(reset_breakers)
+
+    def test_seeds_history_and_reports_every_scenario(self):
+        self.assertEqual(seed_readings(devices=2, days=2, interval=3600, end=END), 2 * 3 * 48)
+        latest = LatestReading.objects.get(device__slug='bench-1', metric='humidity')
+        self.assertEqual(latest.timestamp, END - dt.timedelta(hours=1))
+        self.assertTrue(SensorReadingDaily.objects.exists())
+
+        # Home Assistant is left out: its publisher is a process-wide background thread.
+        with override_settings(**{**self.stub.settings(), 'HOME_ASSISTANT_TOKEN': ''}):
+            scenarios = build_scenarios(end=END, stub_url=self.stub.url, bulk_batch=50)
+            report = run_benchmarks(scenarios, iterations=3, warmup=1)
+
+        scenarios = report['scenarios']
+        self.assertEqual(
+            set(scenarios),
+            {
+                'devices',
+                'devices_readings',
+                'summary',
+                'summary_uncached',
+                'recommendations',
+                'series_raw',
+                'series_rollup',
+                'bulk_ingest',
+                'ingest_poll',
+            },
+        )
+        for result in scenarios.values():
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+            self.assertLessEqual(result['p95_ms'], result['p99_ms'])
+        # The device list must not grow with the number of devices or readings.
+        self.assertEqual(scenarios['devices']['max_queries'], 2)
+        self.assertGreater(scenarios['bulk_ingest']['rows_per_second'], 0)
+        self.assertGreater(scenarios['ingest_poll']['rows_per_second'], 0)
+        self.assertEqual(report['meta']['database'], 'sqlite')
+
+    def test_compare_flags_latency_query_and_throughput_regressions(self):
+        baseline = {
+            'scenarios': {
+                'devices': {'p50_ms': 10, 'p95_ms': 20, 'queries_per_request': 2},
+                'bulk_ingest': {'p50_ms': 100, 'p95_ms': 120, 'queries_per_request': 20, 'rows_per_second': 5000},
+            }
+        }
+        current = {
+            'scenarios': {
+                'devices': {'p50_ms': 11, 'p95_ms': 30, 'queries_per_request': 3},
+                'bulk_ingest': {'p50_ms': 110, 'p95_ms': 130, 'queries_per_request': 20, 'rows_per_second': 3000},
+                'summary': {'p50_ms': 500, 'p95_ms': 900, 'queries_per_request': 9},
+            }
+        }
+        regressions = compare_reports(current, baseline, threshold=0.2)
+        self.assertEqual(len(regressions), 3)
+        self.assertTrue(regressions[0].startswith('devices: p95_ms'))
+        self.assertTrue(regressions[1].startswith('devices: queries_per_request'))
+        self.assertTrue(regressions[2].startswith('bulk_ingest: rows_per_second'))
+        self.assertEqual(compare_reports(baseline, baseline, threshold=0), [])
@@ -0,0 +1,91 @@
+from unittest import mock
+
+import requests
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from apps.monitoring.services import OllamaClient
+from apps.monitoring.services.breaker import CircuitBreaker, CircuitOpenError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.clock = Clock()
+
+    def _breaker(self):
+        return CircuitBreaker('ollama', window=60, min_calls=4, failure_rate=0.5, cooldown=30, clock=self.clock)
+
+    def test_opens_on_failure_rate_then_probes_after_cooldown(self):
+        breaker = self._breaker()
+        breaker.record_success()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state(), 'closed')
+        breaker.record_failure()
+        self.assertEqual(breaker.state(), 'open')
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+        # Another worker sharing the cache sees the same state.
+        self.assertEqual(self._breaker().state(), 'open')
+
+        self.clock.now += 31
+        self.assertEqual(breaker.state(), 'half_open')
+        breaker.before_call()  # the single probe
+        with self.assertRaises(CircuitOpenError):
+            self._breaker().before_call()
+        breaker.record_failure()
+        self.assertEqual(breaker.state(), 'open')
+
+        self.clock.now += 31
+        breaker.before_call()
+        breaker.record_success()
+        self.assertEqual(breaker.state(), 'closed')
+        self.assertEqual(breaker.snapshot()['failures'], 0)
+
+    def test_probe_lock_outlives_the_probe_request_and_is_released_by_its_outcome(self):
+        breaker = self._breaker()
+        for _ in range(4):
+            breaker.record_failure()
+        self.clock.now += 31
+
+        with mock.patch.object(cache, 'add', wraps=cache.add) as add:
+            breaker.before_call(timeout=120)
+        self.assertEqual(add.call_args.kwargs['timeout'], 125)
+        with self.assertRaises(CircuitOpenError):
+            self._breaker().before_call(timeout=120)
+
+        breaker.record_failure()
+        self.clock.now += 31
+        self._breaker().before_call()  # the failed probe released the lock
+
+    def test_open_circuit_fails_fast_without_calling_the_dependency(self):
+        breaker = self._breaker()
+        session = mock.Mock()
+        session.post.side_effect = requests.ConnectionError('refused')
+        client = OllamaClient('http://ollama.test', 'llama2', session=session, breaker=breaker)
+        for _ in range(4):
+            with self.assertRaises(requests.ConnectionError):
+                client.generate('hi')
+        with self.assertRaises(CircuitOpenError):
+            client.generate('hi')
+        self.assertEqual(session.post.call_count, 4)
+
+    def test_client_errors_do_not_trip_the_breaker(self):
+        breaker = self._breaker()
+        response = requests.Response()
+        response.status_code = 401
+        for _ in range(4):
+            with self.assertRaises(requests.HTTPError):
+                with breaker.guard():
+                    raise requests.HTTPError(response=response)
+        self.assertEqual(breaker.state(), 'closed')
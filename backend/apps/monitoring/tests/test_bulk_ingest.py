@@ -0,0 +1,54 @@
+import json
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.monitoring.models import SensorDevice, SensorReading
+
+
+class BulkIngestTests(APITestCase):
+    def test_json_array_upserts_and_reports_invalid_rows(self):
+        SensorDevice.objects.create(name='Basement', slug='basement', sensor_type='radon')
+        readings = [
+            {'device': 'basement', 'metric': 'radon', 'value': 2.0, 'unit': 'pCi/L', 'timestamp': '2024-01-01T00:00:00Z'},
+            {'device': 'basement', 'metric': 'radon', 'value': 2.5, 'unit': 'pCi/L', 'timestamp': '2024-01-01T01:00:00Z'},
+            {'device': 'garage', 'metric': 'temperature', 'value': 4, 'timestamp': '2024-01-01T00:00:00Z'},
+            {'device': 'basement', 'metric': 'radon', 'timestamp': '2024-01-01T02:00:00Z'},
+        ]
+        response = self.client.post(reverse('reading-bulk-ingest'), readings, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['written'], 3)
+        self.assertEqual(response.data['errors'][0]['index'], 3)
+        self.assertEqual(SensorDevice.objects.get(slug='garage').connection_type, 'push')
+
+        # Re-sending a row with the same key updates it instead of duplicating it.
+        readings[0]['value'] = 3.0
+        self.client.post(reverse('reading-bulk-ingest'), readings[:1], format='json')
+        self.assertEqual(SensorReading.objects.count(), 3)
+        self.assertEqual(SensorReading.objects.get(metric='radon', value__gt=2.9).value, 3.0)
+
+    def test_over_long_values_are_rejected_row_by_row(self):
+        readings = [
+            {'device': 'x' * 51, 'metric': 'radon', 'value': 1.0, 'timestamp': '2024-01-01T00:00:00Z'},
+            {'device': 'attic', 'metric': 'radon', 'value': 1.0, 'unit': 'u' * 33, 'timestamp': '2024-01-01T00:00:00Z'},
+            {'device': 'attic', 'metric': 'radon', 'value': 1.5, 'unit': 'pCi/L', 'timestamp': '2024-01-01T00:00:00Z'},
+        ]
+        response = self.client.post(reverse('reading-bulk-ingest'), readings, format='json')
+        self.assertEqual(response.data['written'], 1)
+        self.assertEqual([error['index'] for error in response.data['errors']], [0, 1])
+        self.assertIn('device (max 50)', response.data['errors'][0]['error'])
+        self.assertEqual(list(SensorDevice.objects.values_list('slug', flat=True)), ['attic'])
+
+    def test_ndjson_body(self):
+        lines = [
+            {'device': 'attic', 'metric': 'humidity', 'value': 40 + i, 'timestamp': f'2024-01-01T00:{i:02d}:00Z'}
+            for i in range(50)
+        ]
+        body = '\n'.join(json.dumps(line) for line in lines) + '\n'
+        response = self.client.post(
+            reverse('reading-bulk-ingest'), body, content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['received'], 50)
+        self.assertEqual(SensorReading.objects.filter(device__slug='attic').count(), 50)
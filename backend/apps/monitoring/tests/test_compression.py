@@ -0,0 +1,96 @@
+import datetime as dt
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.monitoring.models import LatestReading, SensorDevice, SensorReading
+from apps.monitoring.services import record_readings
+from apps.monitoring.services.compression import ReadingDeduper
+
+START = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+
+
+# START is long past the default raw retention horizon; these tests read raw rows.
+@override_settings(READING_RAW_RETENTION_DAYS=0)
+class ReadingCompressionTests(APITestCase):
+    def setUp(self):
+        self.device = SensorDevice.objects.create(name='Basement', slug='basement', sensor_type='radon')
+
+    def poll(self, deduper, metric, minute, value):
+        with self.captureOnCommitCallbacks(execute=True):
+            return record_readings(
+                self.device,
+                [{'metric': metric, 'value': value, 'timestamp': START + dt.timedelta(minutes=minute)}],
+                deduper,
+            )
+
+    def stored(self, metric):
+        return list(
+            SensorReading.objects.filter(metric=metric).order_by('timestamp').values_list('value', flat=True)
+        )
+
+    def test_repeated_latest_reading_is_not_written_again(self):
+        deduper = ReadingDeduper(mode='off')
+        self.assertEqual(self.poll(deduper, 'radon', 0, 2.0), 1)
+        self.assertEqual(self.poll(deduper, 'radon', 0, 2.0), 0)
+        self.assertEqual(deduper.duplicates, 1)
+
+        # A restarted worker primes its cache from the database and still skips it.
+        restarted = ReadingDeduper(mode='off')
+        self.assertEqual(self.poll(restarted, 'radon', 0, 2.0), 0)
+        self.assertEqual(self.poll(restarted, 'radon', 1, 2.0), 1)
+        self.assertEqual(self.stored('radon'), [2.0, 2.0])
+
+    def test_swinging_door_keeps_turning_points_and_reads_back_interpolated(self):
+        deduper = ReadingDeduper(mode='swinging_door', deviations={'radon': 0.1})
+        values = [float(minute) for minute in range(11)] + [10.0] * 10
+        for minute, value in enumerate(values):
+            self.poll(deduper, 'radon', minute, value)
+
+        # The ramp and the plateau are straight lines: only their ends are needed.
+        self.assertEqual(self.stored('radon'), [0.0, 10.0])
+        self.assertEqual(LatestReading.objects.get(metric='radon').value, 10.0)
+        self.assertEqual(deduper.compressed, len(values) - 3)
+
+        response = self.client.get(
+            reverse('device-series', args=['basement']),
+            {
+                'metric': 'radon',
+                'from': START.isoformat(),
+                'to': (START + dt.timedelta(minutes=20)).isoformat(),
+                'bucket': '1m',
+                'fill': 'linear',
+            },
+        )
+        points = response.data['points']
+        self.assertEqual(len(points), 20)
+        self.assertAlmostEqual(points[5]['avg'], 5.0)
+        self.assertTrue(points[5]['filled'])
+        self.assertAlmostEqual(points[15]['avg'], 10.0)
+
+    def test_deadband_stores_steps_and_a_heartbeat(self):
+        deduper = ReadingDeduper(mode='deadband', deviations={'temperature': 0.2}, max_gap=600)
+        for minute, value in [(0, 20.0), (1, 20.1), (2, 20.15), (3, 21.0), (4, 21.1), (15, 21.05)]:
+            self.poll(deduper, 'temperature', minute, value)
+
+        # 20.15 is kept as the last value before the step; 21.05 is stored after the 10 minute gap.
+        self.assertEqual(self.stored('temperature'), [20.0, 20.15, 21.0, 21.1, 21.05])
+
+        response = self.client.get(
+            reverse('device-series', args=['basement']),
+            {
+                'metric': 'temperature',
+                'from': START.isoformat(),
+                'to': (START + dt.timedelta(minutes=16)).isoformat(),
+                'bucket': '1m',
+                'fill': 'previous',
+            },
+        )
+        self.assertEqual(response.data['points'][10]['avg'], 21.1)
+        self.assertEqual(response.data['fill'], 'previous')
+
+        invalid = self.client.get(
+            reverse('device-series', args=['basement']), {'metric': 'temperature', 'fill': 'spline'}
+        )
+        self.assertEqual(invalid.status_code, 400)
@@ -0,0 +1,162 @@
+import threading
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.monitoring.checks import check_shared_cache
+from apps.monitoring.models import SensorReading
+from apps.monitoring.services import IngestionScheduler, SensorConnector, build_connectors
+from apps.monitoring.services.connectors import RateLimiter
+
+
+class RendezvousConnector(SensorConnector):
+    """Each poll waits for the other connector's poll, so it only succeeds if both run at once."""
+
+    slug = 'vendor-a'
+    barrier = None
+
+    @classmethod
+    def from_settings(cls):
+        return None
+
+    def fetch_devices(self):
+        return [{'id': f'{self.slug}-1', 'name': self.slug}]
+
+    def fetch_latest(self, device_id):
+        self.barrier.wait()
+        return {'metric': 'radon', 'value': 1.5, 'unit': 'pCi/L', 'timestamp': timezone.now()}
+
+
+class VendorB(RendezvousConnector):
+    slug = 'vendor-b'
+
+
+class VendorC(RendezvousConnector):
+    slug = 'vendor-c'
+
+
+class MalformedConnector(RendezvousConnector):
+    """Lists one device without an identifier next to a valid one."""
+
+    slug = 'vendor-bad'
+
+    def fetch_devices(self):
+        return [{'name': 'No id'}, {'id': 'vendor-bad-1', 'name': 'Valid'}]
+
+
+class StaticConnector(SensorConnector):
+    slug = 'static'
+    rate_limit = 5.0
+
+    def fetch_devices(self):
+        return []
+
+    def fetch_latest(self, device_id):
+        return {}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@override_settings(
+    SENSOR_CONNECTORS=[
+        'apps.monitoring.tests.test_connectors.StaticConnector',
+        'apps.monitoring.tests.test_connectors.RendezvousConnector',
+    ],
+    CONNECTOR_RATE_LIMITS={'static': 2.0},
+)
+class ConnectorRegistryTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_builds_configured_connectors_from_settings(self):
+        connectors = build_connectors()
+        self.assertEqual([connector.slug for connector in connectors], ['static'])
+
+    def test_connector_that_cannot_be_imported_is_skipped(self):
+        paths = ['apps.monitoring.tests.missing.Connector', 'apps.monitoring.tests.test_connectors.StaticConnector']
+        with override_settings(SENSOR_CONNECTORS=paths):
+            with self.assertLogs('apps.monitoring.services.connectors', 'ERROR'):
+                self.assertEqual([connector.slug for connector in build_connectors()], ['static'])
+
+    def test_endpoint_lists_connectors_with_published_stats(self):
+        RendezvousConnector.barrier = threading.Barrier(1)
+        IngestionScheduler([RendezvousConnector()]).run_pending()
+
+        response = self.client.get(reverse('connector-list'))
+        connectors = response.data['connectors']
+        self.assertEqual(connectors['static']['rate_limit'], 2.0)
+        self.assertIsNone(connectors['static']['stats'])
+        self.assertIn('vendor-a', connectors)
+        self.assertEqual(connectors['vendor-a']['stats']['rows'], 1)
+
+
+class ParallelPollingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_connectors_are_polled_concurrently_and_failures_are_counted(self):
+        RendezvousConnector.barrier = threading.Barrier(2, timeout=5)
+        connectors = [RendezvousConnector(), VendorB()]
+        scheduler = IngestionScheduler(connectors, concurrency=2)
+        scheduler.run_pending()
+
+        self.assertEqual(SensorReading.objects.count(), 2)
+        for slug in ('vendor-a', 'vendor-b'):
+            self.assertEqual(scheduler.stats[slug]['rows'], 1)
+            self.assertEqual(scheduler.stats[slug]['errors'], 0)
+            self.assertIsNotNone(scheduler.stats[slug]['last_poll_seconds'])
+
+        # With a single worker the polls run one after another and the rendezvous fails.
+        RendezvousConnector.barrier = threading.Barrier(2, timeout=0.2)
+        serial = IngestionScheduler([VendorB(), VendorC()], concurrency=1)
+        with self.assertLogs('apps.monitoring.services.ingestion', 'ERROR'):
+            serial.run_pending()
+        self.assertEqual(serial.stats['vendor-b']['errors'], 1)
+        self.assertEqual(serial.stats['vendor-c']['errors'], 1)
+        self.assertEqual(cache.get('ingest:connector-stats:vendor-c')['errors'], 1)
+
+    def test_malformed_discovery_payload_does_not_stop_the_pass(self):
+        RendezvousConnector.barrier = threading.Barrier(1)
+        scheduler = IngestionScheduler([MalformedConnector(), VendorB()], concurrency=2)
+        with self.assertLogs('apps.monitoring.services.ingestion', 'ERROR'):
+            scheduler.run_pending()
+
+        self.assertEqual(scheduler.stats['vendor-bad']['errors'], 1)
+        self.assertIn('missing id/slug', scheduler.stats['vendor-bad']['last_error'])
+        self.assertEqual(
+            sorted(SensorReading.objects.values_list('device__slug', flat=True)), ['vendor-b-1', 'vendor-bad-1']
+        )
+
+
+class RateLimiterTests(TestCase):
+    def test_spaces_requests_by_the_configured_rate(self):
+        clock = Clock()
+        limiter = RateLimiter(4.0, clock=clock, sleep=clock.sleep)
+        waits = [limiter.acquire() for _ in range(3)]
+        self.assertEqual(waits, [0, 0.25, 0.25])
+        self.assertEqual(clock.now, 0.5)
+
+        clock.now += 10
+        self.assertEqual(limiter.acquire(), 0)
+
+
+class SharedCacheCheckTests(TestCase):
+    def test_process_local_cache_is_reported(self):
+        warnings = check_shared_cache(None)
+        self.assertEqual([warning.id for warning in warnings], ['monitoring.W001'])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://redis:6379/0'}})
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
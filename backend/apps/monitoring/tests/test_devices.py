@@ -3,6 +3,7 @@ from rest_framework import status
 from rest_framework.test import APITestCase
 
 from apps.monitoring.models import SensorDevice
+from apps.monitoring.services import record_readings
 
 
 class DeviceListTests(APITestCase):
@@ -19,3 +20,29 @@ class DeviceListTests(APITestCase):
         self.assertEqual(len(payload), 1)
         self.assertEqual(payload[0]['name'], 'Basement Radon')
         self.assertEqual(payload[0]['sensor_type'], 'radon')
+
+
+class DeviceListLatestTests(APITestCase):
+    def setUp(self):
+        for slug in ('attic', 'basement'):
+            device = SensorDevice.objects.create(name=slug.title(), slug=slug, sensor_type='radon')
+            record_readings(device, [
+                {'metric': 'radon', 'value': float(hour), 'unit': 'pCi/L', 'timestamp': f'2024-01-01T{hour:02d}:00:00Z'}
+                for hour in range(12)
+            ])
+        # A backfilled, older reading must not replace the latest value.
+        record_readings(device, [{'metric': 'radon', 'value': 99.0, 'unit': 'pCi/L', 'timestamp': '2023-01-01T00:00:00Z'}])
+
+    def test_lists_latest_value_per_metric_in_constant_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('device-list'))
+        payload = response.json()
+        self.assertNotIn('readings', payload[0])
+        self.assertEqual(payload[1]['latest'][0]['metric'], 'radon')
+        self.assertEqual(payload[1]['latest'][0]['value'], 11.0)
+
+    def test_include_readings_is_bounded(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('device-list'), {'include': 'readings', 'limit': 3})
+        readings = response.json()[0]['readings']
+        self.assertEqual([r['value'] for r in readings], [11.0, 10.0, 9.0])
@@ -0,0 +1,90 @@
+import datetime as dt
+import importlib.util
+import io
+import json
+import os
+import tempfile
+from unittest import skipUnless
+
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.monitoring.models import SensorDevice, SensorReading
+
+START = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+async def _read_stream(response):
+    return [chunk async for chunk in response.streaming_content]
+
+
+@override_settings(EXPORT_CHUNK_SIZE=4, EXPORT_PARQUET_ROW_GROUP_SIZE=5)
+class ReadingExportTests(TestCase):
+    def setUp(self):
+        basement = SensorDevice.objects.create(name='Basement', slug='basement', sensor_type='radon')
+        attic = SensorDevice.objects.create(name='Attic', slug='attic', sensor_type='climate')
+        SensorReading.objects.bulk_create(
+            [
+                SensorReading(
+                    device=basement, metric='radon', value=float(hour), unit='pCi/L', timestamp=START + dt.timedelta(hours=hour)
+                )
+                for hour in range(12)
+            ]
+            + [SensorReading(device=attic, metric='humidity', value=41.5, unit='%', timestamp=START)]
+        )
+
+    def export(self, **params):
+        response = self.client.get(reverse('reading-export'), params)
+        return response, b''.join(async_to_sync(_read_stream)(response))
+
+    def test_csv_streams_filtered_rows_in_chunks(self):
+        response = self.client.get(
+            reverse('reading-export'),
+            {'device': 'basement', 'from': START.isoformat(), 'to': (START + dt.timedelta(hours=10)).isoformat()},
+        )
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('readings-basement.csv', response['Content-Disposition'])
+        chunks = async_to_sync(_read_stream)(response)
+        # Header plus one chunk per EXPORT_CHUNK_SIZE rows.
+        self.assertEqual(len(chunks), 4)
+        lines = b''.join(chunks).decode().splitlines()
+        self.assertEqual(lines[0], 'device,metric,value,unit,timestamp')
+        self.assertEqual(len(lines), 11)
+        self.assertEqual(lines[1], 'basement,radon,0.0,pCi/L,2024-01-01T00:00:00+00:00')
+
+    def test_ndjson_exports_every_device_without_filters(self):
+        response, body = self.export(format='ndjson', metric='humidity')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual(rows, [{'device': 'attic', 'metric': 'humidity', 'value': 41.5, 'unit': '%', 'timestamp': '2024-01-01T00:00:00+00:00'}])
+
+    def test_rejects_invalid_parameters(self):
+        self.assertEqual(self.client.get(reverse('reading-export'), {'format': 'xlsx'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('reading-export'), {'from': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('reading-export'), {'device': 'garage'}).status_code, 404)
+
+    @skipUnless(HAS_PYARROW, 'pyarrow is not installed')
+    def test_parquet_is_written_in_row_groups(self):
+        import pyarrow.parquet as pq
+
+        response, body = self.export(format='parquet')
+        parquet = pq.ParquetFile(io.BytesIO(body))
+        self.assertEqual(parquet.metadata.num_rows, 13)
+        self.assertEqual(parquet.metadata.num_row_groups, 3)
+        table = parquet.read()
+        self.assertEqual(table.column('device').to_pylist()[:2], ['basement', 'basement'])
+        self.assertEqual(table.column('timestamp').to_pylist()[1], START + dt.timedelta(hours=1))
+
+    @skipUnless(HAS_PYARROW, 'pyarrow is not installed')
+    def test_command_writes_the_same_export_to_a_file(self):
+        import pyarrow.parquet as pq
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'readings.parquet')
+            out = io.StringIO()
+            call_command('export_readings', path, '--format', 'parquet', '--metric', 'radon', stdout=out)
+            self.assertIn('Exported 12 reading(s)', out.getvalue())
+            self.assertEqual(pq.read_table(path).column('value').to_pylist(), [float(hour) for hour in range(12)])
@@ -0,0 +1,79 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.monitoring.models import SensorDevice
+from apps.monitoring.services import OllamaClient, WeatherClient, record_readings
+from apps.monitoring.services.fanout import reset_executors
+
+
+def _slow_generate(self, prompt, **kwargs):
+    time.sleep(1)
+    return {'response': 'too late'}
+
+
+def _timed_slow_generate(timeouts):
+    def generate(self, prompt, **kwargs):
+        # Ignores its timeout, like a generation already being read when the budget ends.
+        timeouts.append(kwargs.get('timeout'))
+        time.sleep(1)
+        return {'response': 'too late'}
+
+    return generate
+
+
+@override_settings(
+    SUMMARY_BUDGET_SECONDS=0.3,
+    WEATHER_API_KEY='weather-key',
+    OLLAMA_BASE_URL='http://ollama.test',
+    DEFAULT_OLLAMA_MODEL='llama2',
+    HOME_ASSISTANT_TOKEN='',
+    SUMMARY_LLM_MODE='inline',
+)
+class SummaryFanOutTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        device = SensorDevice.objects.create(name='Basement', slug='basement', sensor_type='radon')
+        record_readings(device, [{'metric': 'radon', 'value': 9.0, 'unit': 'pCi/L', 'timestamp': timezone.now()}])
+
+    def test_slow_llm_is_reported_late_and_heuristics_still_returned(self):
+        weather = {'main': {'temp': 12, 'humidity': 50}}
+        with mock.patch.object(WeatherClient, 'current_by_city', return_value=weather), \
+                mock.patch.object(OllamaClient, 'generate', _slow_generate):
+            started = time.monotonic()
+            response = self.client.get(reverse('summary'), {'device_id': 'basement', 'city': 'Oslo'})
+            elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 0.9)
+        self.assertEqual(response.data['metadata']['late'], ['ollama'])
+        self.assertEqual(response.data['weather'], weather)
+        categories = [item['category'] for item in response.data['recommendations']]
+        self.assertIn('air_quality', categories)
+        self.assertNotIn('ai_insight', categories)
+
+    @override_settings(SUMMARY_FANOUT_WORKERS=1, SUMMARY_LLM_WORKERS=1)
+    def test_late_llm_leg_does_not_hold_up_the_next_summary(self):
+        reset_executors()
+        self.addCleanup(reset_executors, wait=True)
+        weather = {'main': {'temp': 12, 'humidity': 50}}
+        timeouts = []
+        with mock.patch.object(WeatherClient, 'current_by_city', return_value=weather), \
+                mock.patch.object(OllamaClient, 'generate', _timed_slow_generate(timeouts)):
+            first = self.client.get(reverse('summary'), {'device_id': 'basement', 'city': 'Oslo'})
+            self.assertEqual(first.data['metadata']['late'], ['ollama'])
+
+            # The first generation still holds the LLM pool's only thread.
+            cache.clear()
+            started = time.monotonic()
+            second = self.client.get(reverse('summary'), {'device_id': 'basement', 'city': 'Oslo'})
+            elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(second.data['weather'], weather)
+        self.assertEqual(second.data['metadata']['late'], ['ollama'])
+        self.assertTrue(all(0 < timeout <= 0.3 for timeout in timeouts), timeouts)
@@ -0,0 +1,86 @@
+import datetime as dt
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase
+
+from apps.monitoring.models import SensorDevice, SensorReading
+from apps.monitoring.services import HomeAssistantClient, record_readings
+from apps.monitoring.services.ha_publisher import HomeAssistantPublisher, StateUpdate
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class HomeAssistantPublisherTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.clock = Clock()
+        self.client_ = mock.Mock(spec=HomeAssistantClient)
+        self.publisher = HomeAssistantPublisher(
+            self.client_, deadbands={'radon': 0.5}, republish=600, concurrency=2, clock=self.clock
+        )
+
+    def _update(self, value):
+        return StateUpdate('sensor.radon_basement', 'radon', value, {'unit_of_measurement': 'pCi/L'})
+
+    def test_coalesces_and_applies_deadband(self):
+        self.publisher.enqueue(self._update(3.0))
+        self.publisher.enqueue(self._update(4.0))
+        self.assertEqual(self.publisher.flush(), {'queued': 1, 'published': 1, 'skipped': 0, 'failed': 0})
+        self.client_.publish_sensor_state.assert_called_once_with('sensor.radon_basement', 4.0, {'unit_of_measurement': 'pCi/L'})
+
+        self.publisher.enqueue(self._update(4.2))
+        self.assertEqual(self.publisher.flush()['skipped'], 1)
+        self.publisher.enqueue(self._update(4.6))
+        self.assertEqual(self.publisher.flush()['published'], 1)
+
+        # Unchanged states are still refreshed once the republish interval passes.
+        self.clock.now += 601
+        self.publisher.enqueue(self._update(4.6))
+        self.assertEqual(self.publisher.flush()['published'], 1)
+        self.assertEqual(self.client_.publish_sensor_state.call_count, 3)
+
+    def test_failed_updates_are_retried_unless_superseded(self):
+        self.client_.publish_sensor_state.side_effect = ConnectionError('down')
+        self.publisher.enqueue(self._update(3.0))
+        with self.assertLogs('apps.monitoring.services.ha_publisher', 'WARNING'):
+            self.assertEqual(self.publisher.flush()['failed'], 1)
+        self.assertEqual(self.publisher.pending(), 1)
+
+        self.client_.publish_sensor_state.side_effect = None
+        self.publisher.enqueue(self._update(5.0))
+        self.publisher.flush()
+        self.client_.publish_sensor_state.assert_called_with('sensor.radon_basement', 5.0, {'unit_of_measurement': 'pCi/L'})
+
+    def test_enqueues_latest_readings_with_entity_names(self):
+        device = SensorDevice.objects.create(name='Basement', slug='basement', sensor_type='radon')
+        timestamp = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+        reading = SensorReading(device=device, metric='temperature', value=19.5, unit='°C', timestamp=timestamp)
+        self.publisher.enqueue_readings([reading])
+        self.publisher.flush()
+        entity_id, state, attributes = self.client_.publish_sensor_state.call_args.args
+        self.assertEqual((entity_id, state), ('sensor.temperature_basement', 19.5))
+        self.assertEqual(attributes['friendly_name'], 'Basement Temperature')
+
+    def test_only_committed_readings_are_queued(self):
+        device = SensorDevice.objects.create(name='Basement', slug='basement', sensor_type='radon')
+        publisher = mock.Mock(spec=HomeAssistantPublisher)
+        reading = {'metric': 'radon', 'value': 4.0, 'unit': 'pCi/L', 'timestamp': '2024-01-01T00:00:00Z'}
+        with mock.patch('apps.monitoring.services.ingestion.get_publisher', return_value=publisher):
+            with self.captureOnCommitCallbacks(execute=True), self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    record_readings(device, [reading])
+                    raise RuntimeError('rolled back')
+            publisher.enqueue_readings.assert_not_called()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                record_readings(device, [reading])
+        [rows] = publisher.enqueue_readings.call_args.args
+        self.assertEqual([(row.metric, row.value) for row in rows], [('radon', 4.0)])
@@ -1,11 +1,31 @@
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from apps.monitoring.services.breaker import get_breaker, reset_breakers
+
 
 class HealthEndpointTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        reset_breakers()
+
     def test_health_endpoint_returns_ok(self):
         url = reverse('health-check')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, {'status': 'ok'})
+        self.assertEqual(response.data['status'], 'ok')
+        self.assertEqual(
+            {name: item['state'] for name, item in response.data['dependencies'].items()},
+            {'allthings_wave': 'closed', 'weather': 'closed', 'ollama': 'closed', 'home_assistant': 'closed'},
+        )
+
+    def test_open_circuit_marks_service_degraded(self):
+        breaker = get_breaker('ollama')
+        for _ in range(breaker.min_calls):
+            breaker.record_failure()
+        response = self.client.get(reverse('health-check'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'degraded')
+        self.assertEqual(response.data['dependencies']['ollama']['state'], 'open')
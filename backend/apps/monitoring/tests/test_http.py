@@ -0,0 +1,62 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.monitoring.services import HomeAssistantClient, WeatherClient
+from apps.monitoring.services.http import JitteredRetry, close_sessions
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    responses = []
+
+    def do_GET(self):
+        status, headers = self.responses.pop(0)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        body = b'{"ok": true}' if status == 200 else b'{}'
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HttpTransportTests(SimpleTestCase):
+    def tearDown(self):
+        close_sessions()
+
+    def test_clients_share_a_session_per_origin(self):
+        first = WeatherClient('https://api.example.test/data/2.5', 'key')
+        second = WeatherClient('https://API.example.test/other', 'key')
+        other_host = WeatherClient('https://weather.example.test', 'key')
+        ha = HomeAssistantClient('https://api.example.test', 'token')
+        self.assertIs(first.session, second.session)
+        self.assertIsNot(first.session, other_host.session)
+        self.assertIn('POST', ha.session.get_adapter('https://api.example.test').max_retries.allowed_methods)
+
+    @override_settings(HTTP_RETRY_AFTER_MAX_SECONDS=2)
+    def test_backoff_is_jittered_and_retry_after_capped(self):
+        retry = JitteredRetry(total=5, backoff_factor=1)
+        for _ in range(3):
+            retry = retry.increment(method='GET', url='/', error=ConnectionError())
+        with mock.patch('apps.monitoring.services.http.random.uniform', return_value=0.25) as uniform:
+            self.assertEqual(retry.get_backoff_time(), 0.25)
+        uniform.assert_called_once_with(0, 4.0)
+
+        response = mock.Mock(headers={'Retry-After': '3600'})
+        self.assertEqual(retry.get_retry_after(response), 2)
+
+    def test_retries_429_and_5xx_honouring_retry_after(self):
+        FlakyHandler.responses = [(429, {'Retry-After': '0'}), (503, {}), (200, {})]
+        server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.shutdown)
+
+        with override_settings(HTTP_RETRY_BACKOFF_FACTOR=0):
+            client = WeatherClient(f'http://127.0.0.1:{server.server_port}', 'key', timeout=5)
+            self.assertEqual(client.current_by_city('Oslo'), {'ok': True})
+        self.assertEqual(FlakyHandler.responses, [])
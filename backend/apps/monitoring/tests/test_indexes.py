@@ -0,0 +1,50 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.models import Q
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.monitoring.models import Recommendation, SensorDevice, SensorReading
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Plans are asserted against SQLite EXPLAIN QUERY PLAN output')
+class QueryPlanTests(TestCase):
+    def setUp(self):
+        self.device = SensorDevice.objects.create(name='Basement', slug='basement', sensor_type='radon')
+
+    def assertIndexedWithoutSort(self, queryset, index):
+        plan = queryset.explain()
+        self.assertIn(index, plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_recommendation_keyset_pages_read_the_matching_indexes(self):
+        self.assertIndexedWithoutSort(Recommendation.objects.order_by('-created_at', '-id')[:51], 'recommendation_keyset')
+        after = Recommendation.objects.filter(created_at__lte=timezone.now()).filter(
+            Q(created_at__lt=timezone.now()) | Q(id__lt=100)
+        )
+        self.assertIndexedWithoutSort(after.order_by('-created_at', '-id')[:51], 'recommendation_keyset')
+        self.assertIndexedWithoutSort(
+            after.filter(device=self.device).order_by('-created_at', '-id')[:51], 'recommendation_device_keyset'
+        )
+        self.assertIndexedWithoutSort(
+            after.filter(category='radon').order_by('-created_at', '-id')[:51], 'recommendation_category_keyset'
+        )
+
+    def test_recent_device_readings_read_the_descending_index(self):
+        self.assertIndexedWithoutSort(
+            SensorReading.objects.filter(device=self.device).order_by('-timestamp')[:10], 'reading_device_recent'
+        )
+        self.assertIndexedWithoutSort(
+            SensorReading.objects.filter(device=self.device, metric='radon').order_by('-timestamp')[:1],
+            # SQLite's name for the unique_sensor_reading constraint index.
+            'sqlite_autoindex_monitoring_sensorreading',
+        )
+
+    def test_trend_refresh_reads_recent_writes_through_the_updated_index(self):
+        recent = SensorReading.objects.filter(metric__in=['radon'], updated_at__gte=timezone.now())
+        self.assertIndexedWithoutSort(recent, 'reading_updated')
+
+    def test_unordered_queries_are_not_sorted(self):
+        self.assertNotIn('ORDER BY', str(SensorReading.objects.filter(device=self.device).query))
+        self.assertNotIn('ORDER BY', str(Recommendation.objects.filter(device=self.device).query))
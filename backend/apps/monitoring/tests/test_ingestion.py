@@ -0,0 +1,71 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.monitoring.models import SensorDevice, SensorReading
+from apps.monitoring.services import IngestionScheduler, SensorConnector, record_readings
+
+
+class FakeConnector(SensorConnector):
+    slug = 'fake'
+
+    def __init__(self):
+        self.polls = []
+
+    def fetch_devices(self):
+        return [{'id': 'basement', 'name': 'Basement'}, {'id': 'attic', 'name': 'Attic'}]
+
+    def fetch_latest(self, device_id):
+        self.polls.append(device_id)
+        return {'metric': 'radon', 'value': 2.5, 'unit': 'pCi/L', 'timestamp': timezone.now()}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class IngestionSchedulerTests(TestCase):
+    def test_polls_devices_on_their_own_interval(self):
+        SensorDevice.objects.create(name='Attic', slug='attic', sensor_type='radon', poll_interval_seconds=600)
+        connector = FakeConnector()
+        clock = FakeClock()
+        scheduler = IngestionScheduler([connector], default_interval=60, discovery_interval=3600, clock=clock)
+
+        scheduler.run_pending()
+        self.assertEqual(sorted(connector.polls), ['attic', 'basement'])
+        self.assertEqual(SensorReading.objects.count(), 2)
+        self.assertEqual(SensorDevice.objects.get(slug='attic').metadata['connector'], 'fake')
+
+        clock.now = 61
+        scheduler.run_pending()
+        clock.now = 130
+        wait = scheduler.run_pending()
+        self.assertEqual(connector.polls.count('basement'), 3)
+        self.assertEqual(connector.polls.count('attic'), 1)
+        self.assertLessEqual(wait, 60)
+
+
+class SummaryFromDatabaseTests(APITestCase):
+    def test_summary_reports_latest_stored_readings_and_freshness(self):
+        cache.clear()
+        device = SensorDevice.objects.create(name='Basement', slug='basement', sensor_type='radon')
+        now = timezone.now()
+        record_readings(device, [
+            {'metric': 'radon', 'value': 3.1, 'unit': 'pCi/L', 'timestamp': now},
+            {'metric': 'humidity', 'value': 45, 'unit': '%', 'timestamp': now},
+        ])
+
+        with override_settings(OLLAMA_BASE_URL='', HOME_ASSISTANT_TOKEN=''):
+            response = self.client.get(reverse('summary'), {'device_id': 'basement'})
+
+        self.assertEqual(response.data['radon']['value'], 3.1)
+        self.assertEqual(response.data['environment']['humidity'], 45)
+        self.assertIsNone(response.data['environment']['temperature'])
+        self.assertFalse(response.data['metadata']['stale'])
+        self.assertIn('last_updated', response.data['metadata'])
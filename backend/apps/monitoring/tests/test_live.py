@@ -0,0 +1,102 @@
+import asyncio
+import threading
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.monitoring.models import Recommendation, SensorDevice
+from apps.monitoring.services import bulk_ingest_readings
+from apps.monitoring.services.live import MemoryEventLayer, get_event_layer, publish_recommendations, reset_event_layer
+
+
+async def _read_stream(response):
+    return b''.join([chunk async for chunk in response.streaming_content]).decode()
+
+
+async def _receive(layer, count, publish, last_id=None):
+    subscription = layer.subscribe(last_id, idle=0.05)
+    # The first idle tick means the subscriber is registered.
+    assert await subscription.__anext__() is None
+    publisher = threading.Thread(target=publish)
+    publisher.start()
+    publisher.join()
+    # Let the cross-thread deliveries land (and overflow the queue) before consuming.
+    await asyncio.sleep(0.05)
+    received = []
+    async for event in subscription:
+        if event is not None:
+            received.append(event)
+        if len(received) == count:
+            break
+    await subscription.aclose()
+    return received, layer.subscribers()
+
+
+class EventLayerTests(TestCase):
+    def test_fans_out_across_threads_and_recovers_from_lag(self):
+        layer = MemoryEventLayer(backlog_size=50, queue_size=2)
+
+        def publish():
+            for value in range(5):
+                layer.publish('reading', {'device': 'basement', 'value': value})
+
+        received, subscribers = async_to_sync(_receive)(layer, 5, publish)
+        self.assertEqual([event.data['value'] for event in received], [0, 1, 2, 3, 4])
+        self.assertEqual(subscribers, 0)
+        ids = [event.id for event in received]
+        self.assertEqual([event.id for event in layer.backlog(ids[2])], ids[3:])
+
+    def test_id_from_before_a_restart_does_not_hide_new_events(self):
+        layer = MemoryEventLayer(clock=lambda: 1.0)
+        first = layer.publish('reading', {'value': 0})
+        self.assertEqual(first.id, '1000-0')
+        self.assertEqual(layer.publish('reading', {'value': 1}).id, '1000-1')
+
+        # Another worker (or this one before restarting) had issued ids far ahead of ours.
+        received, _ = async_to_sync(_receive)(
+            layer, 1, lambda: layer.publish('reading', {'value': 2}), last_id='999999-57'
+        )
+        self.assertEqual([event.data['value'] for event in received], [2])
+
+        restarted = MemoryEventLayer(clock=lambda: 2.0)
+        self.assertEqual(restarted.publish('reading', {'value': 3}).id, '2000-0')
+        self.assertEqual([event.data['value'] for event in restarted.backlog(first.id)], [3])
+
+
+@override_settings(LIVE_EVENTS_BACKEND='memory', LIVE_STREAM_HEARTBEAT_SECONDS=0.05, LIVE_STREAM_MAX_SECONDS=0.2)
+class LiveEventsEndpointTests(TestCase):
+    def setUp(self):
+        reset_event_layer()
+        self.addCleanup(reset_event_layer)
+
+    def test_ingest_and_recommendations_are_published_after_commit(self):
+        readings = [
+            {'device': 'basement', 'metric': 'radon', 'value': 2.0, 'timestamp': '2024-01-01T00:00:00Z'},
+            {'device': 'basement', 'metric': 'radon', 'value': 2.4, 'timestamp': '2024-01-01T01:00:00Z'},
+            {'device': 'attic', 'metric': 'humidity', 'value': 40, 'timestamp': '2024-01-01T01:00:00Z'},
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_ingest_readings(readings)
+            recommendation = Recommendation.objects.create(
+                device=SensorDevice.objects.get(slug='basement'), category='ventilation', message='Open a window'
+            )
+            publish_recommendations([recommendation])
+            self.assertEqual(get_event_layer().backlog('0-0'), [])
+
+        # Only the newest value per (device, metric) is pushed.
+        self.assertEqual(len(get_event_layer().backlog('0-0')), 3)
+
+        response = self.client.get(reverse('live-events'), {'device': 'basement'}, HTTP_LAST_EVENT_ID='0-0')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = async_to_sync(_read_stream)(response)
+        self.assertIn('event: reading\ndata: {"device": "basement", "metric": "radon", "value": 2.4', body)
+        self.assertIn(f'id: {get_event_layer().head()}\nevent: recommendation', body)
+        self.assertNotIn('attic', body)
+        self.assertIn(': keep-alive', body)
+
+        only = async_to_sync(_read_stream)(
+            self.client.get(reverse('live-events'), {'types': 'recommendation'}, HTTP_LAST_EVENT_ID='0-0')
+        )
+        self.assertNotIn('event: reading', only)
+        self.assertIn('Open a window', only)
@@ -0,0 +1,132 @@
+from unittest import mock
+
+import requests
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from apps.monitoring.models import SensorDevice
+from apps.monitoring.services import OllamaClient, WeatherClient
+from apps.monitoring.services.breaker import CircuitBreaker, CircuitOpenError, reset_breakers
+from apps.monitoring.services.fanout import FanOut
+from apps.monitoring.services.metrics import collect_timings, track_upstream
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def fake_response(status_code=200, payload=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = b'{}'
+    response.json = mock.Mock(return_value=payload or {})
+    return response
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        SensorDevice.objects.create(name='Basement', slug='basement', sensor_type='radon')
+
+    def test_responses_carry_server_timing_and_feed_the_histograms(self):
+        before = sample('home_monitor_http_request_db_queries_count', view='device-list')
+        response = self.client.get(reverse('device-list'))
+        self.assertEqual(response.status_code, 200)
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertRegex(timing, r'total;dur=[\d.]+$')
+        self.assertEqual(sample('home_monitor_http_request_db_queries_count', view='device-list'), before + 1)
+        self.assertGreater(sample('home_monitor_http_request_db_queries_sum', view='device-list'), 0)
+
+        scrape = self.client.get('/metrics')
+        self.assertEqual(scrape.status_code, 200)
+        self.assertTrue(scrape['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'home_monitor_http_request_duration_seconds_bucket{', scrape.content)
+
+    @override_settings(METRICS_SERVER_TIMING=False)
+    def test_server_timing_header_can_be_disabled(self):
+        self.assertNotIn('Server-Timing', self.client.get(reverse('device-list')))
+
+
+class UpstreamMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(reset_breakers)
+
+    def test_provider_calls_record_host_endpoint_and_status(self):
+        labels = {'service': 'weather', 'host': 'weather.test', 'endpoint': '/weather', 'method': 'GET'}
+        session = mock.Mock()
+        session.get.side_effect = [fake_response(200, {'main': {}}), fake_response(503), requests.ReadTimeout()]
+        client = WeatherClient('https://weather.test', 'key', session=session, breaker=CircuitBreaker('weather-test'))
+        before = {
+            status: sample('home_monitor_upstream_request_duration_seconds_count', **labels, status=status)
+            for status in ('200', '503', 'ReadTimeout')
+        }
+
+        with collect_timings() as timings:
+            client.current_by_city('Oslo')
+            with self.assertRaises(requests.HTTPError):
+                client.current_by_city('Oslo')
+            with self.assertRaises(requests.ReadTimeout):
+                client.current_by_city('Oslo')
+
+        for status, count in before.items():
+            self.assertEqual(
+                sample('home_monitor_upstream_request_duration_seconds_count', **labels, status=status), count + 1
+            )
+        self.assertIn('weather;dur=', timings.server_timing())
+        self.assertIn('desc="3 calls"', timings.server_timing())
+
+    def test_calls_rejected_by_an_open_breaker_are_recorded(self):
+        breaker = mock.Mock()
+        breaker.guard.side_effect = CircuitOpenError('weather', 30)
+        labels = {
+            'service': 'weather',
+            'host': 'weather.test',
+            'endpoint': '/weather',
+            'method': 'GET',
+            'status': 'circuit_open',
+        }
+        before = sample('home_monitor_upstream_request_duration_seconds_count', **labels)
+        client = WeatherClient('https://weather.test', 'key', session=mock.Mock(), breaker=breaker)
+        with self.assertRaises(CircuitOpenError):
+            client.current_by_city('Oslo')
+        self.assertEqual(sample('home_monitor_upstream_request_duration_seconds_count', **labels), before + 1)
+
+    def test_ollama_token_counts_and_durations_are_recorded(self):
+        session = mock.Mock()
+        session.post.return_value = fake_response(
+            200,
+            {
+                'response': 'Ventilate.',
+                'prompt_eval_count': 40,
+                'eval_count': 12,
+                'total_duration': 2_500_000_000,
+                'eval_duration': 1_500_000_000,
+            },
+        )
+        client = OllamaClient(
+            'http://ollama.test', 'llama-metrics', session=session, breaker=CircuitBreaker('ollama-test')
+        )
+        with collect_timings() as timings:
+            client.generate('hi')
+
+        self.assertEqual(sample('home_monitor_ollama_tokens_total', model='llama-metrics', kind='prompt'), 40)
+        self.assertEqual(sample('home_monitor_ollama_tokens_total', model='llama-metrics', kind='eval'), 12)
+        self.assertEqual(sample('home_monitor_ollama_duration_seconds_sum', model='llama-metrics', phase='eval'), 1.5)
+        self.assertEqual(sample('home_monitor_ollama_duration_seconds_count', model='llama-metrics', phase='load'), 0)
+        self.assertIn('desc="1 call, 52 tokens"', timings.server_timing())
+
+    def test_fan_out_legs_are_attributed_to_the_request(self):
+        def leg():
+            with track_upstream('home_assistant', 'http://ha.test', '/api/states/{entity_id}', 'POST'):
+                return 'ok'
+
+        with collect_timings() as timings:
+            fanout = FanOut(budget=5)
+            fanout.submit('ha', leg)
+            results, late, failed = fanout.collect()
+        self.assertEqual(results, {'ha': 'ok'})
+        self.assertEqual(timings.upstream['home_assistant'][0], 1)
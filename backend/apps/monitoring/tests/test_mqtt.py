@@ -0,0 +1,254 @@
+import json
+import socket
+import threading
+import time
+
+from django.db import DataError, OperationalError
+from django.test import TestCase
+
+from apps.monitoring.models import SensorDevice, SensorReading
+from apps.monitoring.services.mqtt import MqttConnector, MqttSubscriber, ReadingBatcher
+
+
+def _packet(kind, body):
+    length, encoded = len(body), bytearray()
+    while True:
+        byte, length = length % 128, length // 128
+        encoded.append(byte | (0x80 if length else 0))
+        if not length:
+            return bytes([kind]) + bytes(encoded) + body
+
+
+def _string(value):
+    data = value.encode()
+    return len(data).to_bytes(2, 'big') + data
+
+
+class StubBroker:
+    """Just enough MQTT 3.1.1 for one subscriber: CONNACK, SUBACK, then QoS 0 or 1 publishes."""
+
+    def __init__(self, messages, qos=0):
+        self.messages = messages
+        self.qos = qos
+        self.subscriptions = []
+        self.acks = []
+        self.server = socket.create_server(('127.0.0.1', 0))
+        self.port = self.server.getsockname()[1]
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _read(self, conn):
+        header = conn.recv(1)
+        if not header:
+            return None, b''
+        length, shift = 0, 0
+        while True:
+            byte = conn.recv(1)[0]
+            length |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+        body = b''
+        while len(body) < length:
+            body += conn.recv(length - len(body))
+        return header[0], body
+
+    def _serve(self):
+        conn, _ = self.server.accept()
+        with conn:
+            while True:
+                kind, body = self._read(conn)
+                if kind is None or kind == 0xE0:
+                    return
+                if kind == 0x10:
+                    conn.sendall(_packet(0x20, b'\x00\x00'))
+                elif kind == 0x82:
+                    topic_length = int.from_bytes(body[2:4], 'big')
+                    self.subscriptions.append(body[4:4 + topic_length].decode())
+                    conn.sendall(_packet(0x90, body[:2] + b'\x00'))
+                    for packet_id, (topic, payload) in enumerate(self.messages, start=1):
+                        if self.qos:
+                            conn.sendall(_packet(0x32, _string(topic) + packet_id.to_bytes(2, 'big') + payload))
+                        else:
+                            conn.sendall(_packet(0x30, _string(topic) + payload))
+                elif kind == 0x40:
+                    self.acks.append(int.from_bytes(body, 'big'))
+                elif kind == 0xC0:
+                    conn.sendall(_packet(0xD0, b''))
+
+    def close(self):
+        self.server.close()
+
+
+class MqttConnectorTests(TestCase):
+    def test_decodes_scalar_value_and_multi_metric_payloads(self):
+        connector = MqttConnector(['home-monitor/#'])
+        [scalar] = connector.decode('home-monitor/basement/radon', b'2.5')
+        self.assertEqual((scalar['device'], scalar['metric'], scalar['value']), ('basement', 'radon', 2.5))
+
+        [valued] = connector.decode(
+            'home-monitor/basement/temperature', b'{"value": 19.5, "unit": "C", "ts": 1704067200}'
+        )
+        self.assertEqual(valued['unit'], 'C')
+        self.assertTrue(valued['timestamp'].startswith('2024-01-01T00:00:00'))
+
+        readings = connector.decode(
+            'home-monitor/attic', json.dumps({'temperature': 21, 'humidity': 40, 'units': {'humidity': '%'}}).encode()
+        )
+        self.assertEqual({r['metric'] for r in readings}, {'temperature', 'humidity'})
+        self.assertEqual({r['device'] for r in readings}, {'attic'})
+
+        with self.assertRaises(ValueError):
+            connector.decode('home-monitor/attic', b'not json')
+        with self.assertRaises(ValueError):
+            connector.decode('home-monitor/attic', b'{"label": "x"}')
+
+
+class ReadingBatcherTests(TestCase):
+    def reading(self, minute, device='basement'):
+        return {'device': device, 'metric': 'radon', 'value': 1.0 + minute, 'timestamp': f'2024-01-01T00:{minute:02d}:00Z'}
+
+    def test_micro_batches_and_drops_unacknowledged_readings_when_queue_is_full(self):
+        batches, acks = [], []
+
+        def write(batch):
+            batches.append(len(batch))
+            return {'received': len(batch), 'written': len(batch), 'errors': []}
+
+        batcher = ReadingBatcher(write, batch_size=2, max_latency=0, max_pending=3)
+        self.assertTrue(batcher.offer([self.reading(0), self.reading(1), self.reading(2)]))
+        with self.assertLogs('apps.monitoring.services.mqtt', 'WARNING'):
+            self.assertFalse(batcher.offer([self.reading(3)]))
+        self.assertEqual(batcher.dropped, 1)
+
+        # Acknowledged (QoS 1) messages stay with the broker until written, so they are never dropped.
+        self.assertTrue(batcher.offer([self.reading(4), self.reading(5)], ack=lambda: acks.append('m1')))
+        self.assertEqual(batcher.drain(), 2)
+        self.assertEqual(batcher.drain(), 2)
+        self.assertEqual(acks, [])
+        self.assertEqual(batcher.flush(), 1)
+        self.assertEqual(acks, ['m1'])
+        self.assertEqual(batches, [2, 2, 1])
+
+    def test_failed_write_keeps_batch_and_backs_off(self):
+        delays = []
+        calls = {'count': 0}
+
+        def write(batch):
+            calls['count'] += 1
+            if calls['count'] < 3:
+                raise OperationalError('database is locked')
+            return {'received': len(batch), 'written': len(batch), 'errors': []}
+
+        # An outage is retried as a whole batch, never dead-lettered, however often it fails.
+        batcher = ReadingBatcher(write, batch_size=10, max_latency=0, max_attempts=1, sleep=delays.append)
+        batcher.offer([self.reading(0), self.reading(1)])
+        with self.assertLogs('apps.monitoring.services.mqtt', 'ERROR'):
+            self.assertEqual(batcher.drain(), 0)
+            self.assertEqual(batcher.drain(), 0)
+        self.assertEqual(batcher.pending(), 2)
+        self.assertEqual(delays, [0.5, 1.0])
+        self.assertEqual(batcher.drain(), 2)
+        self.assertEqual((batcher.pending(), batcher.dead_lettered), (0, 0))
+
+    def test_poison_reading_is_dead_lettered_after_max_attempts(self):
+        delays = []
+
+        def write(batch):
+            if any(reading['device'] == 'poison' for reading in batch):
+                raise DataError('value too long')
+            return {'received': len(batch), 'written': len(batch), 'errors': []}
+
+        acks = []
+        batcher = ReadingBatcher(write, batch_size=10, max_latency=0, max_attempts=3, sleep=delays.append)
+        batcher.offer([self.reading(0), self.reading(1, device='poison')], ack=lambda: acks.append('m1'))
+        batcher.offer([self.reading(2)], ack=lambda: acks.append('m2'))
+        with self.assertLogs('apps.monitoring.services.mqtt', 'ERROR') as logs:
+            self.assertEqual(batcher.drain(), 0)
+            self.assertEqual(batcher.drain(), 0)
+            self.assertEqual(batcher.drain(), 2)
+        self.assertEqual(delays, [0.5, 1.0])
+        self.assertEqual((batcher.written, batcher.dead_lettered, batcher.pending()), (2, 1, 0))
+        self.assertEqual(acks, ['m1', 'm2'])
+        dead = [record for record in logs.records if record.name.endswith('dead_letter')]
+        self.assertEqual(json.loads(dead[0].getMessage())['reading']['device'], 'poison')
+
+    def test_outage_while_isolating_rows_keeps_the_rest_of_the_batch(self):
+        outage = {'on': False}
+
+        def write(batch):
+            if outage['on']:
+                raise OperationalError('server closed the connection')
+            if len(batch) > 1:
+                raise DataError('value too long')
+            outage['on'] = True
+            return {'received': 1, 'written': 1, 'errors': []}
+
+        batcher = ReadingBatcher(write, batch_size=10, max_latency=0, max_attempts=1, sleep=lambda delay: None)
+        batcher.offer([self.reading(0), self.reading(1), self.reading(2)])
+        with self.assertLogs('apps.monitoring.services.mqtt', 'ERROR'):
+            self.assertEqual(batcher.drain(), 1)
+        self.assertEqual((batcher.pending(), batcher.dead_lettered), (2, 0))
+
+
+class MqttSubscriberTests(TestCase):
+    def test_ingests_messages_from_local_broker(self):
+        broker = StubBroker(
+            [
+                ('home-monitor/basement/radon', b'{"value": 2.1, "unit": "pCi/L", "timestamp": "2024-01-01T00:00:00Z"}'),
+                ('home-monitor/garage', b'{"temperature": 4, "humidity": 70, "timestamp": "2024-01-01T00:00:00Z"}'),
+                ('home-monitor/garage', b'garbage'),
+            ]
+        )
+        self.addCleanup(broker.close)
+        batcher = ReadingBatcher(batch_size=100, max_latency=0)
+        subscriber = MqttSubscriber(
+            MqttConnector(['home-monitor/#']),
+            batcher,
+            broker_url=f'mqtt://127.0.0.1:{broker.port}',
+            qos=0,
+            client_id='test-ingest',
+        )
+        with self.assertLogs('apps.monitoring.services.mqtt', 'WARNING'):
+            subscriber.start()
+            deadline = time.monotonic() + 5
+            while (batcher.pending() < 3 or not subscriber.rejected) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            subscriber.stop()
+
+        # The network thread only queued; the write happens here, on the test thread.
+        self.assertEqual(SensorReading.objects.count(), 0)
+        self.assertEqual(batcher.flush(), 3)
+        self.assertEqual(broker.subscriptions, ['home-monitor/#'])
+        self.assertEqual(subscriber.rejected, 1)
+        self.assertEqual(SensorReading.objects.get(metric='radon').unit, 'pCi/L')
+        self.assertEqual(SensorDevice.objects.get(slug='garage').connection_type, 'push')
+
+    def test_qos1_messages_are_acknowledged_only_after_they_are_written(self):
+        broker = StubBroker(
+            [
+                ('home-monitor/basement/radon', b'{"value": 2.1, "timestamp": "2024-01-01T00:00:00Z"}'),
+                ('home-monitor/garage', b'garbage'),
+            ],
+            qos=1,
+        )
+        self.addCleanup(broker.close)
+        batcher = ReadingBatcher(batch_size=100, max_latency=0)
+        subscriber = MqttSubscriber(
+            MqttConnector(['home-monitor/#']), batcher, broker_url=f'mqtt://127.0.0.1:{broker.port}', qos=1
+        )
+        self.addCleanup(subscriber.stop)
+
+        def wait_for(condition):
+            deadline = time.monotonic() + 5
+            while not condition() and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        with self.assertLogs('apps.monitoring.services.mqtt', 'WARNING'):
+            subscriber.start()
+            wait_for(lambda: batcher.pending() and broker.acks)
+        # The undecodable message is settled at once; the reading waits for its write.
+        self.assertEqual(broker.acks, [2])
+        self.assertEqual(batcher.flush(), 1)
+        wait_for(lambda: len(broker.acks) == 2)
+        self.assertEqual(broker.acks, [2, 1])
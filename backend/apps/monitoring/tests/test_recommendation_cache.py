@@ -0,0 +1,61 @@
+import datetime as dt
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.monitoring.models import RecommendationCacheEntry, SensorDevice
+from apps.monitoring.services import OllamaClient, record_readings
+from apps.monitoring.services.recommendation_cache import RecommendationCache
+
+
+class RecommendationCacheTests(TestCase):
+    def test_fingerprint_ignores_jitter_but_not_model(self):
+        cache_ = RecommendationCache(ttl_seconds=60, max_entries=10)
+        weather = {'main': {'temp': 11.0}, 'weather': [{'main': 'Rain'}]}
+        first, _ = cache_.fingerprint(radon={'value': 4.1}, environment={'temperature': 20.2, 'humidity': 51}, weather=weather, model='llama2')
+        jitter, _ = cache_.fingerprint(radon={'value': 4.05}, environment={'temperature': 19.9, 'humidity': 49}, weather=weather, model='llama2')
+        other_model, _ = cache_.fingerprint(radon={'value': 4.1}, environment={'temperature': 20.2, 'humidity': 51}, weather=weather, model='mistral')
+        self.assertEqual(first, jitter)
+        self.assertNotEqual(first, other_model)
+
+    def test_expires_and_evicts_least_recently_used(self):
+        cache_ = RecommendationCache(ttl_seconds=60, max_entries=2)
+        cache_.put('a', {'model': 'llama2'}, {'response': 'A', 'context': [1, 2, 3]})
+        cache_.put('b', {'model': 'llama2'}, {'response': 'B'})
+        self.assertEqual(cache_.get('a'), {'response': 'A'})
+        cache_.put('c', {'model': 'llama2'}, {'response': 'C'})
+        self.assertEqual(set(RecommendationCacheEntry.objects.values_list('fingerprint', flat=True)), {'a', 'c'})
+
+        RecommendationCacheEntry.objects.filter(fingerprint='a').update(created_at=timezone.now() - dt.timedelta(minutes=5))
+        self.assertIsNone(cache_.get('a'))
+        self.assertFalse(RecommendationCacheEntry.objects.filter(fingerprint='a').exists())
+
+
+@override_settings(
+    WEATHER_API_KEY='',
+    OLLAMA_BASE_URL='http://ollama.test',
+    DEFAULT_OLLAMA_MODEL='llama2',
+    HOME_ASSISTANT_TOKEN='',
+    SUMMARY_LLM_MODE='inline',
+)
+class SummaryInsightReuseTests(APITestCase):
+    def test_unchanged_conditions_reuse_prior_insight(self):
+        cache.clear()
+        device = SensorDevice.objects.create(name='Basement', slug='basement', sensor_type='radon')
+        record_readings(device, [{'metric': 'radon', 'value': 4.1, 'unit': 'pCi/L', 'timestamp': '2024-01-01T00:00:00Z'}])
+        url = reverse('summary')
+        with mock.patch.object(OllamaClient, 'generate', return_value={'response': 'Ventilate', 'done_reason': 'stop'}) as generate:
+            first = self.client.get(url, {'device_id': 'basement'})
+            # A slightly different reading invalidates the response cache but not the insight.
+            record_readings(device, [{'metric': 'radon', 'value': 4.05, 'unit': 'pCi/L', 'timestamp': '2024-01-01T01:00:00Z'}])
+            second = self.client.get(url, {'device_id': 'basement'})
+
+        self.assertEqual(generate.call_count, 1)
+        insights = [item for item in second.data['recommendations'] if item['category'] == 'ai_insight']
+        self.assertEqual(insights[0]['message'], 'Ventilate')
+        self.assertTrue(insights[0]['context']['cached'])
+        self.assertFalse([item for item in first.data['recommendations'] if item['category'] == 'ai_insight'][0]['context']['cached'])
@@ -0,0 +1,106 @@
+import datetime as dt
+import decimal
+import json
+
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+
+from apps.monitoring.models import Recommendation, SensorDevice, SensorReading
+from apps.monitoring.renderers import ORJSONRenderer
+from apps.monitoring.services.recommendations import RecommendationEngine
+
+
+class RecommendationHistoryTests(TestCase):
+    def setUp(self):
+        self.device = SensorDevice.objects.create(name='Basement', slug='basement', sensor_type='radon')
+        now = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+        SensorReading.objects.bulk_create(
+            SensorReading(device=self.device, metric='radon', value=1.0, timestamp=now + dt.timedelta(minutes=i))
+            for i in range(20)
+        )
+        for index in range(5):
+            Recommendation.objects.create(device=self.device, category='radon', message=f'Tip {index}', confidence=0.5)
+
+    def test_pages_reference_the_device_without_its_readings(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('recommendation-history'), {'limit': 3})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual([item['message'] for item in body['results']], ['Tip 4', 'Tip 3', 'Tip 2'])
+        self.assertEqual(body['results'][0]['device'], 'basement')
+        self.assertIsNone(body['previous'])
+
+        body = self.client.get(body['next']).json()
+        self.assertEqual([item['message'] for item in body['results']], ['Tip 1', 'Tip 0'])
+        self.assertIsNone(body['next'])
+
+    def test_keyset_pages_walk_back_and_forth_across_equal_timestamps(self):
+        # Give every row the same created_at so only the id breaks ties.
+        Recommendation.objects.update(created_at=dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc))
+        url = reverse('recommendation-history')
+        first = self.client.get(url, {'limit': 2}).json()
+        second = self.client.get(first['next']).json()
+        third = self.client.get(second['next']).json()
+        self.assertEqual(
+            [item['message'] for page in (first, second, third) for item in page['results']],
+            ['Tip 4', 'Tip 3', 'Tip 2', 'Tip 1', 'Tip 0'],
+        )
+        self.assertIsNone(third['next'])
+
+        back = self.client.get(third['previous']).json()
+        self.assertEqual(back['results'], second['results'])
+        back = self.client.get(back['previous']).json()
+        self.assertEqual(back['results'], first['results'])
+        self.assertIsNone(back['previous'])
+
+        # A row added while scrolling does not shift the next page.
+        Recommendation.objects.create(device=self.device, category='radon', message='Newest', confidence=0.5)
+        self.assertEqual(self.client.get(first['next']).json()['results'], second['results'])
+
+    def test_filters_by_device_category_confidence_and_window(self):
+        other = SensorDevice.objects.create(name='Attic', slug='attic', sensor_type='radon')
+        old = Recommendation.objects.create(device=other, category='ventilation', message='Old', confidence=0.9)
+        Recommendation.objects.filter(pk=old.pk).update(created_at=dt.datetime(2023, 6, 1, tzinfo=dt.timezone.utc))
+        Recommendation.objects.create(device=other, category='ai_insight', message='Insight', confidence=0.75)
+
+        def messages(**params):
+            response = self.client.get(reverse('recommendation-history'), params)
+            self.assertEqual(response.status_code, 200, response.content)
+            return [item['message'] for item in response.json()['results']]
+
+        self.assertEqual(messages(device='attic'), ['Insight', 'Old'])
+        self.assertEqual(messages(category='ventilation,ai_insight'), ['Insight', 'Old'])
+        self.assertEqual(messages(min_confidence='0.7', max_confidence='0.8'), ['Insight'])
+        self.assertEqual(messages(device='attic', to='2024-01-01T00:00:00Z'), ['Old'])
+        self.assertEqual(len(messages(**{'from': '2024-01-01T00:00:00Z'})), 6)
+
+        url = reverse('recommendation-history')
+        self.assertEqual(self.client.get(url, {'min_confidence': 'high'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'from': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'device': 'missing'}).status_code, 404)
+        self.assertEqual(self.client.get(url, {'cursor': 'not-a-cursor'}).status_code, 404)
+
+    def test_llm_token_arrays_are_not_stored(self):
+        insight = RecommendationEngine.build_insight(
+            {'response': 'Open a window.', 'done_reason': 'stop', 'context': list(range(4096)), 'eval_count': 9}
+        )
+        self.assertNotIn('context', insight['context'])
+        self.assertEqual(insight['context']['eval_count'], 9)
+
+
+class RendererTests(SimpleTestCase):
+    def test_orjson_output_matches_the_standard_renderer(self):
+        data = {
+            'created_at': dt.datetime(2024, 1, 1, 12, 30, tzinfo=dt.timezone.utc),
+            'value': decimal.Decimal('1.25'),
+            'counts': {1: 'one'},
+            'message': 'Radon ≥ 4 pCi/L',
+        }
+        fast = ORJSONRenderer().render(data, 'application/json')
+        self.assertEqual(json.loads(fast), json.loads(JSONRenderer().render(data, 'application/json')))
+        self.assertEqual(json.loads(fast)['created_at'], '2024-01-01T12:30:00Z')
+
+    def test_indented_output_falls_back_to_the_standard_renderer(self):
+        rendered = ORJSONRenderer().render({'a': 1}, 'application/json; indent=2')
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
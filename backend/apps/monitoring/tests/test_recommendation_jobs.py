@@ -0,0 +1,113 @@
+import datetime as dt
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.monitoring.models import RecommendationJob, SensorDevice
+from apps.monitoring.services import OllamaClient, RecommendationJobWorker, record_readings
+from apps.monitoring.services.jobs import requeue_stale_jobs
+
+
+async def _read_stream(response):
+    return b''.join([chunk async for chunk in response.streaming_content]).decode()
+
+
+def _chunks(*args, **kwargs):
+    yield {'response': 'Open ', 'done': False}
+    yield {'response': 'the window', 'done': False}
+    yield {'response': '', 'done': True, 'done_reason': 'stop'}
+
+
+@override_settings(
+    WEATHER_API_KEY='',
+    OLLAMA_BASE_URL='http://ollama.test',
+    DEFAULT_OLLAMA_MODEL='llama2',
+    HOME_ASSISTANT_TOKEN='',
+    SUMMARY_LLM_MODE='job',
+)
+class RecommendationJobTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.device = SensorDevice.objects.create(name='Basement', slug='basement', sensor_type='radon')
+        record_readings(self.device, [{'metric': 'radon', 'value': 5.0, 'unit': 'pCi/L', 'timestamp': '2024-01-01T00:00:00Z'}])
+
+    def test_submit_run_and_poll(self):
+        url = reverse('recommendation-jobs')
+        first = self.client.post(url, {'device_id': 'basement'}, format='json')
+        second = self.client.post(url, {'device_id': 'basement'}, format='json')
+        self.assertEqual(first.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(first.data['status'], 'pending')
+        self.assertEqual(first.data['id'], second.data['id'])
+
+        with mock.patch.object(OllamaClient, 'generate_stream', side_effect=_chunks):
+            self.assertEqual(RecommendationJobWorker(flush_interval=0).run_pending(), 1)
+
+        detail = self.client.get(first.data['status_url'])
+        self.assertEqual(detail.data['status'], 'succeeded')
+        self.assertEqual(detail.data['output'], 'Open the window')
+        self.assertIsNotNone(detail.data['recommendation'])
+
+    def test_stream_relays_output_and_resumes_from_last_event_id(self):
+        job = RecommendationJob.objects.create(
+            device=self.device, submission_key='x', status=RecommendationJob.SUCCEEDED, output='Open the window'
+        )
+        url = reverse('recommendation-job-stream', args=[job.pk])
+
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = async_to_sync(_read_stream)(response)
+        self.assertIn('id: 0:15\nevent: token\ndata: {"text": "Open the window"}', body)
+        self.assertIn('event: done', body)
+
+        resumed = async_to_sync(_read_stream)(self.client.get(url, HTTP_LAST_EVENT_ID='0:5'))
+        self.assertIn('data: {"text": "the window"}', resumed)
+        self.assertNotIn('event: reset', resumed)
+
+    def test_reconnect_after_requeue_resets_the_client(self):
+        job = RecommendationJob.objects.create(
+            device=self.device, submission_key='x', status=RecommendationJob.RUNNING, output='Open the window'
+        )
+        RecommendationJob.objects.filter(pk=job.pk).update(updated_at=job.updated_at - dt.timedelta(hours=1))
+        self.assertEqual(requeue_stale_jobs(older_than=60), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.output, job.attempt), (RecommendationJob.PENDING, '', 1))
+
+        # A worker that stalled past the requeue cannot write into the new attempt.
+        stalled = RecommendationJob(pk=job.pk, attempt=0)
+        RecommendationJobWorker()._flush(stalled, 'Open the window and')
+        RecommendationJob.objects.filter(pk=job.pk).update(status=RecommendationJob.SUCCEEDED, output='Close it')
+
+        # The client had read 15 characters of the first attempt.
+        url = reverse('recommendation-job-stream', args=[job.pk])
+        body = async_to_sync(_read_stream)(self.client.get(url, HTTP_LAST_EVENT_ID='0:15'))
+        self.assertIn('id: 1:0\nevent: reset\ndata: {"attempt": 1}', body)
+        self.assertIn('id: 1:8\nevent: token\ndata: {"text": "Close it"}', body)
+        self.assertLess(body.index('event: reset'), body.index('event: token'))
+
+    def test_summary_queues_a_job_instead_of_calling_ollama(self):
+        with mock.patch.object(OllamaClient, 'generate') as generate:
+            response = self.client.get(reverse('summary'), {'device_id': 'basement'})
+        generate.assert_not_called()
+        job = response.data['metadata']['recommendation_job']
+        self.assertEqual(job['status'], 'pending')
+        self.assertTrue(RecommendationJob.objects.filter(pk=job['id'], device=self.device).exists())
+
+    def test_cached_summary_is_revalidated_once_its_job_finishes(self):
+        pending = self.client.get(reverse('summary'), {'device_id': 'basement'})
+        self.assertEqual(pending.data['metadata']['recommendation_job']['status'], 'pending')
+        unchanged = self.client.get(reverse('summary'), {'device_id': 'basement'}, HTTP_IF_NONE_MATCH=pending['ETag'])
+        self.assertEqual(unchanged.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with mock.patch.object(OllamaClient, 'generate_stream', side_effect=_chunks):
+            self.assertEqual(RecommendationJobWorker(flush_interval=0).run_pending(), 1)
+
+        finished = self.client.get(reverse('summary'), {'device_id': 'basement'}, HTTP_IF_NONE_MATCH=pending['ETag'])
+        self.assertEqual(finished.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(finished['ETag'], pending['ETag'])
+        self.assertNotIn('recommendation_job', finished.data['metadata'])
+        self.assertIn('ai_insight', [item['category'] for item in finished.data['recommendations']])
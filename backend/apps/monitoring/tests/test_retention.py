@@ -0,0 +1,85 @@
+import datetime as dt
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.monitoring.models import ReadingPayload, SensorDevice, SensorReading, SensorReadingDaily
+from apps.monitoring.services import upsert_readings
+from apps.monitoring.services.retention import apply_retention, compact_payloads, payload_digest, purge_raw_readings
+
+
+@override_settings(READING_RAW_RETENTION_DAYS=30, READING_PAYLOAD_RETENTION_DAYS=2, RETENTION_CHUNK_SIZE=7)
+class RetentionTests(TestCase):
+    def setUp(self):
+        self.device = SensorDevice.objects.create(name='Basement', slug='basement', sensor_type='radon')
+        self.now = timezone.now()
+        shared = {'temperature': 21, 'humidity': 40}
+        upsert_readings([
+            SensorReading(
+                device=self.device,
+                metric=metric,
+                value=1.0,
+                unit='',
+                timestamp=self.now - dt.timedelta(days=days, minutes=minute),
+                raw_payload=shared,
+            )
+            for days in (1, 5, 40)
+            for metric in ('temperature', 'humidity')
+            for minute in range(10)
+        ])
+
+    def test_old_payloads_are_deduplicated_and_old_rows_purged_into_rollups(self):
+        result = apply_retention(self.now)
+
+        self.assertEqual(result['readings_deleted'], 20)
+        self.assertEqual(result['payloads_compacted'], 20)
+        self.assertEqual(SensorReading.objects.count(), 40)
+        self.assertEqual(ReadingPayload.objects.count(), 1)
+
+        compacted = SensorReading.objects.filter(timestamp__lt=self.now - dt.timedelta(days=2)).first()
+        self.assertEqual(compacted.raw_payload, {})
+        self.assertEqual(compacted.payload, {'temperature': 21, 'humidity': 40})
+        recent = SensorReading.objects.filter(timestamp__gt=self.now - dt.timedelta(days=2)).first()
+        self.assertEqual(recent.payload_digest, '')
+
+        purged_day = SensorReadingDaily.objects.filter(bucket_start__lt=self.now - dt.timedelta(days=30))
+        self.assertEqual(sum(rollup.count for rollup in purged_day), 20)
+
+    def test_purge_deletes_payloads_only_its_rows_referred_to(self):
+        compact_payloads(self.now)
+        ReadingPayload.objects.create(digest='unrelated', payload={})
+        shared = payload_digest({'temperature': 21, 'humidity': 40})
+
+        purge_raw_readings(self.now - dt.timedelta(days=3))
+        self.assertEqual(set(ReadingPayload.objects.values_list('digest', flat=True)), {shared, 'unrelated'})
+        purge_raw_readings(self.now)
+        self.assertEqual(list(ReadingPayload.objects.values_list('digest', flat=True)), ['unrelated'])
+
+    def test_backfill_into_purged_range_merges_into_rollups(self):
+        apply_retention(self.now)
+        old = self.now - dt.timedelta(days=40, minutes=30)
+        row = SensorReading(device=self.device, metric='humidity', value=9.0, unit='%', timestamp=old)
+        upsert_readings([row])
+        upsert_readings([SensorReading(device=self.device, metric='humidity', value=9.0, unit='%', timestamp=old)])
+
+        daily = SensorReadingDaily.objects.filter(metric='humidity', bucket_start__lt=self.now - dt.timedelta(days=30))
+        self.assertEqual(sum(rollup.count for rollup in daily), 11)
+        self.assertEqual(max(rollup.max for rollup in daily), 9.0)
+
+    def test_unaligned_series_reads_purged_days_from_rollups(self):
+        apply_retention(self.now)
+        for bucket, source in (('1d', 'daily+raw'), ('1w', 'daily+raw'), ('6h', 'hourly+raw')):
+            response = self.client.get(
+                reverse('device-series', args=['basement']),
+                {
+                    'metric': 'temperature',
+                    'from': (self.now - dt.timedelta(days=45)).isoformat(),
+                    'bucket': bucket,
+                    'agg': 'avg,count',
+                },
+            )
+            self.assertEqual(response.json()['source'], source)
+            points = response.json()['points']
+            self.assertEqual(sum(point['count'] for point in points), 30, bucket)
+            self.assertEqual({point['avg'] for point in points}, {1.0})
@@ -0,0 +1,93 @@
+import datetime as dt
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.monitoring.models import SensorDevice, SensorReading, SensorReadingDaily, SensorReadingHourly
+from apps.monitoring.services import upsert_readings
+from apps.monitoring.services.rollups import rebuild_rollups
+
+
+# The fixtures are long past the default raw retention horizon; these tests read raw rows.
+@override_settings(READING_RAW_RETENTION_DAYS=0)
+class DeviceSeriesTests(APITestCase):
+    def setUp(self):
+        self.device = SensorDevice.objects.create(name='Basement', slug='basement', sensor_type='radon')
+        start = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+        upsert_readings([
+            SensorReading(
+                device=self.device,
+                metric='radon',
+                value=float(minute % 60),
+                unit='pCi/L',
+                timestamp=start + dt.timedelta(minutes=minute),
+            )
+            for minute in range(180)
+        ])
+
+    def test_hourly_buckets_are_aggregated_in_the_database(self):
+        response = self.client.get(
+            reverse('device-series', args=['basement']),
+            {
+                'metric': 'radon',
+                'from': '2024-01-01T00:00:00Z',
+                'to': '2024-01-01T03:00:00Z',
+                'bucket': '1h',
+                'agg': 'avg,min,max,count',
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['source'], 'hourly')
+        points = response.data['points']
+        self.assertEqual(len(points), 3)
+        self.assertEqual(points[0]['timestamp'], '2024-01-01T00:00:00+00:00')
+        self.assertEqual(points[1], {
+            'timestamp': '2024-01-01T01:00:00+00:00', 'avg': 29.5, 'min': 0.0, 'max': 59.0, 'count': 60,
+        })
+
+    def test_rejects_too_many_buckets(self):
+        response = self.client.get(
+            reverse('device-series', args=['basement']),
+            {'metric': 'radon', 'from': '2000-01-01T00:00:00Z', 'to': '2024-01-01T00:00:00Z', 'bucket': '1m'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unaligned_ranges_fall_back_to_raw_rows(self):
+        response = self.client.get(
+            reverse('device-series', args=['basement']),
+            {'metric': 'radon', 'from': '2024-01-01T00:30:00Z', 'to': '2024-01-01T02:00:00Z', 'bucket': '30m', 'agg': 'max'},
+        )
+        self.assertEqual(response.data['source'], 'raw')
+        self.assertEqual([p['max'] for p in response.data['points']], [59.0, 29.0, 59.0])
+
+    def test_rollups_are_maintained_on_ingest_and_rebuildable(self):
+        hourly = SensorReadingHourly.objects.get(bucket_start=dt.datetime(2024, 1, 1, 2, tzinfo=dt.timezone.utc))
+        self.assertEqual((hourly.count, hourly.min, hourly.max, hourly.last), (60, 0.0, 59.0, 59.0))
+        daily = SensorReadingDaily.objects.get()
+        self.assertEqual((daily.count, daily.sum, daily.last), (180, 3 * sum(range(60)), 59.0))
+
+        SensorReadingHourly.objects.all().delete()
+        rebuild_rollups(dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc), dt.datetime(2024, 1, 2, tzinfo=dt.timezone.utc))
+        self.assertEqual(SensorReadingHourly.objects.count(), 3)
+        self.assertEqual(SensorReadingDaily.objects.get().count, 180)
+
+    @override_settings(READING_RAW_RETENTION_DAYS=0)
+    def test_ingest_refreshes_only_the_touched_buckets(self):
+        # A marker on the untouched middle hour shows whether it was recomputed.
+        SensorReadingHourly.objects.filter(bucket_start=dt.datetime(2024, 1, 1, 1, tzinfo=dt.timezone.utc)).update(count=0)
+        upsert_readings([
+            SensorReading(device=self.device, metric='radon', value=99.0, unit='pCi/L', timestamp=timestamp)
+            for timestamp in (
+                dt.datetime(2024, 1, 1, 0, 30, 30, tzinfo=dt.timezone.utc),
+                dt.datetime(2024, 1, 3, 12, tzinfo=dt.timezone.utc),
+            )
+        ])
+
+        hours = dict(SensorReadingHourly.objects.values_list('bucket_start', 'count'))
+        self.assertEqual(hours[dt.datetime(2024, 1, 1, 0, tzinfo=dt.timezone.utc)], 61)
+        self.assertEqual(hours[dt.datetime(2024, 1, 1, 1, tzinfo=dt.timezone.utc)], 0)
+        self.assertEqual(hours[dt.datetime(2024, 1, 3, 12, tzinfo=dt.timezone.utc)], 1)
+        self.assertEqual(len(hours), 4)
+        self.assertEqual(SensorReadingDaily.objects.count(), 2)
@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -5,6 +6,7 @@ from rest_framework.test import APITestCase
 
 class SummaryViewTests(APITestCase):
     def test_summary_returns_warning_when_no_integrations(self):
+        cache.clear()
         response = self.client.get(reverse('summary'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('metadata', response.data)
@@ -0,0 +1,45 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from apps.monitoring.models import SensorDevice
+from apps.monitoring.services import OllamaClient, record_readings
+
+
+@override_settings(
+    WEATHER_API_KEY='',
+    OLLAMA_BASE_URL='http://ollama.test',
+    DEFAULT_OLLAMA_MODEL='llama2',
+    HOME_ASSISTANT_TOKEN='',
+    SUMMARY_LLM_MODE='inline',
+)
+class SummaryCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.device = SensorDevice.objects.create(name='Basement', slug='basement', sensor_type='radon')
+        record_readings(self.device, [{'metric': 'radon', 'value': 2.0, 'unit': 'pCi/L', 'timestamp': '2024-01-01T00:00:00Z'}])
+
+    def test_cached_until_a_newer_reading_arrives(self):
+        url = reverse('summary')
+        params = {'device_id': 'basement', 'model': 'llama2'}
+        with mock.patch.object(OllamaClient, 'generate', return_value={'response': 'Open a window'}) as generate:
+            first = self.client.get(url, params)
+            second = self.client.get(url, params)
+            self.assertEqual(generate.call_count, 1)
+            self.assertEqual(first['ETag'], second['ETag'])
+            self.assertEqual(first['Last-Modified'], 'Mon, 01 Jan 2024 00:00:00 GMT')
+
+            not_modified = self.client.get(url, params, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(generate.call_count, 1)
+
+            record_readings(self.device, [{'metric': 'radon', 'value': 5.0, 'unit': 'pCi/L', 'timestamp': '2024-01-01T01:00:00Z'}])
+            third = self.client.get(url, params, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(third.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(third['ETag'], first['ETag'])
+            self.assertEqual(third.data['radon']['value'], 5.0)
+            self.assertEqual(generate.call_count, 2)
@@ -0,0 +1,213 @@
+import datetime as dt
+import math
+
+import numpy as np
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.monitoring.models import SensorDevice, SensorReading
+from apps.monitoring.services import OllamaClient, RecommendationEngine, upsert_readings
+from apps.monitoring.services.trends import TrendTracker, reset_trend_tracker
+
+NOW = dt.datetime(2024, 3, 1, 12, tzinfo=dt.timezone.utc)
+THRESHOLDS = {'radon': 4.0, 'humidity': 60.0}
+
+
+def brute_force(points, *, now, window, halflife, horizon, threshold):
+    """Recompute a series' statistics from scratch, point by point."""
+
+    tau = halflife / math.log(2)
+    ewma, previous = None, None
+    since = None
+    for t, v in points:
+        ewma = v if ewma is None else ewma + (1 - math.exp(-(t - previous) / tau)) * (v - ewma)
+        previous = t
+        since = (since if since is not None else t) if v > threshold else None
+    inside = [(t, v) for t, v in points if t >= now - window]
+    times = np.array([t for t, _ in inside])
+    values = np.array([v for _, v in inside])
+    last_t, last_v = inside[-1]
+    earlier = [(t, v) for t, v in inside if t <= last_t - horizon] or inside[:1]
+    reference_t, reference_v = earlier[-1]
+    return {
+        'points': len(inside),
+        'mean': values.mean(),
+        'ewma': ewma,
+        'slope_per_hour': np.polyfit(times, values, 1)[0] * 3600,
+        'rate_per_hour': (last_v - reference_v) / (last_t - reference_t) * 3600,
+        'exceedance_seconds': 0.0 if since is None else last_t - since,
+    }
+
+
+class TrendTrackerTests(TestCase):
+    def setUp(self):
+        self.devices = [
+            SensorDevice.objects.create(name=f'Room {index}', slug=f'room-{index}', sensor_type='radon')
+            for index in range(3)
+        ]
+
+    def _write(self, rows):
+        SensorReading.objects.bulk_create(
+            SensorReading(device=device, metric=metric, value=value, timestamp=timestamp)
+            for device, metric, timestamp, value in rows
+        )
+
+    def test_incremental_statistics_match_a_full_recomputation(self):
+        rng = np.random.default_rng(7)
+        tracker = TrendTracker(window_hours=2, halflife_minutes=20, rate_horizon_minutes=30, thresholds=THRESHOLDS)
+        start = NOW - dt.timedelta(hours=4)
+        series = {}
+        for device in self.devices:
+            for metric, level in (('radon', 4.0), ('humidity', 58.0)):
+                # Irregular polling 1-9 minutes apart, drifting upwards across the threshold.
+                seconds = np.cumsum(rng.integers(60, 540, size=40))
+                values = level + seconds / 7200 + rng.normal(0, 0.4, size=40)
+                series[device, metric] = [
+                    (start + dt.timedelta(seconds=int(offset)), float(value)) for offset, value in zip(seconds, values)
+                ]
+
+        for step in range(6):
+            since, now = start + dt.timedelta(minutes=40 * step), start + dt.timedelta(minutes=40 * (step + 1))
+            self._write(
+                (device, metric, timestamp, value)
+                for (device, metric), points in series.items()
+                for timestamp, value in points
+                if since < timestamp <= now
+            )
+            tracker.refresh(now=now)
+
+        for device in self.devices:
+            stats = tracker.device_stats(device.pk)
+            self.assertEqual(set(stats), {'radon', 'humidity'})
+            for metric, trend in stats.items():
+                expected = brute_force(
+                    [(timestamp.timestamp(), value) for timestamp, value in series[device, metric] if timestamp <= now],
+                    now=now.timestamp(),
+                    window=7200,
+                    halflife=1200,
+                    horizon=1800,
+                    threshold=THRESHOLDS[metric],
+                )
+                self.assertEqual(trend.points, expected.pop('points'))
+                for name, value in expected.items():
+                    self.assertAlmostEqual(getattr(trend, name), value, places=6, msg=f'{device.slug} {metric} {name}')
+        self.assertEqual(set(tracker.all_stats()), {device.pk for device in self.devices})
+
+    def test_only_new_rows_are_read_and_old_points_leave_the_window(self):
+        device = self.devices[0]
+        tracker = TrendTracker(window_hours=1, thresholds={'radon': 4.0})
+        self._write([(device, 'radon', NOW - dt.timedelta(minutes=minutes), 5.0) for minutes in (50, 30, 10)])
+        self.assertEqual(tracker.refresh(now=NOW), 3)
+        self.assertEqual(tracker.refresh(now=NOW), 0)
+
+        # A backfilled reading older than the newest point is read but ignored.
+        self._write(
+            [(device, 'radon', NOW - dt.timedelta(minutes=20), 1.0), (device, 'radon', NOW + dt.timedelta(minutes=5), 5.0)]
+        )
+        self.assertEqual(tracker.refresh(now=NOW + dt.timedelta(minutes=15)), 2)
+        stats = tracker.device_stats(device.pk)['radon']
+        self.assertEqual(stats.points, 3)  # the 50-minute-old point expired
+        self.assertEqual(stats.mean, 5.0)
+        self.assertEqual(stats.exceedance_seconds, 55 * 60)
+        self.assertEqual(tracker.device_stats(self.devices[1].pk), {})
+
+    def test_late_commits_and_in_place_corrections_are_picked_up(self):
+        device = self.devices[0]
+        tracker = TrendTracker(window_hours=1, thresholds={'radon': 4.0})
+        SensorReading.objects.bulk_create(
+            SensorReading(
+                id=100 + minutes, device=device, metric='radon', value=2.0, timestamp=NOW - dt.timedelta(minutes=minutes)
+            )
+            for minutes in (30, 20)
+        )
+        self.assertEqual(tracker.refresh(now=NOW), 2)
+
+        # A newer reading whose transaction took a lower id but committed after the refresh.
+        SensorReading.objects.create(
+            id=1, device=device, metric='radon', value=3.0, timestamp=NOW - dt.timedelta(minutes=10)
+        )
+        self.assertEqual(tracker.refresh(now=NOW), 1)
+        self.assertEqual(tracker.device_stats(device.pk)['radon'].points, 3)
+
+        # Re-sent with a corrected value under the same key: the row is updated in place.
+        upsert_readings(
+            [SensorReading(device=device, metric='radon', value=6.0, unit='', timestamp=NOW - dt.timedelta(minutes=10))]
+        )
+        self.assertEqual(tracker.refresh(now=NOW), 1)
+        stats = tracker.device_stats(device.pk)['radon']
+        self.assertEqual((stats.points, stats.last_value, stats.mean), (3, 6.0, 10 / 3))
+        self.assertEqual(tracker.refresh(now=NOW), 0)
+
+    def test_database_is_queried_without_holding_the_lock(self):
+        tracker = TrendTracker(window_hours=1, thresholds={'radon': 4.0})
+        self._write([(self.devices[0], 'radon', NOW - dt.timedelta(minutes=5), 5.0)])
+        held = []
+
+        def record(execute, sql, params, many, context):
+            held.append(tracker._lock.locked())
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            tracker.refresh(now=NOW)
+            tracker.refresh(now=NOW)
+        self.assertEqual(held, [False, False])
+
+
+@override_settings(TREND_SUSTAINED_MINUTES=60, TREND_MIN_POINTS=4)
+class TrendRecommendationTests(TestCase):
+    def setUp(self):
+        self.device = SensorDevice.objects.create(name='Basement', slug='basement', sensor_type='radon')
+        self.engine = RecommendationEngine(OllamaClient('http://ollama.test', 'llama2'), time_window_hours=6)
+
+    def _trends(self, values, *, minutes=15):
+        end = timezone.now()
+        SensorReading.objects.bulk_create(
+            SensorReading(
+                device=self.device, metric='radon', value=value, timestamp=end - dt.timedelta(minutes=minutes * index)
+            )
+            for index, value in enumerate(reversed(values))
+        )
+        tracker = TrendTracker(window_hours=6, thresholds={'radon': 4.0})
+        tracker.refresh(now=end)
+        return tracker.device_stats(self.device.pk)
+
+    def test_sustained_exceedance_fires_but_a_single_spike_does_not(self):
+        actions = self.engine._trend_recommendations(self._trends([4.5, 4.8, 5.1, 4.9, 5.2, 5.0]))
+        self.assertEqual(len(actions), 1)
+        self.assertEqual(actions[0]['category'], 'air_quality')
+        self.assertIn('Radon has stayed above 4 for 1.2 h', actions[0]['message'])
+        self.assertEqual(actions[0]['context']['trend']['exceedance_seconds'], 75 * 60)
+
+        SensorReading.objects.all().delete()
+        self.assertEqual(self.engine._trend_recommendations(self._trends([1.0, 1.1, 0.9, 1.0, 6.0])), [])
+
+    def test_rising_series_projects_the_threshold_crossing(self):
+        actions = self.engine._trend_recommendations(self._trends([2.0, 2.3, 2.6, 2.9, 3.2, 3.5], minutes=30))
+        self.assertEqual(len(actions), 1)
+        self.assertIn('Radon is rising by 0.60 per hour', actions[0]['message'])
+        self.assertEqual(actions[0]['confidence'], 0.6)
+
+    @override_settings(
+        WEATHER_API_KEY='',
+        OLLAMA_BASE_URL='http://ollama.test',
+        DEFAULT_OLLAMA_MODEL='llama2',
+        HOME_ASSISTANT_TOKEN='',
+        SUMMARY_LLM_MODE='job',
+    )
+    def test_summary_reports_sustained_trends(self):
+        cache.clear()
+        reset_trend_tracker()
+        self.addCleanup(reset_trend_tracker)
+        end = timezone.now()
+        for index in range(8):
+            SensorReading.objects.create(
+                device=self.device, metric='radon', value=5.0, unit='pCi/L', timestamp=end - dt.timedelta(minutes=15 * index)
+            )
+        self.device.latest_readings.create(metric='radon', value=5.0, unit='pCi/L', timestamp=end)
+
+        response = self.client.get(reverse('summary'), {'device_id': 'basement'})
+        messages = [item['message'] for item in response.json()['recommendations']]
+        self.assertTrue(any(message.startswith('Radon has stayed above 4 for 1.8 h') for message in messages), messages)
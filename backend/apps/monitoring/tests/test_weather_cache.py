@@ -0,0 +1,134 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.monitoring.models import SensorDevice, WeatherObservation
+from apps.monitoring.services import WeatherClient, record_readings
+from apps.monitoring.services.weather_cache import (
+    WeatherBudgetExceeded,
+    WeatherCache,
+    WeatherLocation,
+    record_observation,
+)
+
+OSLO = {'dt': 1704067200, 'main': {'temp': -3.0, 'humidity': 80}, 'weather': [{'main': 'Snow'}]}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class WeatherCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.clock = Clock()
+        self.client_ = mock.Mock(spec=WeatherClient, api_key='key')
+        self.client_.current_by_coordinates.return_value = OSLO
+
+    def _cache(self, **kwargs):
+        options = {'ttl': 600, 'stale': 3600, 'budget': 5, 'budget_window': 60, 'clock': self.clock, 'background': lambda fn: fn()}
+        return WeatherCache(self.client_, **{**options, **kwargs})
+
+    def test_locations_are_quantized_and_normalized(self):
+        self.assertEqual(WeatherLocation.from_params('59.91312', '10.75201', None).key, 'coord:59.91,10.75')
+        self.assertEqual(WeatherLocation.from_params('59.9139', '10.7522', None).key, 'coord:59.91,10.75')
+        self.assertEqual(WeatherLocation.from_params(None, None, '  New   York ').key, 'city:new york')
+        self.assertIsNone(WeatherLocation.from_params(None, None, ''))
+
+    def test_fresh_then_stale_while_revalidate(self):
+        weather = self._cache()
+        location = WeatherLocation.from_params('59.91', '10.75', None)
+        self.assertEqual(weather.get(location), OSLO)
+        self.assertEqual(weather.get(location), OSLO)
+        self.assertEqual(self.client_.current_by_coordinates.call_count, 1)
+
+        self.clock.now += 700
+        self.assertEqual(weather.lookup(location), (OSLO, False))
+        self.assertEqual(self.client_.current_by_coordinates.call_count, 2)
+        # The same observation (same provider "dt") is only recorded once.
+        self.assertEqual(WeatherObservation.objects.filter(location_key=location.key).count(), 1)
+        self.assertEqual(WeatherObservation.objects.get().temperature, -3.0)
+
+    def test_exhausted_budget_serves_recorded_conditions(self):
+        weather = self._cache(budget=1)
+        location = WeatherLocation.from_params('59.91', '10.75', None)
+        weather.get(location)
+        cache.delete(f'weather:{location.key}')
+
+        self.assertEqual(weather.get(location), OSLO)
+        self.assertEqual(self.client_.current_by_coordinates.call_count, 1)
+        with self.assertRaises(WeatherBudgetExceeded):
+            weather.get(WeatherLocation.from_params('40.71', '-74.01', None))
+
+
+    def test_budget_spent_between_lookup_and_fetch_serves_recorded_conditions(self):
+        weather = self._cache(budget=1)
+        location = WeatherLocation.from_params('59.91', '10.75', None)
+        weather.get(location)
+        cache.delete(f'weather:{location.key}')
+
+        # lookup() still saw budget left; a concurrent refresh spent it before fetch().
+        with mock.patch.object(WeatherCache, 'budget_remaining', return_value=1):
+            self.assertEqual(weather.lookup(location), (None, True))
+            self.assertEqual(weather.get(location), OSLO)
+        self.assertEqual(self.client_.current_by_coordinates.call_count, 1)
+
+@override_settings(
+    WEATHER_API_KEY='weather-key',
+    OLLAMA_BASE_URL='',
+    HOME_ASSISTANT_TOKEN='',
+)
+class SummaryWeatherCacheTests(APITestCase):
+    def test_summary_reuses_cached_weather(self):
+        cache.clear()
+        device = SensorDevice.objects.create(name='Basement', slug='basement', sensor_type='radon')
+        record_readings(device, [{'metric': 'radon', 'value': 2.0, 'unit': 'pCi/L', 'timestamp': '2024-01-01T00:00:00Z'}])
+        with mock.patch.object(WeatherClient, 'current_by_city', return_value=OSLO) as current:
+            first = self.client.get(reverse('summary'), {'device_id': 'basement', 'city': 'Oslo'})
+            second = self.client.get(reverse('summary'), {'device_id': 'basement', 'city': ' oslo'})
+        self.assertEqual(current.call_count, 1)
+        current.assert_called_with('oslo')
+        self.assertEqual(first.data['weather'], OSLO)
+        self.assertEqual(second.data['weather'], OSLO)
+        self.assertTrue(WeatherObservation.objects.filter(location_key='city:oslo').exists())
+
+    def test_summary_falls_back_to_recorded_weather_when_the_budget_runs_out_mid_fetch(self):
+        cache.clear()
+        device = SensorDevice.objects.create(name='Basement', slug='basement', sensor_type='radon')
+        record_readings(device, [{'metric': 'radon', 'value': 2.0, 'unit': 'pCi/L', 'timestamp': '2024-01-01T00:00:00Z'}])
+        record_observation(WeatherLocation.from_params(None, None, 'Oslo'), OSLO)
+        with mock.patch.object(WeatherCache, 'budget_remaining', return_value=1), \
+                mock.patch.object(WeatherCache, '_take_budget', return_value=False), \
+                mock.patch.object(WeatherClient, 'current_by_city') as current:
+            response = self.client.get(reverse('summary'), {'device_id': 'basement', 'city': 'Oslo'})
+        current.assert_not_called()
+        self.assertEqual(response.data['weather'], OSLO)
+        self.assertNotIn('weather_error', response.data['metadata'])
+
+    @override_settings(SUMMARY_BUDGET_SECONDS=0.3, WEATHER_TIMEOUT_SECONDS=5)
+    def test_summary_does_not_wait_past_its_budget_for_a_slow_weather_fetch(self):
+        cache.clear()
+        device = SensorDevice.objects.create(name='Basement', slug='basement', sensor_type='radon')
+        record_readings(device, [{'metric': 'radon', 'value': 2.0, 'unit': 'pCi/L', 'timestamp': '2024-01-01T00:00:00Z'}])
+        record_observation(WeatherLocation.from_params(None, None, 'Oslo'), OSLO)
+
+        def slow_weather(self, city):
+            time.sleep(1)
+            return {'main': {'temp': 20}}
+
+        with mock.patch.object(WeatherClient, 'current_by_city', slow_weather):
+            started = time.monotonic()
+            response = self.client.get(reverse('summary'), {'device_id': 'basement', 'city': 'Oslo'})
+            elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 0.9)
+        self.assertEqual(response.data['weather'], OSLO)
+        self.assertEqual(response.data['metadata']['late'], ['weather'])
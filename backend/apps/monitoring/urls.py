@@ -1,11 +1,33 @@
 from django.urls import path
 
-from .views import DeviceListView, RecommendationHistoryView, SummaryView, OllamaModelListView, HealthView
+from .views import (
+    BulkReadingIngestView,
+    ConnectorListView,
+    DeviceListView,
+    DeviceSeriesView,
+    HealthView,
+    OllamaModelListView,
+    RecommendationHistoryView,
+    RecommendationJobDetailView,
+    RecommendationJobListView,
+    SummaryView,
+    export_readings,
+    live_events,
+    recommendation_job_stream,
+)
 
 urlpatterns = [
     path("health/", HealthView.as_view(), name="health-check"),
+    path("connectors/", ConnectorListView.as_view(), name="connector-list"),
     path("devices/", DeviceListView.as_view(), name="device-list"),
+    path("devices/<slug:slug>/series/", DeviceSeriesView.as_view(), name="device-series"),
+    path("export/readings/", export_readings, name="reading-export"),
+    path("readings/bulk/", BulkReadingIngestView.as_view(), name="reading-bulk-ingest"),
+    path("live/", live_events, name="live-events"),
     path("summary/", SummaryView.as_view(), name="summary"),
     path("recommendations/", RecommendationHistoryView.as_view(), name="recommendation-history"),
+    path("recommendations/jobs/", RecommendationJobListView.as_view(), name="recommendation-jobs"),
+    path("recommendations/jobs/<int:pk>/", RecommendationJobDetailView.as_view(), name="recommendation-job-detail"),
+    path("recommendations/jobs/<int:pk>/stream/", recommendation_job_stream, name="recommendation-job-stream"),
     path("ai/models/", OllamaModelListView.as_view(), name="ollama-models"),
 ]
@@ -1,86 +1,289 @@
 from __future__ import annotations
 
+import asyncio
 import datetime as dt
+import hashlib
+import json
 import os
-from typing import Any, Dict, List, Optional
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Dict, List, Optional, Tuple
 
 from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, parse_http_date_safe
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Recommendation, SensorDevice, SensorReading
-from .serializers import InsightSerializer, RecommendationSerializer, SensorDeviceSerializer
-from .services import AllthingsWaveClient, HomeAssistantClient, OllamaClient, RecommendationEngine, WeatherClient
-
-
-def _parse_timestamp(raw: Any) -> dt.datetime:
-    if raw is None:
-        return timezone.now()
-    if isinstance(raw, dt.datetime):
-        return raw if timezone.is_aware(raw) else timezone.make_aware(raw)
-    if isinstance(raw, str):
-        parsed = parse_datetime(raw.replace("Z", "+00:00"))
-        if parsed is None:
-            return timezone.now()
-        return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
-    return timezone.now()
-
-
-def _ensure_device_record(device_payload: Dict[str, Any]) -> SensorDevice:
-    identifier = device_payload.get("id") or device_payload.get("slug") or device_payload.get("serial")
-    if not identifier:
-        raise ValueError("Device payload missing id/slug")
-
-    defaults = {
-        "name": device_payload.get("name", identifier),
-        "manufacturer": device_payload.get("manufacturer", "Allthings Wave"),
-        "sensor_type": device_payload.get("sensor_type", "radon"),
-        "connection_type": "api",
-        "metadata": device_payload,
-    }
-    device, _ = SensorDevice.objects.update_or_create(slug=identifier, defaults=defaults)
-    return device
-
-
-def _record_reading(
-    *,
-    device: SensorDevice,
-    metric: str,
-    value: float,
-    unit: str,
-    timestamp: Any,
-    payload: Dict[str, Any],
-) -> SensorReading:
-    ts = _parse_timestamp(timestamp)
-    reading, _ = SensorReading.objects.update_or_create(
-        device=device,
-        metric=metric,
-        timestamp=ts,
-        defaults={"value": value, "unit": unit, "raw_payload": payload},
+from .models import LatestReading, Recommendation, RecommendationJob, SensorDevice, SensorReading
+from .pagination import RecommendationKeysetPagination
+from .serializers import (
+    InsightSerializer,
+    RecommendationJobSerializer,
+    RecommendationSerializer,
+    SensorDeviceListSerializer,
+    SensorDeviceWithRecentReadingsSerializer,
+)
+from .services import (
+    OllamaClient,
+    RecommendationEngine,
+    WeatherClient,
+    build_recommendation_engine,
+    bulk_ingest_readings,
+    enqueue_recommendation_job,
+)
+from .services.breaker import OPEN, breaker_states
+from .services.connectors import connector_stats
+from .services.export import aexport_chunks, encoder_for, export_queryset
+from .services.fanout import FanOut
+from .services.history import (
+    fill_series,
+    parse_aggregates,
+    parse_bucket,
+    parse_fill,
+    plan_sources,
+    query_plan,
+    series_anchors,
+)
+from .services.live import get_event_layer, publish_recommendations
+from .services.metrics import render_metrics
+from .services.rollups import raw_retention_horizon
+from .services.trends import get_trend_tracker
+from .services.weather_cache import WeatherBudgetExceeded, WeatherCache, WeatherLocation, weather_history
+
+
+DEVICE_READINGS_DEFAULT_LIMIT = 10
+DEVICE_READINGS_MAX_LIMIT = 500
+
+
+SUMMARY_METRICS = ("radon", "temperature", "humidity")
+# Responses carrying these keys reflect a transient upstream problem and are not cached.
+UNCACHEABLE_METADATA = ("late", "weather_error", "ollama_error")
+
+
+def _summary_validators(request, device: Optional[SensorDevice], last_updated: Optional[dt.datetime]) -> Tuple[str, str]:
+    params = request.query_params
+    parts = [
+        device.slug if device else params.get("device_id", ""),
+        params.get("lat", ""),
+        params.get("lon", ""),
+        params.get("city", ""),
+        params.get("model", ""),
+        last_updated.isoformat() if last_updated else "",
+    ]
+    digest = hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:32]
+    return f"summary:{digest}", f'"{digest}"'
+
+
+def _job_moved_on(data: Dict[str, Any]) -> bool:
+    """Whether the recommendation job a cached summary reports has changed status since."""
+
+    job = data["metadata"].get("recommendation_job")
+    return job is not None and not RecommendationJob.objects.filter(pk=job["id"], status=job["status"]).exists()
+
+
+def _summary_etag(etag: str, job: Optional[Dict[str, Any]]) -> str:
+    # The job status is part of the representation, so a finished job changes the ETag.
+    return f'{etag[:-1]}-{job["status"]}"' if job else etag
+
+
+def _not_modified(request, etag: str, last_updated: Optional[dt.datetime]) -> bool:
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+    if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since") or "")
+    return bool(if_modified_since and last_updated and int(last_updated.timestamp()) <= if_modified_since)
+
+
+def _with_validators(response: Response, etag: str, last_updated: Optional[dt.datetime]) -> Response:
+    response["ETag"] = etag
+    response["Cache-Control"] = "no-cache"
+    if last_updated is not None:
+        response["Last-Modified"] = http_date(last_updated.timestamp())
+    return response
+
+
+def _sensor_snapshot(latest: Dict[str, LatestReading]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Shape the latest radon and temperature/humidity rows the way the engine and UI expect."""
+
+    radon_reading = latest.get("radon")
+    temperature_reading = latest.get("temperature")
+    humidity_reading = latest.get("humidity")
+
+    radon_data = (
+        {
+            "value": radon_reading.value,
+            "unit": radon_reading.unit,
+            "timestamp": radon_reading.timestamp.isoformat(),
+        }
+        if radon_reading
+        else None
+    )
+    environment_reading = temperature_reading or humidity_reading
+    environment_data = (
+        {
+            "temperature": temperature_reading.value if temperature_reading else None,
+            "humidity": humidity_reading.value if humidity_reading else None,
+            "timestamp": environment_reading.timestamp.isoformat(),
+        }
+        if environment_reading
+        else None
     )
-    return reading
+    return radon_data, environment_data
+
+
+def _parse_query_datetime(raw: Optional[str], default: Optional[dt.datetime]) -> Optional[dt.datetime]:
+    if not raw:
+        return default
+    parsed = parse_datetime(raw.replace("Z", "+00:00").replace(" ", "+"))
+    if parsed is None:
+        raise ValueError(f"Invalid datetime {raw!r}")
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
 
 
 class HealthView(APIView):
-    """Lightweight readiness probe."""
+    """Lightweight readiness probe.
+
+    Also reports each upstream dependency's circuit breaker; an open circuit
+    marks the service ``degraded`` but never fails the probe itself.
+    """
 
     authentication_classes: list = []
     permission_classes: list = []
 
     def get(self, request):  # noqa: D401 - APIView signature
-        return Response({"status": "ok"}, status=status.HTTP_200_OK)
+        dependencies = breaker_states()
+        degraded = any(item["state"] == OPEN for item in dependencies.values())
+        return Response(
+            {"status": "degraded" if degraded else "ok", "dependencies": dependencies},
+            status=status.HTTP_200_OK,
+        )
+
+
+def metrics(request):
+    """Prometheus scrape endpoint: request, database, upstream and Ollama token metrics."""
+
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
+
+
+class ConnectorListView(APIView):
+    """Registered sensor connectors with the ingestion worker's latest poll metrics."""
+
+    def get(self, request):
+        return Response({"connectors": connector_stats()})
 
 
 class DeviceListView(APIView):
-    """List configured sensors."""
+    """List configured sensors with their latest value per metric.
+
+    ``?include=readings&limit=N`` adds the N most recent readings per device.
+    """
 
     def get(self, request):  # noqa: D401 - APIView signature
-        devices = SensorDevice.objects.all()
-        serializer = SensorDeviceSerializer(devices, many=True)
-        return Response(serializer.data)
+        devices = SensorDevice.objects.prefetch_related("latest_readings")
+        include = {item.strip() for item in request.query_params.get("include", "").split(",")}
+        if "readings" not in include:
+            return Response(SensorDeviceListSerializer(devices, many=True).data)
+
+        try:
+            limit = int(request.query_params.get("limit", DEVICE_READINGS_DEFAULT_LIMIT))
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, DEVICE_READINGS_MAX_LIMIT))
+        devices = devices.prefetch_related(
+            Prefetch(
+                "readings",
+                queryset=SensorReading.objects.order_by("-timestamp")[:limit],
+                to_attr="recent_readings",
+            )
+        )
+        return Response(SensorDeviceWithRecentReadingsSerializer(devices, many=True).data)
+
+
+class DeviceSeriesView(APIView):
+    """Downsampled history for one device metric, aggregated in the database."""
+
+    def get(self, request, slug):  # noqa: D401 - APIView signature
+        device = get_object_or_404(SensorDevice, slug=slug)
+        metric = request.query_params.get("metric")
+        if not metric:
+            return Response({"error": "The metric parameter is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        now = timezone.now()
+        try:
+            end = _parse_query_datetime(request.query_params.get("to"), now)
+            start = _parse_query_datetime(request.query_params.get("from"), end - dt.timedelta(hours=24))
+            bucket_seconds = parse_bucket(request.query_params.get("bucket", "1h"))
+            aggregates = parse_aggregates(request.query_params.get("agg", "avg"))
+            fill = parse_fill(request.query_params.get("fill", "none"))
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if start >= end:
+            return Response({"error": "from must be earlier than to"}, status=status.HTTP_400_BAD_REQUEST)
+        buckets = (end - start).total_seconds() / bucket_seconds
+        if buckets > settings.SERIES_MAX_POINTS:
+            return Response(
+                {"error": f"Requested {int(buckets)} buckets; widen the bucket or narrow the range (max {settings.SERIES_MAX_POINTS})"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        plan = plan_sources(start, end, bucket_seconds, raw_retention_horizon(now))
+        points = query_plan(device, metric, plan, bucket_seconds=bucket_seconds, aggregates=aggregates)
+        if fill != "none":
+            points = fill_series(
+                points,
+                start=start,
+                end=end,
+                bucket_seconds=bucket_seconds,
+                aggregates=aggregates,
+                fill=fill,
+                anchors=series_anchors(device, metric, start, end),
+            )
+        return Response(
+            {
+                "device": device.slug,
+                "metric": metric,
+                "from": start.isoformat(),
+                "to": end.isoformat(),
+                "bucket_seconds": bucket_seconds,
+                "aggregates": aggregates,
+                "source": "+".join(source for source, _, _ in plan),
+                "fill": fill,
+                "points": points,
+            }
+        )
+
+
+class BulkReadingIngestView(APIView):
+    """Accept many readings (JSON array or NDJSON) and upsert them in batches."""
+
+    def post(self, request):  # noqa: D401 - APIView signature
+        readings = request.data
+        if isinstance(readings, dict):
+            readings = readings.get("readings")
+        if not isinstance(readings, list):
+            return Response(
+                {"error": "Expected a JSON array of readings or a {\"readings\": [...]} object"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        result = bulk_ingest_readings(readings)
+        if result["written"]:
+            response_status = status.HTTP_201_CREATED
+        elif result["errors"]:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_200_OK
+        return Response(result, status=response_status)
 
 
 class OllamaModelListView(APIView):
@@ -102,158 +305,210 @@ class OllamaModelListView(APIView):
 
 
 class SummaryView(APIView):
-    """Aggregate radon, weather, and AI insights."""
-
-    def get(self, request):  # noqa: D401 - APIView signature
-        metadata: Dict[str, Any] = {}
+    """Aggregate radon, weather, and AI insights.
 
-        radon_payload: Optional[Dict[str, Any]] = None
-        environment_payload: Optional[Dict[str, Any]] = None
-        weather_payload: Optional[Dict[str, Any]] = None
-        recommendations_payload: List[Dict[str, Any]] = []
+    Sensor values are read from the database; the ``ingest_readings`` worker keeps
+    them current so this view never waits on the Allthings Wave API. Composed
+    responses are cached per device/location/model until a newer reading lands
+    and carry ``ETag``/``Last-Modified`` for conditional requests. Home Assistant
+    is updated from the ingestion path by ``HomeAssistantPublisher``, not here.
+    """
 
+    def get(self, request):  # noqa: D401 - APIView signature
         device_slug = request.query_params.get("device_id")
-        device_obj: Optional[SensorDevice] = None
-
-        if settings.ALLTHINGS_WAVE_API_KEY:
-            try:
-                wave_client = AllthingsWaveClient(
-                    settings.ALLTHINGS_WAVE_BASE_URL,
-                    settings.ALLTHINGS_WAVE_API_KEY,
-                )
-                devices = wave_client.list_devices()
-                metadata["devices"] = devices
-                if not device_slug and devices:
-                    device_slug = devices[0].get("id")
-
-                if device_slug:
-                    device_payload = next((d for d in devices if d.get("id") == device_slug), None)
-                    if device_payload:
-                        device_obj = _ensure_device_record(device_payload)
-                        radon_payload = wave_client.latest_radon_readings(device_slug)
-                        radon_value = radon_payload.get("value") or radon_payload.get("pCiL")
-                        if radon_value is not None:
-                            _record_reading(
-                                device=device_obj,
-                                metric="radon",
-                                value=float(radon_value),
-                                unit=radon_payload.get("unit", "pCi/L"),
-                                timestamp=radon_payload.get("timestamp"),
-                                payload=radon_payload,
-                            )
-                        environment_payload = wave_client.latest_environmental_snapshot(device_slug)
-                        if environment_payload:
-                            temp = environment_payload.get("temperature")
-                            humidity = environment_payload.get("humidity")
-                            ts = environment_payload.get("timestamp")
-                            if temp is not None:
-                                _record_reading(
-                                    device=device_obj,
-                                    metric="temperature",
-                                    value=float(temp),
-                                    unit=environment_payload.get("temperature_unit", "°C"),
-                                    timestamp=ts,
-                                    payload=environment_payload,
-                                )
-                            if humidity is not None:
-                                _record_reading(
-                                    device=device_obj,
-                                    metric="humidity",
-                                    value=float(humidity),
-                                    unit=environment_payload.get("humidity_unit", "%"),
-                                    timestamp=ts,
-                                    payload=environment_payload,
-                                )
-                    else:
-                        metadata["warning"] = f"Device {device_slug} not found in Allthings Wave account"
-            except Exception as exc:  # pragma: no cover - defensive log
-                metadata["error"] = f"Allthings Wave sync failed: {exc}"
-        else:
-            metadata["warning"] = "Allthings Wave integration is not configured"
-
-        weather_api_key = settings.WEATHER_API_KEY
-        if weather_api_key:
-            latitude = request.query_params.get("lat") or os.environ.get("WEATHER_LAT")
-            longitude = request.query_params.get("lon") or os.environ.get("WEATHER_LON")
-            city = request.query_params.get("city") or os.environ.get("WEATHER_CITY")
-            try:
-                weather_client = WeatherClient(settings.WEATHER_API_BASE_URL, weather_api_key)
-                if latitude and longitude:
-                    weather_payload = weather_client.current_by_coordinates(float(latitude), float(longitude))
-                elif city:
-                    weather_payload = weather_client.current_by_city(city)
-            except Exception as exc:  # pragma: no cover
-                metadata["weather_error"] = str(exc)
-
-        radon_data = (
-            {
-                "value": radon_payload.get("value") or radon_payload.get("pCiL"),
-                "unit": radon_payload.get("unit", "pCi/L"),
-                "timestamp": str(radon_payload.get("timestamp")),
-            }
-            if radon_payload
-            else None
-        )
-        environment_data = (
-            {
-                "temperature": environment_payload.get("temperature"),
-                "humidity": environment_payload.get("humidity"),
-                "timestamp": str(environment_payload.get("timestamp")),
-            }
-            if environment_payload
-            else None
+        devices = SensorDevice.objects.all()
+        device_obj = devices.filter(slug=device_slug).first() if device_slug else devices.first()
+        latest: Dict[str, LatestReading] = (
+            {reading.metric: reading for reading in device_obj.latest_readings.all()} if device_obj else {}
         )
-
-        if settings.OLLAMA_BASE_URL and settings.DEFAULT_OLLAMA_MODEL and (radon_data or environment_data):
+        timestamps = [latest[metric].timestamp for metric in SUMMARY_METRICS if metric in latest]
+        last_updated = max(timestamps) if timestamps else None
+
+        # A newer reading changes last_updated and therefore the cache key and ETag.
+        cache_key, etag = _summary_validators(request, device_obj, last_updated)
+        data = cache.get(cache_key)
+        if data is not None and _job_moved_on(data):
+            # The queued generation has progressed; compose again so the summary picks up its insight.
+            data = None
+        job = data["metadata"].get("recommendation_job") if data is not None else None
+        # Last-Modified cannot tell a pending job from a finished one, so only the ETag validates those.
+        if _not_modified(request, _summary_etag(etag, job), None if job else last_updated):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            return _with_validators(response, _summary_etag(etag, job), last_updated)
+
+        if data is None:
+            data = self._compose(request, device_slug, device_obj, latest)
+            if not any(key in data["metadata"] for key in UNCACHEABLE_METADATA):
+                cache.set(cache_key, data, settings.SUMMARY_CACHE_TTL_SECONDS)
+        etag = _summary_etag(etag, data["metadata"].get("recommendation_job"))
+
+        metadata = dict(data["metadata"])
+        if device_obj is not None and last_updated is not None:
+            age = (timezone.now() - last_updated).total_seconds()
+            interval = device_obj.poll_interval_seconds or settings.INGEST_POLL_INTERVAL_SECONDS
+            metadata["last_updated"] = last_updated.isoformat()
+            metadata["data_age_seconds"] = int(age)
+            metadata["stale"] = age > 2 * interval
+        response = Response({**data, "metadata": metadata}, status=status.HTTP_200_OK)
+        return _with_validators(response, etag, last_updated)
+
+    def _compose(
+        self,
+        request,
+        device_slug: Optional[str],
+        device_obj: Optional[SensorDevice],
+        latest: Dict[str, LatestReading],
+    ) -> Dict[str, Any]:
+        metadata: Dict[str, Any] = {}
+        recommendations_payload: List[Recommendation] = []
+
+        if device_obj is None:
+            if device_slug:
+                metadata["warning"] = f"Device {device_slug} has no ingested data"
+            elif settings.ALLTHINGS_WAVE_API_KEY:
+                metadata["warning"] = "No sensor data ingested yet; run `python manage.py ingest_readings`"
+            else:
+                metadata["warning"] = "Allthings Wave integration is not configured"
+        elif not any(metric in latest for metric in SUMMARY_METRICS):
+            metadata["warning"] = f"Device {device_obj.slug} has no readings yet"
+
+        radon_data, environment_data = _sensor_snapshot(latest)
+
+        # Upstream legs run concurrently; whatever misses the budget is reported under metadata["late"].
+        fanout = FanOut(settings.SUMMARY_BUDGET_SECONDS)
+
+        # Fresh (or stale-while-revalidating) conditions come from the weather cache;
+        # only a miss costs a provider call, which then runs as a fan-out leg.
+        weather_cache: Optional[WeatherCache] = None
+        weather_location: Optional[WeatherLocation] = None
+        cached_weather: Optional[Dict[str, Any]] = None
+        weather_future = None
+        if settings.WEATHER_API_KEY:
             try:
-                ollama_client = OllamaClient(settings.OLLAMA_BASE_URL, settings.DEFAULT_OLLAMA_MODEL)
-                recommender = RecommendationEngine(ollama_client)
-                generated = recommender.generate(
-                    radon=radon_data,
-                    environment=environment_data,
-                    weather=weather_payload,
-                    model=request.query_params.get("model"),
+                weather_location = WeatherLocation.from_params(
+                    request.query_params.get("lat") or os.environ.get("WEATHER_LAT"),
+                    request.query_params.get("lon") or os.environ.get("WEATHER_LON"),
+                    request.query_params.get("city") or os.environ.get("WEATHER_CITY"),
                 )
-                saved: List[Recommendation] = []
-                for item in generated:
-                    saved.append(
-                        Recommendation.objects.create(
-                            device=device_obj,
-                            category=item.get("category", "general"),
-                            message=item.get("message", ""),
-                            confidence=item.get("confidence"),
-                            context=item.get("context", {}),
+                if weather_location is not None:
+                    weather_cache = WeatherCache(
+                        WeatherClient(
+                            settings.WEATHER_API_BASE_URL,
+                            settings.WEATHER_API_KEY,
+                            timeout=settings.WEATHER_TIMEOUT_SECONDS,
                         )
                     )
-                recommendations_payload = RecommendationSerializer(saved, many=True).data
-            except Exception as exc:  # pragma: no cover
-                metadata["ollama_error"] = str(exc)
+                    cached_weather, needs_fetch = weather_cache.lookup(weather_location)
+                    if needs_fetch:
+                        weather_future = fanout.submit(
+                            "weather",
+                            weather_cache.fetch,
+                            weather_location,
+                            deadline=settings.WEATHER_TIMEOUT_SECONDS,
+                        )
+            except Exception as exc:
+                metadata["weather_error"] = str(exc)
 
+        recommender: Optional[RecommendationEngine] = None
+        cached_insight: Optional[Dict[str, Any]] = None
+        insight_inputs: Dict[str, Any] = {}
+        if radon_data or environment_data:
+            recommender = build_recommendation_engine()
+        if recommender is not None:
+            weather = cached_weather
+            if weather_future is not None:
+                try:
+                    # Never wait past the summary budget for the fetch; recorded conditions stand in.
+                    weather = weather_future.result(timeout=fanout.remaining(settings.WEATHER_TIMEOUT_SECONDS))
+                except (FutureTimeout, WeatherBudgetExceeded):
+                    weather = weather_cache.latest_observation(weather_location)
+                except Exception:
+                    weather = None
+            history = weather_history(weather_location, settings.RECOMMENDATION_WINDOW_HOURS) if weather_location else None
+            if weather and history:
+                # Recorded observations give the LLM the outdoor trend without extra provider calls.
+                weather = {**weather, "history": history}
+            insight_inputs = {
+                "radon": radon_data,
+                "environment": environment_data,
+                "weather": weather,
+                "model": request.query_params.get("model"),
+            }
+            # The cache lives in the database, so look it up here rather than in a pool thread.
+            cached_insight = recommender.cached_insight(**insight_inputs)
+            if cached_insight is None and settings.SUMMARY_LLM_MODE == "job" and recommender.ollama.breaker.state() == OPEN:
+                # Don't queue work the worker would fail immediately.
+                metadata["ollama_error"] = "Ollama is unavailable (circuit open)"
+            elif cached_insight is None and settings.SUMMARY_LLM_MODE == "job":
+                # Generation happens in the run_recommendation_jobs worker; the UI streams it.
+                job = enqueue_recommendation_job(
+                    device=device_obj,
+                    inputs={"radon": radon_data, "environment": environment_data, "weather": weather},
+                    model=insight_inputs["model"],
+                )
+                metadata["recommendation_job"] = RecommendationJobSerializer(job).data
+            elif cached_insight is None:
+                # The HTTP call gives up when the budget does, so a late generation frees its thread.
+                fanout.submit(
+                    "ollama",
+                    recommender.request_insight,
+                    deadline=settings.OLLAMA_TIMEOUT_SECONDS,
+                    pool="llm",
+                    timeout=fanout.remaining(settings.OLLAMA_TIMEOUT_SECONDS),
+                    **insight_inputs,
+                )
 
-        if settings.HOME_ASSISTANT_TOKEN and device_obj:
-            try:
-                ha_client = HomeAssistantClient(settings.HOME_ASSISTANT_BASE_URL, settings.HOME_ASSISTANT_TOKEN)
-                if radon_data and radon_data.get('value') is not None:
-                    ha_client.publish_sensor_state(
-                        f"sensor.radon_{device_obj.slug}",
-                        radon_data['value'],
-                        {
-                            "unit_of_measurement": radon_data.get('unit', 'pCi/L'),
-                            "friendly_name": f"{device_obj.name} Radon",
-                        },
-                    )
-                if environment_data and environment_data.get('temperature') is not None:
-                    ha_client.publish_sensor_state(
-                        f"sensor.temperature_{device_obj.slug}",
-                        environment_data['temperature'],
-                        {
-                            "unit_of_measurement": '°C',
-                            "humidity": environment_data.get('humidity'),
-                            "friendly_name": f"{device_obj.name} Temperature",
-                        },
+        results, late, failed = fanout.collect()
+        weather_payload = results.get("weather")
+        if weather_payload is not None:
+            weather_cache.store(weather_location, weather_payload)
+        elif "weather" in late:
+            # The fetch outlived the summary budget; serve what was recorded.
+            weather_payload = weather_cache.latest_observation(weather_location)
+        elif "weather" in failed and isinstance(weather_future.exception(), WeatherBudgetExceeded):
+            # The budget ran out between lookup and fetch (e.g. to a concurrent refresh); serve what was recorded.
+            weather_payload = weather_cache.latest_observation(weather_location)
+            if weather_payload is not None:
+                del failed["weather"]
+        else:
+            weather_payload = cached_weather
+        if late:
+            metadata["late"] = late
+        for leg, error in failed.items():
+            if leg == "weather":
+                metadata["weather_error"] = error
+            elif leg == "ollama":
+                metadata["ollama_error"] = error
+
+        if recommender is not None:
+            # Only readings added since the last refresh are read; the window's statistics are updated in place.
+            tracker = get_trend_tracker()
+            tracker.refresh()
+            # The LLM may have missed the budget or failed; the heuristic suggestions are always returned.
+            generated = recommender.generate(
+                radon=radon_data,
+                environment=environment_data,
+                weather=weather_payload,
+                use_llm=False,
+                trends=tracker.device_stats(device_obj.pk),
+            )
+            response = cached_insight or results.get("ollama")
+            if cached_insight is None and response:
+                recommender.store_insight(response, **insight_inputs)
+            insight = recommender.build_insight(response, cached=cached_insight is not None)
+            if insight:
+                generated.append(insight)
+            for item in generated:
+                recommendations_payload.append(
+                    Recommendation.objects.create(
+                        device=device_obj,
+                        category=item.get("category", "general"),
+                        message=item.get("message", ""),
+                        confidence=item.get("confidence"),
+                        context=item.get("context", {}),
                     )
-            except Exception as exc:  # pragma: no cover
-                metadata.setdefault('home_assistant_errors', []).append(str(exc))
+                )
+            publish_recommendations(recommendations_payload)
 
         payload = {
             "radon": radon_data,
@@ -262,14 +517,222 @@ class SummaryView(APIView):
             "recommendations": recommendations_payload,
             "metadata": metadata,
         }
-        serializer = InsightSerializer(payload)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return InsightSerializer(payload).data
+
+
+def _parse_confidence(raw: Optional[str], name: str) -> Optional[float]:
+    if not raw:
+        return None
+    try:
+        return float(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be a number") from None
 
 
 class RecommendationHistoryView(APIView):
-    """Return historical AI suggestions."""
+    """Return historical AI suggestions, newest first, a keyset page at a time.
+
+    Filters: ``device`` (slug), ``category`` (comma list), ``min_confidence``/
+    ``max_confidence`` and a ``from``/``to`` window on ``created_at``.
+    """
 
     def get(self, request):
-        qs = Recommendation.objects.all().order_by("-created_at")[:50]
-        serializer = RecommendationSerializer(qs, many=True)
-        return Response(serializer.data)
+        params = request.query_params
+        try:
+            start = _parse_query_datetime(params.get("from"), None)
+            end = _parse_query_datetime(params.get("to"), None)
+            min_confidence = _parse_confidence(params.get("min_confidence"), "min_confidence")
+            max_confidence = _parse_confidence(params.get("max_confidence"), "max_confidence")
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        qs = Recommendation.objects.select_related("device")
+        if params.get("device"):
+            qs = qs.filter(device=get_object_or_404(SensorDevice, slug=params["device"]))
+        categories = [category.strip() for category in params.get("category", "").split(",") if category.strip()]
+        if categories:
+            qs = qs.filter(category__in=categories)
+        if min_confidence is not None:
+            qs = qs.filter(confidence__gte=min_confidence)
+        if max_confidence is not None:
+            qs = qs.filter(confidence__lte=max_confidence)
+        if start is not None:
+            qs = qs.filter(created_at__gte=start)
+        if end is not None:
+            qs = qs.filter(created_at__lt=end)
+
+        paginator = RecommendationKeysetPagination()
+        page = paginator.paginate_queryset(qs, request, view=self)
+        return paginator.get_paginated_response(RecommendationSerializer(page, many=True).data)
+
+
+class RecommendationJobListView(APIView):
+    """Queue an LLM recommendation for a device; poll or stream the returned job."""
+
+    def post(self, request):  # noqa: D401 - APIView signature
+        data = request.data
+        device_slug = data.get("device_id")
+        device = get_object_or_404(SensorDevice, slug=device_slug) if device_slug else SensorDevice.objects.first()
+        if device is None:
+            return Response({"error": "No devices have been ingested yet"}, status=status.HTTP_400_BAD_REQUEST)
+        if not (settings.OLLAMA_BASE_URL and settings.DEFAULT_OLLAMA_MODEL):
+            return Response({"error": "Ollama integration is not configured"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        radon_data, environment_data = _sensor_snapshot({reading.metric: reading for reading in device.latest_readings.all()})
+        if not (radon_data or environment_data):
+            return Response({"error": f"Device {device.slug} has no readings yet"}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = enqueue_recommendation_job(
+            device=device,
+            inputs={"radon": radon_data, "environment": environment_data},
+            model=data.get("model"),
+            location={
+                "lat": data.get("lat") or os.environ.get("WEATHER_LAT"),
+                "lon": data.get("lon") or os.environ.get("WEATHER_LON"),
+                "city": data.get("city") or os.environ.get("WEATHER_CITY"),
+            },
+        )
+        return Response(RecommendationJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class RecommendationJobDetailView(APIView):
+    """Current status and (partial) output of a recommendation job."""
+
+    def get(self, request, pk):  # noqa: D401 - APIView signature
+        job = get_object_or_404(RecommendationJob.objects.select_related("device"), pk=pk)
+        return Response(RecommendationJobSerializer(job).data)
+
+
+def _sse(event: str, data: Dict[str, Any], event_id: Optional[Any] = None) -> str:
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _parse_stream_position(last_event_id: Optional[str]) -> Tuple[int, int]:
+    """``(attempt, offset)`` from a job stream ``Last-Event-ID``; a bare offset means the first attempt."""
+
+    attempt, _, offset = (last_event_id or "").rpartition(":")
+    try:
+        return max(0, int(attempt or 0)), max(0, int(offset or 0))
+    except ValueError:
+        return 0, 0
+
+
+async def recommendation_job_stream(request, pk):
+    """Relay a job's output as Server-Sent Events while the worker writes it.
+
+    ``token`` events carry new text; their ``id`` is ``<attempt>:<offset>``, so a
+    reconnecting ``EventSource`` resumes via ``Last-Event-ID``. When a stale job
+    was requeued since (``attempt`` changed), a ``reset`` event tells the client
+    to discard its text before the new attempt's output is relayed from the
+    start. A final ``done`` event carries the job. Served from an async view so,
+    under ASGI, waiting clients do not occupy a request worker.
+    """
+
+    jobs = RecommendationJob.objects.select_related("device")
+    job = await jobs.filter(pk=pk).afirst()
+    if job is None:
+        raise Http404("Recommendation job not found")
+    attempt, offset = _parse_stream_position(request.headers.get("Last-Event-ID"))
+
+    async def events():
+        current, seen_attempt, sent = job, attempt, offset
+        started = last_event = time.monotonic()
+        while True:
+            if current.attempt != seen_attempt:
+                seen_attempt, sent = current.attempt, 0
+                yield _sse("reset", {"attempt": seen_attempt}, event_id=f"{seen_attempt}:0")
+            if len(current.output) > sent:
+                delta, sent = current.output[sent:], len(current.output)
+                last_event = time.monotonic()
+                yield _sse("token", {"text": delta}, event_id=f"{seen_attempt}:{sent}")
+            if current.finished:
+                yield _sse("done", RecommendationJobSerializer(current).data)
+                return
+            if time.monotonic() - started > settings.RECOMMENDATION_STREAM_MAX_SECONDS:
+                yield _sse("timeout", {"id": current.pk, "status": current.status})
+                return
+            if time.monotonic() - last_event > settings.RECOMMENDATION_STREAM_HEARTBEAT_SECONDS:
+                last_event = time.monotonic()
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(settings.RECOMMENDATION_STREAM_POLL_SECONDS)
+            current = await jobs.aget(pk=pk)
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+async def live_events(request):
+    """Push new readings and recommendations to the dashboard as Server-Sent Events.
+
+    ``?device=<slug>`` and ``?types=reading,recommendation`` narrow the feed.
+    Event ids come from the live event layer, so a reconnecting ``EventSource``
+    replays what it missed via ``Last-Event-ID`` (within the retained backlog).
+    The stream ends after ``LIVE_STREAM_MAX_SECONDS``; browsers reconnect on their own.
+    """
+
+    device = request.GET.get("device") or None
+    types = {item.strip() for item in request.GET.get("types", "").split(",") if item.strip()}
+    last_id = request.headers.get("Last-Event-ID") or None
+    layer = get_event_layer()
+
+    async def events():
+        started = time.monotonic()
+        subscription = layer.subscribe(last_id, idle=settings.LIVE_STREAM_HEARTBEAT_SECONDS)
+        try:
+            async for event in subscription:
+                if time.monotonic() - started > settings.LIVE_STREAM_MAX_SECONDS:
+                    return
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                if types and event.type not in types:
+                    continue
+                if device and event.data.get("device") != device:
+                    continue
+                yield _sse(event.type, event.data, event_id=event.id)
+        finally:
+            await subscription.aclose()
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+async def export_readings(request):
+    """Stream raw readings as CSV, NDJSON or Parquet for offline analysis.
+
+    ``?device=<slug>``, ``?metric=``, ``?from=``/``?to=`` (ISO 8601) narrow the
+    export; without them every stored reading is exported. Rows are read with a
+    server-side cursor and encoded chunk by chunk, so memory stays flat however
+    long the range is. Served from an async view because Django buffers a sync
+    iterator completely before streaming it under ASGI.
+    """
+
+    params = request.GET
+    try:
+        end = _parse_query_datetime(params.get("to"), None)
+        start = _parse_query_datetime(params.get("from"), None)
+        encoder = encoder_for(params.get("format", "csv"))
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    except ImproperlyConfigured as exc:
+        return JsonResponse({"error": str(exc)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+    if start is not None and end is not None and start >= end:
+        return JsonResponse({"error": "from must be earlier than to"}, status=status.HTTP_400_BAD_REQUEST)
+
+    device = None
+    if params.get("device"):
+        device = await SensorDevice.objects.filter(slug=params["device"]).afirst()
+        if device is None:
+            raise Http404("Device not found")
+
+    readings = export_queryset(device=device, metric=params.get("metric") or None, start=start, end=end)
+    response = StreamingHttpResponse(aexport_chunks(readings, encoder), content_type=encoder.content_type)
+    filename = f"readings-{device.slug if device else 'all'}.{encoder.extension}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response["X-Accel-Buffering"] = "no"
+    return response
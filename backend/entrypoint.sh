@@ -4,9 +4,12 @@
 # USAGE: ./entrypoint.sh [command...]
 # PARAMETERS:
 #   command: optional command to exec (defaults to CMD from the image)
-# EXAMPLE: ./entrypoint.sh gunicorn home_monitor.wsgi:application
+#   RUN_MIGRATIONS: set to "false" to skip migrate/collectstatic (worker containers; the backend service migrates)
+# EXAMPLE: ./entrypoint.sh gunicorn home_monitor.asgi:application -k uvicorn.workers.UvicornWorker
 set -euo pipefail
 
-python manage.py migrate --noinput
-python manage.py collectstatic --noinput || true
+if [ "${RUN_MIGRATIONS:-true}" != "false" ]; then
+    python manage.py migrate --noinput
+    python manage.py collectstatic --noinput || true
+fi
 exec "$@"
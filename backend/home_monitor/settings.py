@@ -3,13 +3,25 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
+from typing import Any, Callable, Dict
 
+from corsheaders.defaults import default_headers as default_cors_headers
 from dotenv import load_dotenv
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 load_dotenv(BASE_DIR / ".env")
 load_dotenv(BASE_DIR.parent / ".env")
 
+
+def _env_mapping(name: str, default: str, cast: Callable[[str], Any] = float) -> Dict[str, Any]:
+    """Parse a ``"key=value,key=value"`` environment variable, casting each value."""
+
+    return {
+        key.strip(): cast(value)
+        for key, _, value in (item.partition("=") for item in os.environ.get(name, default).split(",") if item.strip())
+    }
+
+
 SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY", "changeme-in-production")
 DEBUG = os.environ.get("DJANGO_DEBUG", "False").lower() == "true"
 
@@ -28,6 +40,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "apps.monitoring.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -79,6 +92,29 @@ else:
         }
     }
 
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "locmem").lower()
+if CACHE_BACKEND == "redis":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ.get("REDIS_URL", "redis://redis:6379/0"),
+        }
+    }
+elif CACHE_BACKEND == "file":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ.get("CACHE_LOCATION", str(BASE_DIR / "cache")),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "home-monitor",
+        }
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -108,10 +144,11 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "apps.monitoring.renderers.ORJSONRenderer",
     ],
     "DEFAULT_PARSER_CLASSES": [
         "rest_framework.parsers.JSONParser",
+        "apps.monitoring.parsers.NDJSONParser",
     ],
 }
 
@@ -121,6 +158,8 @@ CORS_ALLOWED_ORIGINS = [
     if origin.strip()
 ]
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = [*default_cors_headers, "if-none-match", "if-modified-since"]
+CORS_EXPOSE_HEADERS = ["ETag", "Last-Modified"]
 
 CSRF_TRUSTED_ORIGINS = [
     origin.strip()
@@ -139,5 +178,118 @@ ALLTHINGS_WAVE_API_KEY = os.environ.get("ALLTHINGS_WAVE_API_KEY", "")
 
 HOME_ASSISTANT_BASE_URL = os.environ.get("HOME_ASSISTANT_BASE_URL", "http://homeassistant:8123")
 HOME_ASSISTANT_TOKEN = os.environ.get("HOME_ASSISTANT_TOKEN", "")
+# Publisher: minimum change per metric ("metric=delta,..."), forced republish age, parallel POSTs, flush cadence.
+HOME_ASSISTANT_DEADBANDS = _env_mapping("HOME_ASSISTANT_DEADBANDS", "radon=0.1,temperature=0.2,humidity=1")
+HOME_ASSISTANT_REPUBLISH_SECONDS = float(os.environ.get("HOME_ASSISTANT_REPUBLISH_SECONDS", "3600"))
+HOME_ASSISTANT_PUBLISH_CONCURRENCY = int(os.environ.get("HOME_ASSISTANT_PUBLISH_CONCURRENCY", "4"))
+HOME_ASSISTANT_FLUSH_SECONDS = float(os.environ.get("HOME_ASSISTANT_FLUSH_SECONDS", "5"))
 
 RECOMMENDATION_WINDOW_HOURS = int(os.environ.get("RECOMMENDATION_WINDOW_HOURS", "6"))
+# Trend analytics over RECOMMENDATION_WINDOW_HOURS (services/trends.py): per-metric thresholds (`metric=value,…`,
+# which also selects the tracked metrics), EWMA half-life, rate-of-change horizon, and how long a threshold must
+# be exceeded (or how few points a series may have) before trend heuristics fire.
+TREND_THRESHOLDS = _env_mapping("TREND_THRESHOLDS", "radon=4.0,humidity=60,temperature=27")
+TREND_EWMA_HALFLIFE_MINUTES = float(os.environ.get("TREND_EWMA_HALFLIFE_MINUTES", "30"))
+TREND_RATE_HORIZON_MINUTES = float(os.environ.get("TREND_RATE_HORIZON_MINUTES", "60"))
+TREND_SUSTAINED_MINUTES = float(os.environ.get("TREND_SUSTAINED_MINUTES", "60"))
+TREND_MIN_POINTS = int(os.environ.get("TREND_MIN_POINTS", "4"))
+# Seconds of already-read writes each trend refresh reads again, covering transactions that commit late.
+TREND_REFRESH_OVERLAP_SECONDS = float(os.environ.get("TREND_REFRESH_OVERLAP_SECONDS", "120"))
+# Memoized Ollama responses, keyed by a fingerprint of the rounded inputs and model.
+RECOMMENDATION_CACHE_TTL_SECONDS = int(os.environ.get("RECOMMENDATION_CACHE_TTL_SECONDS", "21600"))
+RECOMMENDATION_CACHE_MAX_ENTRIES = int(os.environ.get("RECOMMENDATION_CACHE_MAX_ENTRIES", "500"))
+# "job" queues LLM generation for the run_recommendation_jobs worker; "inline" calls Ollama within the summary budget.
+SUMMARY_LLM_MODE = os.environ.get("SUMMARY_LLM_MODE", "job")
+RECOMMENDATION_JOB_POLL_SECONDS = float(os.environ.get("RECOMMENDATION_JOB_POLL_SECONDS", "1"))
+RECOMMENDATION_JOB_FLUSH_SECONDS = float(os.environ.get("RECOMMENDATION_JOB_FLUSH_SECONDS", "0.5"))
+RECOMMENDATION_JOB_STALE_SECONDS = float(os.environ.get("RECOMMENDATION_JOB_STALE_SECONDS", "300"))
+RECOMMENDATION_STREAM_POLL_SECONDS = float(os.environ.get("RECOMMENDATION_STREAM_POLL_SECONDS", "0.5"))
+RECOMMENDATION_STREAM_HEARTBEAT_SECONDS = float(os.environ.get("RECOMMENDATION_STREAM_HEARTBEAT_SECONDS", "15"))
+RECOMMENDATION_STREAM_MAX_SECONDS = float(os.environ.get("RECOMMENDATION_STREAM_MAX_SECONDS", "300"))
+
+# Live reading/recommendation events (GET /api/live/): "redis" shares them across processes, "memory" is per process.
+LIVE_EVENTS_BACKEND = os.environ.get("LIVE_EVENTS_BACKEND", "redis" if CACHE_BACKEND == "redis" else "memory").lower()
+LIVE_EVENTS_REDIS_URL = os.environ.get("REDIS_URL", "redis://redis:6379/0")
+LIVE_EVENTS_STREAM = os.environ.get("LIVE_EVENTS_STREAM", "home-monitor:live")
+LIVE_EVENTS_BACKLOG = int(os.environ.get("LIVE_EVENTS_BACKLOG", "1000"))
+LIVE_EVENTS_QUEUE_SIZE = int(os.environ.get("LIVE_EVENTS_QUEUE_SIZE", "100"))
+LIVE_STREAM_HEARTBEAT_SECONDS = float(os.environ.get("LIVE_STREAM_HEARTBEAT_SECONDS", "15"))
+LIVE_STREAM_MAX_SECONDS = float(os.environ.get("LIVE_STREAM_MAX_SECONDS", "300"))
+
+INGEST_POLL_INTERVAL_SECONDS = int(os.environ.get("INGEST_POLL_INTERVAL_SECONDS", "300"))
+INGEST_DISCOVERY_INTERVAL_SECONDS = int(os.environ.get("INGEST_DISCOVERY_INTERVAL_SECONDS", "900"))
+INGEST_POLL_CONCURRENCY = int(os.environ.get("INGEST_POLL_CONCURRENCY", "8"))
+# Connector registry (dotted paths; packages may add more via the "home_monitor.connectors" entry point group)
+# and per-connector request rate overrides ("slug=requests_per_second,...").
+SENSOR_CONNECTORS = [
+    path.strip()
+    for path in os.environ.get(
+        "SENSOR_CONNECTORS", "apps.monitoring.services.allthings_wave.AllthingsWaveClient"
+    ).split(",")
+    if path.strip()
+]
+CONNECTOR_RATE_LIMITS = _env_mapping("CONNECTOR_RATE_LIMITS", "")
+# Ingest-side compression: "off" only drops repeated readings; "deadband"/"swinging_door" also skip
+# readings within the per-metric deviation ("metric=delta,..."), storing one at least every MAX_GAP seconds.
+READING_COMPRESSION = os.environ.get("READING_COMPRESSION", "off").lower()
+READING_COMPRESSION_DEVIATIONS = _env_mapping("READING_COMPRESSION_DEVIATIONS", "radon=0.05,temperature=0.1,humidity=0.5")
+READING_COMPRESSION_MAX_GAP_SECONDS = float(os.environ.get("READING_COMPRESSION_MAX_GAP_SECONDS", "3600"))
+SERIES_MAX_POINTS = int(os.environ.get("SERIES_MAX_POINTS", "10000"))
+BULK_INGEST_BATCH_SIZE = int(os.environ.get("BULK_INGEST_BATCH_SIZE", "1000"))
+
+# Reading export (/api/export/readings/, export_readings): rows fetched per cursor round trip and rows per Parquet row group.
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", "5000"))
+EXPORT_PARQUET_ROW_GROUP_SIZE = int(os.environ.get("EXPORT_PARQUET_ROW_GROUP_SIZE", "100000"))
+
+# Push ingestion over MQTT (ingest_mqtt): broker, topic filters, and micro-batching/backpressure limits.
+MQTT_BROKER_URL = os.environ.get("MQTT_BROKER_URL", "")
+MQTT_TOPICS = [topic.strip() for topic in os.environ.get("MQTT_TOPICS", "home-monitor/#").split(",") if topic.strip()]
+MQTT_QOS = int(os.environ.get("MQTT_QOS", "1"))
+MQTT_CLIENT_ID = os.environ.get("MQTT_CLIENT_ID", "home-monitor-ingest")
+MQTT_KEEPALIVE_SECONDS = int(os.environ.get("MQTT_KEEPALIVE_SECONDS", "60"))
+MQTT_BATCH_SIZE = int(os.environ.get("MQTT_BATCH_SIZE", "500"))
+MQTT_BATCH_SECONDS = float(os.environ.get("MQTT_BATCH_SECONDS", "1"))
+MQTT_QUEUE_MAX = int(os.environ.get("MQTT_QUEUE_MAX", "10000"))
+MQTT_BATCH_MAX_ATTEMPTS = int(os.environ.get("MQTT_BATCH_MAX_ATTEMPTS", "5"))
+
+# Retention: raw rows older than READING_RAW_RETENTION_DAYS are deleted (rollups are kept);
+# raw payloads older than READING_PAYLOAD_RETENTION_DAYS are deduplicated or dropped. 0 disables.
+READING_RAW_RETENTION_DAYS = int(os.environ.get("READING_RAW_RETENTION_DAYS", "90"))
+READING_PAYLOAD_RETENTION_DAYS = int(os.environ.get("READING_PAYLOAD_RETENTION_DAYS", "7"))
+READING_PAYLOAD_POLICY = os.environ.get("READING_PAYLOAD_POLICY", "dedupe")
+RETENTION_CHUNK_SIZE = int(os.environ.get("RETENTION_CHUNK_SIZE", "5000"))
+RETENTION_CHUNK_PAUSE_SECONDS = float(os.environ.get("RETENTION_CHUNK_PAUSE_SECONDS", "0"))
+
+# Shared HTTP transport for provider clients (services/http.py).
+HTTP_POOL_CONNECTIONS = int(os.environ.get("HTTP_POOL_CONNECTIONS", "10"))
+HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", "10"))
+HTTP_KEEPALIVE_IDLE_SECONDS = int(os.environ.get("HTTP_KEEPALIVE_IDLE_SECONDS", "60"))
+HTTP_RETRY_TOTAL = int(os.environ.get("HTTP_RETRY_TOTAL", "3"))
+HTTP_RETRY_BACKOFF_FACTOR = float(os.environ.get("HTTP_RETRY_BACKOFF_FACTOR", "0.5"))
+HTTP_RETRY_BACKOFF_MAX_SECONDS = float(os.environ.get("HTTP_RETRY_BACKOFF_MAX_SECONDS", "10"))
+HTTP_RETRY_AFTER_MAX_SECONDS = float(os.environ.get("HTTP_RETRY_AFTER_MAX_SECONDS", "30"))
+
+# Weather cache: fresh TTL, stale-while-revalidate window, coordinate rounding, and per-key request budget.
+WEATHER_CACHE_TTL_SECONDS = float(os.environ.get("WEATHER_CACHE_TTL_SECONDS", "600"))
+WEATHER_CACHE_STALE_SECONDS = float(os.environ.get("WEATHER_CACHE_STALE_SECONDS", "3600"))
+WEATHER_COORD_PRECISION = int(os.environ.get("WEATHER_COORD_PRECISION", "2"))
+WEATHER_REQUEST_BUDGET = int(os.environ.get("WEATHER_REQUEST_BUDGET", "50"))
+WEATHER_BUDGET_WINDOW_SECONDS = float(os.environ.get("WEATHER_BUDGET_WINDOW_SECONDS", "60"))
+
+# Request instrumentation (/metrics): also report DB and upstream timings per request as a Server-Timing header.
+METRICS_SERVER_TIMING = os.environ.get("METRICS_SERVER_TIMING", "true").lower() == "true"
+
+# Circuit breakers per upstream dependency (services/breaker.py), shared via the cache.
+CIRCUIT_BREAKER_WINDOW_SECONDS = float(os.environ.get("CIRCUIT_BREAKER_WINDOW_SECONDS", "60"))
+CIRCUIT_BREAKER_MIN_CALLS = int(os.environ.get("CIRCUIT_BREAKER_MIN_CALLS", "5"))
+CIRCUIT_BREAKER_FAILURE_RATE = float(os.environ.get("CIRCUIT_BREAKER_FAILURE_RATE", "0.5"))
+CIRCUIT_BREAKER_COOLDOWN_SECONDS = float(os.environ.get("CIRCUIT_BREAKER_COOLDOWN_SECONDS", "30"))
+
+SUMMARY_BUDGET_SECONDS = float(os.environ.get("SUMMARY_BUDGET_SECONDS", "20"))
+SUMMARY_CACHE_TTL_SECONDS = int(os.environ.get("SUMMARY_CACHE_TTL_SECONDS", "300"))
+SUMMARY_FANOUT_WORKERS = int(os.environ.get("SUMMARY_FANOUT_WORKERS", "8"))
+# Separate pool for inline Ollama legs (SUMMARY_LLM_MODE=inline), so slow generations cannot starve the other legs.
+SUMMARY_LLM_WORKERS = int(os.environ.get("SUMMARY_LLM_WORKERS", "2"))
+WEATHER_TIMEOUT_SECONDS = float(os.environ.get("WEATHER_TIMEOUT_SECONDS", "5"))
+OLLAMA_TIMEOUT_SECONDS = float(os.environ.get("OLLAMA_TIMEOUT_SECONDS", "120"))
+HOME_ASSISTANT_TIMEOUT_SECONDS = float(os.environ.get("HOME_ASSISTANT_TIMEOUT_SECONDS", "5"))
@@ -2,7 +2,10 @@
 from django.contrib import admin
 from django.urls import include, path
 
+from apps.monitoring.views import metrics
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("apps.monitoring.urls")),
+    path("metrics", metrics, name="metrics"),
 ]
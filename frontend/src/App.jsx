@@ -2,6 +2,7 @@ import React from 'react';
 import Layout from './components/Layout.jsx';
 import MetricCard from './components/MetricCard.jsx';
 import RecommendationList from './components/RecommendationList.jsx';
+import RecommendationHistory from './components/RecommendationHistory.jsx';
 import WeatherCard from './components/WeatherCard.jsx';
 import EnvironmentCard from './components/EnvironmentCard.jsx';
 import DeviceSidebar from './components/DeviceSidebar.jsx';
@@ -13,6 +14,7 @@ export default function App() {
     loading,
     error,
     summary,
+    streamingInsight,
     devices,
     models,
     selectedDevice,
@@ -64,11 +66,6 @@ export default function App() {
       {summary?.metadata?.error && (
         <p style={{ color: '#ef4444', margin: 0 }}>{summary.metadata.error}</p>
       )}
-      {summary?.metadata?.home_assistant_errors && (
-        <p style={{ color: '#ef4444', margin: 0 }}>
-          Home Assistant sync issues: {summary.metadata.home_assistant_errors.join(', ')}
-        </p>
-      )}
     </div>
   );
 
@@ -100,7 +97,11 @@ export default function App() {
             <p style={{ color: '#ef4444' }}>AI engine issue: {summary.metadata.ollama_error}</p>
           )}
           <h3 style={{ marginBottom: '1rem' }}>AI Recommendations</h3>
-          <RecommendationList recommendations={summary.recommendations || []} />
+          <RecommendationList recommendations={summary.recommendations || []} streaming={streamingInsight} />
+        </section>
+        <section>
+          <h3 style={{ marginBottom: '1rem' }}>Recommendation History</h3>
+          <RecommendationHistory deviceSlug={selectedDevice?.slug} />
         </section>
       </>
     );
@@ -4,9 +4,17 @@ const client = axios.create({
   baseURL: import.meta.env.VITE_API_BASE_URL || '/api',
 });
 
-export async function fetchSummary(params = {}) {
-  const response = await client.get('/summary/', { params });
-  return response.data;
+export async function fetchSummary(params = {}, etag = null) {
+  const response = await client.get('/summary/', {
+    params,
+    headers: etag ? { 'If-None-Match': etag } : {},
+    validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+  });
+  return {
+    notModified: response.status === 304,
+    data: response.status === 304 ? null : response.data,
+    etag: response.headers.etag || null,
+  };
 }
 
 export async function fetchDevices() {
@@ -14,11 +22,23 @@ export async function fetchDevices() {
   return response.data;
 }
 
-export async function fetchRecommendations() {
-  const response = await client.get('/recommendations/');
+// Returns `{ results, next, previous }`. Pass filters (`device`, `category`, `min_confidence`,
+// `max_confidence`, `from`, `to`, `limit`) for the first page, then a `next`/`previous` URL.
+export async function fetchRecommendations(params = {}, pageUrl = null) {
+  const response = pageUrl ? await client.get(pageUrl) : await client.get('/recommendations/', { params });
   return response.data;
 }
 
+export function openRecommendationStream(jobId) {
+  const base = client.defaults.baseURL.replace(/\/$/, '');
+  return new EventSource(`${base}/recommendations/jobs/${jobId}/stream/`);
+}
+
+export function openLiveStream(deviceSlug) {
+  const base = client.defaults.baseURL.replace(/\/$/, '');
+  return new EventSource(`${base}/live/?device=${encodeURIComponent(deviceSlug)}`);
+}
+
 export async function fetchModels() {
   const response = await client.get('/ai/models/');
   return response.data;
@@ -0,0 +1,37 @@
+import React, { useEffect, useRef } from 'react';
+import RecommendationList from './RecommendationList.jsx';
+import { useRecommendationHistory } from '../hooks/useRecommendationHistory.js';
+
+export default function RecommendationHistory({ deviceSlug }) {
+  const { items, hasMore, loading, error, loadMore } = useRecommendationHistory(deviceSlug);
+  const sentinel = useRef(null);
+
+  // Fetch the next page as the end of the list scrolls into view.
+  useEffect(() => {
+    if (!sentinel.current || !hasMore) return undefined;
+    const observer = new IntersectionObserver(
+      (entries) => {
+        if (entries.some((entry) => entry.isIntersecting)) loadMore();
+      },
+      { rootMargin: '400px' },
+    );
+    observer.observe(sentinel.current);
+    return () => observer.disconnect();
+  }, [hasMore, loadMore]);
+
+  if (error && !items.length) {
+    return <p style={{ color: '#ef4444' }}>Failed to load history: {error.message}</p>;
+  }
+
+  return (
+    <>
+      {items.length ? (
+        <RecommendationList recommendations={items} />
+      ) : (
+        !loading && <p style={{ color: '#64748b' }}>No recommendations recorded for this device yet.</p>
+      )}
+      <div ref={sentinel} />
+      {loading && <p style={{ color: '#64748b' }}>Loading history…</p>}
+    </>
+  );
+}
@@ -1,12 +1,30 @@
 import React from 'react';
 
-export default function RecommendationList({ recommendations = [] }) {
-  if (!recommendations.length) {
+function StreamingInsight({ insight }) {
+  const finished = insight.status === 'succeeded' || insight.status === 'failed';
+  return (
+    <article className="recommendation">
+      <header style={{ display: 'flex', justifyContent: 'space-between', marginBottom: '0.75rem' }}>
+        <span style={{ fontWeight: 600 }}>AI insight</span>
+        {!finished && <span style={{ fontSize: '0.85rem', color: '#94a3b8' }}>Generating…</span>}
+      </header>
+      {insight.error ? (
+        <p style={{ margin: 0, color: '#ef4444' }}>{insight.error}</p>
+      ) : (
+        <p style={{ margin: 0, whiteSpace: 'pre-line' }}>{insight.text || 'Waiting for the model…'}</p>
+      )}
+    </article>
+  );
+}
+
+export default function RecommendationList({ recommendations = [], streaming = null }) {
+  if (!recommendations.length && !streaming) {
     return <p style={{ color: '#64748b' }}>No recommendations yet. Trigger a sync to fetch fresh insights.</p>;
   }
 
   return (
     <div className="recommendations">
+      {streaming && <StreamingInsight insight={streaming} />}
       {recommendations.map((rec) => (
         <article key={rec.id} className="recommendation">
           <header style={{ display: 'flex', justifyContent: 'space-between', marginBottom: '0.75rem' }}>
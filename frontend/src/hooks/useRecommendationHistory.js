@@ -0,0 +1,45 @@
+import { useCallback, useEffect, useRef, useState } from 'react';
+import { fetchRecommendations } from '../api/client';
+
+// Older recommendations for a device, one keyset page at a time; call `loadMore` to append the next page.
+export function useRecommendationHistory(deviceSlug) {
+  const [items, setItems] = useState([]);
+  const [next, setNext] = useState(null);
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState(null);
+  // Guards against stale responses after the device changes and duplicate loads while one is in flight.
+  const generation = useRef(0);
+  const inFlight = useRef(false);
+
+  const loadPage = useCallback(async (pageUrl, current) => {
+    inFlight.current = true;
+    setLoading(true);
+    try {
+      const page = await fetchRecommendations({ device: deviceSlug, limit: 25 }, pageUrl);
+      if (current !== generation.current) return;
+      setItems((existing) => (pageUrl ? [...existing, ...page.results] : page.results));
+      setNext(page.next);
+      setError(null);
+    } catch (err) {
+      if (current === generation.current) setError(err);
+    } finally {
+      if (current === generation.current) {
+        inFlight.current = false;
+        setLoading(false);
+      }
+    }
+  }, [deviceSlug]);
+
+  useEffect(() => {
+    generation.current += 1;
+    setItems([]);
+    setNext(null);
+    if (deviceSlug) loadPage(null, generation.current);
+  }, [deviceSlug, loadPage]);
+
+  const loadMore = useCallback(() => {
+    if (next && !inFlight.current) loadPage(next, generation.current);
+  }, [next, loadPage]);
+
+  return { items, hasMore: Boolean(next), loading, error, loadMore };
+}
@@ -1,5 +1,5 @@
-import { useEffect, useMemo, useState } from 'react';
-import { fetchDevices, fetchSummary, fetchModels } from '../api/client';
+import { useEffect, useMemo, useRef, useState } from 'react';
+import { fetchDevices, fetchSummary, fetchModels, openLiveStream, openRecommendationStream } from '../api/client';
 
 export function useSummary() {
   const [loading, setLoading] = useState(true);
@@ -10,6 +10,9 @@ export function useSummary() {
   const [models, setModels] = useState([]);
   const [selectedDevice, setSelectedDevice] = useState(null);
   const [selectedModel, setSelectedModel] = useState(null);
+  const [streamingInsight, setStreamingInsight] = useState(null);
+  // Last response per query, so refetches can be answered with 304 Not Modified.
+  const cachedSummaries = useRef(new Map());
 
   useEffect(() => {
     async function initialise() {
@@ -47,8 +50,15 @@ export function useSummary() {
         if (selectedModel && selectedModel.name) {
           params.model = selectedModel.name;
         }
-        const result = await fetchSummary(params);
-        setSummary(result);
+        const cacheKey = JSON.stringify(params);
+        const cached = cachedSummaries.current.get(cacheKey);
+        const result = await fetchSummary(params, cached?.etag);
+        if (result.notModified && cached) {
+          setSummary(cached.data);
+        } else {
+          cachedSummaries.current.set(cacheKey, { etag: result.etag, data: result.data });
+          setSummary(result.data);
+        }
       } catch (err) {
         setError(err);
       } finally {
@@ -58,6 +68,63 @@ export function useSummary() {
     loadSummary();
   }, [selectedDevice, selectedModel]);
 
+  // In job mode the AI insight is generated in the background; stream its text as it arrives.
+  const jobId = summary?.metadata?.recommendation_job?.id ?? null;
+  useEffect(() => {
+    if (!jobId) {
+      setStreamingInsight(null);
+      return undefined;
+    }
+    setStreamingInsight({ id: jobId, status: 'pending', text: '', error: null });
+    const source = openRecommendationStream(jobId);
+    // A stalled job was requeued; its output restarts from scratch.
+    source.addEventListener('reset', () => {
+      setStreamingInsight((current) => current && { ...current, status: 'pending', text: '' });
+    });
+    source.addEventListener('token', (event) => {
+      const { text } = JSON.parse(event.data);
+      setStreamingInsight((current) => current && { ...current, status: 'running', text: current.text + text });
+    });
+    source.addEventListener('done', (event) => {
+      const job = JSON.parse(event.data);
+      setStreamingInsight((current) => current && { ...current, status: job.status, text: job.output, error: job.error || null });
+      source.close();
+    });
+    source.addEventListener('timeout', () => source.close());
+    return () => source.close();
+  }, [jobId]);
+
+  // Apply pushed readings and recommendations for the selected device instead of refetching.
+  const deviceSlug = selectedDevice?.slug ?? null;
+  useEffect(() => {
+    if (!deviceSlug) return undefined;
+    const source = openLiveStream(deviceSlug);
+    source.addEventListener('reading', (event) => {
+      const reading = JSON.parse(event.data);
+      setSummary((current) => {
+        if (!current) return current;
+        if (reading.metric === 'radon') {
+          return { ...current, radon: { value: reading.value, unit: reading.unit, timestamp: reading.timestamp } };
+        }
+        if (reading.metric === 'temperature' || reading.metric === 'humidity') {
+          const environment = { ...(current.environment || {}), [reading.metric]: reading.value, timestamp: reading.timestamp };
+          return { ...current, environment };
+        }
+        return current;
+      });
+    });
+    source.addEventListener('recommendation', (event) => {
+      const recommendation = JSON.parse(event.data);
+      setSummary((current) => {
+        if (!current || (current.recommendations || []).some((rec) => rec.id === recommendation.id)) return current;
+        return { ...current, recommendations: [recommendation, ...(current.recommendations || [])] };
+      });
+      // A finished streamed insight is replaced by the recommendation it was saved as.
+      setStreamingInsight((current) => (current && current.status === 'succeeded' ? null : current));
+    });
+    return () => source.close();
+  }, [deviceSlug]);
+
   const radonValue = summary?.radon?.value ?? null;
   const radonUnit = summary?.radon?.unit ?? 'pCi/L';
 
@@ -66,6 +133,7 @@ export function useSummary() {
       loading,
       error,
       summary,
+      streamingInsight,
       devices,
       models,
       selectedDevice,
@@ -79,6 +147,7 @@ export function useSummary() {
       loading,
       error,
       summary,
+      streamingInsight,
       devices,
       models,
       selectedDevice,